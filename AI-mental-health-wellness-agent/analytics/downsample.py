@@ -0,0 +1,104 @@
+# analytics/downsample.py
+
+"""
+Chart Downsampling
+------------------
+Keeps dashboard payloads bounded no matter how much history there is.
+
+- pick_bucket(): adaptive time-bucket width for a range and point budget
+  (narrow ranges get fine buckets, wide ranges coarse ones)
+- lttb(): Largest-Triangle-Three-Buckets selection for one series
+- lttb_frame(): LTTB across several series sharing one index
+
+Used by TrendTracker.mood_series() for the Streamlit trend chart.
+"""
+
+import numpy as np
+
+
+# Candidate bucket widths, finest first (seconds, label)
+BUCKET_LADDER = [
+    (3600, "1h"),
+    (3 * 3600, "3h"),
+    (6 * 3600, "6h"),
+    (12 * 3600, "12h"),
+    (86400, "1D"),
+    (2 * 86400, "2D"),
+    (7 * 86400, "7D"),
+    (14 * 86400, "14D"),
+    (30 * 86400, "30D"),
+]
+
+
+def pick_bucket(span_seconds: float, max_points: int):
+    """Finest bucket width that keeps span / width <= max_points."""
+    for seconds, label in BUCKET_LADDER:
+        if span_seconds / seconds <= max_points:
+            return seconds, label
+
+    # beyond the ladder: whole days, as many as needed
+    days = int(np.ceil(span_seconds / 86400 / max_points))
+    return days * 86400, f"{days}D"
+
+
+def lttb(x, y, threshold: int):
+    """
+    Indices of the points LTTB keeps from (x, y).
+    Always keeps the first and last point; returns all indices when
+    len(x) <= threshold.
+    """
+    n = len(x)
+    if threshold >= n:
+        return np.arange(n)
+    if threshold < 3:
+        return np.array([0, n - 1])
+
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+
+    keep = np.empty(threshold, dtype=np.int64)
+    keep[0], keep[-1] = 0, n - 1
+
+    # bucket edges over the interior points
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    a = 0
+
+    for i in range(threshold - 2):
+        lo, hi = edges[i], edges[i + 1]
+
+        # average of the next bucket (or the last point)
+        if i + 2 < threshold - 1:
+            nlo, nhi = edges[i + 1], edges[i + 2]
+            avg_x, avg_y = x[nlo:nhi].mean(), y[nlo:nhi].mean()
+        else:
+            avg_x, avg_y = x[-1], y[-1]
+
+        area = np.abs(
+            (x[a] - avg_x) * (y[lo:hi] - y[a])
+            - (x[a] - x[lo:hi]) * (avg_y - y[a])
+        )
+        a = lo + int(np.argmax(area))
+        keep[i + 1] = a
+
+    return keep
+
+
+def lttb_frame(x, columns, max_points: int):
+    """
+    Row indices to keep so every series retains its shape.
+    Each series gets an equal share of the budget; when the union of their
+    LTTB picks is still over max_points it is thinned evenly from the
+    middle, so the first and last rows always stay.
+    """
+    n = len(x)
+    if n <= max_points or not columns:
+        return np.arange(n)
+
+    per_series = max(3, max_points // len(columns))
+    picks = [lttb(x, col, per_series) for col in columns]
+    keep = np.unique(np.concatenate(picks))
+    if keep.size > max_points:
+        inner = keep[1:-1]
+        take = np.linspace(0, inner.size - 1, max(max_points - 2, 0)).round().astype(np.int64)
+        keep = np.concatenate(([keep[0]], inner[take], [keep[-1]]))
+    return keep
@@ -0,0 +1,482 @@
+# analytics/export.py
+
+"""
+Streaming Export
+----------------
+Exports mood logs and journal entries for counselors and researchers as
+CSV, JSONL or Parquet, in constant memory whatever the history size:
+
+- logs are streamed from the state backend in fixed-size chunks
+  (StateBackend.iter_log) and parsed row by row; nothing builds a list
+- filters: date range (since / until), user / cohort (read from that
+  partition only, see analytics/partitions.py) and moods. Partitions do
+  not store message text, so user / cohort exports have an empty
+  user_message column
+- redaction: "pii" (the default) masks e-mail addresses, phone numbers,
+  URLs and @handles in messages; "full" drops the message text entirely;
+  "none" must be asked for explicitly
+- writers are generators of bytes, so the same export feeds a file, stdout
+  or a chunked HTTP response; Parquet is written one row group at a time
+  (needs pyarrow, an optional dependency)
+
+Journal entries carry no stored mood: their mood is the local keyword
+classifier's. A user filter reads that student's own journal.
+
+Run from the project root:
+    python -m analytics.export moods --format csv --out moods.csv --since 2025-01-01 --mood sad,anxious
+    python -m analytics.export journal --format jsonl --redact full         # to stdout
+    EXPORT_API_TOKEN=... python -m analytics.export serve --port 9110
+        GET /export/moods?format=parquet&user=<id>&redact=full
+        GET /export/journal?format=csv&since=2025-03-01
+
+The HTTP server binds to localhost and refuses to start without a token
+(EXPORT_API_TOKEN); every request needs "Authorization: Bearer <token>".
+"""
+
+import argparse
+import codecs
+import csv
+import hmac
+import io
+import json
+import os
+import re
+import sys
+import threading
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from analytics.logger import HEADER, LOG_FILE
+from analytics.partitions import PARTITION_DIR, PARTITION_HEADER, partition_path
+from src.pipelines.bulk_analysis import parse_journal
+from src.tools.journal_tool import JOURNAL_PATH, journal_path
+from src.tools.keyword_mood import detect_mood_local
+from src.utils.moods import to_code, to_label
+from src.utils.state_backend import get_state_backend
+
+
+FORMATS = ("csv", "jsonl", "parquet")
+REDACTION = ("none", "pii", "full")
+DEFAULT_REDACTION = "pii"
+
+MOOD_FIELDS = ("timestamp", "mood", "mood_code", "confidence", "user_message")
+JOURNAL_FIELDS = ("timestamp", "mood", "mood_code", "text")
+
+CHUNK_SIZE = 1 << 20            # bytes read from the backend at a time
+ROWS_PER_CHUNK = 1000           # CSV / JSONL rows per yielded chunk
+PARQUET_ROW_GROUP = 10000
+
+TOKEN_ENV = "EXPORT_API_TOKEN"
+
+_PII = [
+    (re.compile(r"[\w.+-]+@[\w-]+\.[\w.-]+"), "[email]"),
+    (re.compile(r"https?://\S+|www\.\S+", re.IGNORECASE), "[url]"),
+    (re.compile(r"(?<!\w)@\w{2,}"), "[handle]"),
+    (re.compile(r"\+?\d[\d\s().-]{7,}\d"), "[phone]"),
+]
+
+
+# -----------------------------------------------------------
+# Filters and redaction
+# -----------------------------------------------------------
+def redact_text(text: str, mode: str = DEFAULT_REDACTION) -> str:
+    mode = mode or DEFAULT_REDACTION
+    if mode == "none" or not text:
+        return text
+    if mode == "full":
+        return "[redacted]"
+    if mode != "pii":
+        raise ValueError(f"Unknown redaction: {mode!r} (expected one of {REDACTION})")
+    for pattern, mask in _PII:
+        text = pattern.sub(mask, text)
+    return text
+
+
+def parse_bound(value, end: bool = False):
+    """ISO date/datetime -> datetime; a bare date as `until` covers that whole day."""
+    if value is None or isinstance(value, datetime):
+        return value
+    parsed = datetime.fromisoformat(value)
+    if end and len(value) <= 10:
+        parsed += timedelta(days=1)
+    return parsed
+
+
+def _timestamp(value):
+    try:
+        return datetime.fromisoformat(value) if value else None
+    except ValueError:
+        return None
+
+
+def parse_moods(moods):
+    """Labels / aliases / codes -> set of codes; ValueError for any that do not resolve."""
+    codes = set()
+    for mood in moods:
+        code = to_code(mood, default=None)
+        if code is None:
+            raise ValueError(f"Unknown mood: {mood!r}")
+        codes.add(int(code))
+    return codes
+
+
+class Filters:
+    """since <= timestamp < until, mood in moods. Rows without a readable time fail date filters."""
+
+    def __init__(self, since=None, until=None, moods=None):
+        self.since = parse_bound(since)
+        self.until = parse_bound(until, end=True)
+        self.moods = parse_moods(moods) if moods else None
+
+    def keep(self, timestamp: str, mood_code: int) -> bool:
+        if self.moods is not None and mood_code not in self.moods:
+            return False
+        if self.since is None and self.until is None:
+            return True
+        ts = _timestamp(timestamp)
+        if ts is None:
+            return False
+        if ts.tzinfo is not None:
+            ts = ts.replace(tzinfo=None)
+        return (self.since is None or ts >= self.since) and (self.until is None or ts < self.until)
+
+
+# -----------------------------------------------------------
+# Streaming readers
+# -----------------------------------------------------------
+def iter_lines(name: str, backend=None, chunk_size: int = CHUNK_SIZE):
+    """Text lines of a log (line endings kept), decoded chunk by chunk."""
+    backend = backend or get_state_backend()
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    pending = ""
+    for chunk in backend.iter_log(name, chunk_size):
+        # split on "\n" only; the last piece may be a partial line, carry it over
+        *lines, pending = (pending + decoder.decode(chunk)).split("\n")
+        for line in lines:
+            yield line + "\n"
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending
+
+
+def iter_mood_rows(since=None, until=None, user_id=None, cohort=None, moods=None, redact=DEFAULT_REDACTION,
+                   log_file=LOG_FILE, partition_dir=PARTITION_DIR, backend=None):
+    """Mood log rows as dicts (MOOD_FIELDS), filtered and redacted, one at a time."""
+    name = log_file
+    if user_id is not None:
+        name = partition_path("user", user_id, partition_dir)
+    elif cohort is not None:
+        name = partition_path("cohort", cohort, partition_dir)
+
+    filters = Filters(since, until, moods)
+    reader = csv.reader(iter_lines(name, backend))
+    columns = next(reader, None) or HEADER
+    index = {c: i for i, c in enumerate(columns)}
+
+    message = index.get("user_message")
+    for row in reader:
+        if len(row) < len(PARTITION_HEADER):
+            continue
+        timestamp = row[index["timestamp"]]
+        code = int(to_code(row[index["mood"]]))
+        if not filters.keep(timestamp, code):
+            continue
+
+        try:
+            confidence = float(row[index["confidence"]])
+        except ValueError:
+            confidence = None
+        text = row[message] if message is not None and message < len(row) else ""
+
+        yield {
+            "timestamp": timestamp,
+            "mood": to_label(code),
+            "mood_code": code,
+            "confidence": confidence,
+            "user_message": redact_text(text, redact),
+        }
+
+
+def iter_journal_entries(since=None, until=None, user_id=None, moods=None, redact=DEFAULT_REDACTION,
+                         path=JOURNAL_PATH, backend=None):
+    """
+    Journal entries as dicts (JOURNAL_FIELDS), mood from the keyword
+    classifier; a user_id reads that student's own journal instead.
+    """
+    if user_id is not None:
+        path = journal_path(user_id)
+
+    filters = Filters(since, until, moods)
+    for entry in parse_journal(iter_lines(path, backend)):
+        mood = detect_mood_local(entry["text"])
+        if not filters.keep(entry["timestamp"], mood["code"]):
+            continue
+        yield {
+            "timestamp": entry["timestamp"],
+            "mood": mood["mood"],
+            "mood_code": mood["code"],
+            "text": redact_text(entry["text"], redact),
+        }
+
+
+SOURCES = {
+    "moods": (iter_mood_rows, MOOD_FIELDS),
+    "journal": (iter_journal_entries, JOURNAL_FIELDS),
+}
+
+
+# -----------------------------------------------------------
+# Streaming writers (generators of bytes)
+# -----------------------------------------------------------
+def _batches(records, size: int):
+    batch = []
+    for record in records:
+        batch.append(record)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def write_csv(records, fields):
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=fields)
+    writer.writeheader()
+    for batch in _batches(records, ROWS_PER_CHUNK):
+        writer.writerows(batch)
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+def write_jsonl(records, fields):
+    for batch in _batches(records, ROWS_PER_CHUNK):
+        yield "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in batch).encode("utf-8")
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file object that hands back whatever was written since the last drain()."""
+
+    def __init__(self):
+        super().__init__()
+        self._chunks = []
+        self._pos = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._pos += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._pos
+
+    def drain(self) -> bytes:
+        data, self._chunks = b"".join(self._chunks), []
+        return data
+
+
+def write_parquet(records, fields):
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise RuntimeError("Parquet export needs pyarrow (pip install pyarrow)") from e
+
+    types = {"mood_code": pa.int16(), "confidence": pa.float64()}
+    schema = pa.schema([(f, types.get(f, pa.string())) for f in fields])
+
+    sink = _ChunkSink()
+    with pq.ParquetWriter(sink, schema, compression="zstd") as writer:
+        for batch in _batches(records, PARQUET_ROW_GROUP):
+            writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+            yield sink.drain()
+    yield sink.drain()
+
+
+WRITERS = {"csv": write_csv, "jsonl": write_jsonl, "parquet": write_parquet}
+CONTENT_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "jsonl": "application/x-ndjson",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+
+def export(source: str = "moods", fmt: str = "csv", **filters):
+    """Stream an export: yields bytes chunks. `filters` go to the source reader."""
+    if source not in SOURCES:
+        raise ValueError(f"Unknown export source: {source!r} (expected one of {tuple(SOURCES)})")
+    if fmt not in WRITERS:
+        raise ValueError(f"Unknown export format: {fmt!r} (expected one of {FORMATS})")
+    filters["redact"] = filters.get("redact") or DEFAULT_REDACTION
+    if filters["redact"] not in REDACTION:
+        raise ValueError(f"Unknown redaction: {filters['redact']!r} (expected one of {REDACTION})")
+    # readers are lazy: check dates and moods now, before anything is written
+    Filters(filters.get("since"), filters.get("until"), filters.get("moods"))
+
+    read, fields = SOURCES[source]
+    return WRITERS[fmt](read(**filters), fields)
+
+
+def export_to_file(out: str, source: str = "moods", fmt: str = "csv", **filters) -> int:
+    """Write an export to `out` ("-" = stdout); returns bytes written."""
+    chunks = export(source, fmt, **filters)
+    written = 0
+    if out == "-":
+        for chunk in chunks:
+            sys.stdout.buffer.write(chunk)
+            written += len(chunk)
+        sys.stdout.buffer.flush()
+        return written
+
+    os.makedirs(os.path.dirname(out) or ".", exist_ok=True)
+    tmp = f"{out}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        for chunk in chunks:
+            f.write(chunk)
+            written += len(chunk)
+    os.replace(tmp, out)
+    return written
+
+
+# -----------------------------------------------------------
+# HTTP (chunked transfer encoding)
+# -----------------------------------------------------------
+class _ExportHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def _error(self, status: int, message: str):
+        body = json.dumps({"error": message}).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        expected = f"Bearer {self.server.token}".encode("utf-8")
+        if not hmac.compare_digest(self.headers.get("Authorization", "").encode("utf-8"), expected):
+            self._error(401, "missing or wrong bearer token")
+            return
+
+        parts = urlsplit(self.path)
+        source = parts.path.rstrip("/").rsplit("/", 1)[-1]
+        if not parts.path.startswith("/export/") or source not in SOURCES:
+            self._error(404, "use /export/moods or /export/journal")
+            return
+
+        query = {k: v[-1] for k, v in parse_qs(parts.query).items()}
+        fmt = query.pop("format", "csv")
+        try:
+            filters = {
+                "since": query.get("since"),
+                "until": query.get("until"),
+                "user_id": query.get("user"),
+                "moods": query["mood"].split(",") if query.get("mood") else None,
+                "redact": query.get("redact") or DEFAULT_REDACTION,
+            }
+            if source == "moods":
+                filters["cohort"] = query.get("cohort")
+            chunks = export(source, fmt, **filters)
+            first = next(chunks, b"")       # surface bad filters before the 200
+        except (ValueError, RuntimeError) as e:
+            self._error(400, str(e))
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPES[fmt])
+        self.send_header("Content-Disposition", f'attachment; filename="{source}.{fmt}"')
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        try:
+            for chunk in _prepend(first, chunks):
+                if chunk:
+                    self.wfile.write(b"%x\r\n%s\r\n" % (len(chunk), chunk))
+            self.wfile.write(b"0\r\n\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            self.close_connection = True
+
+
+def _prepend(first, rest):
+    yield first
+    yield from rest
+
+
+def serve_exports(host: str = "127.0.0.1", port: int = 9110, token: str = None):
+    """
+    Serve GET /export/<moods|journal> from a daemon thread; returns the
+    server. Raises ValueError when no token is given or set in EXPORT_API_TOKEN.
+    """
+    token = token or os.environ.get(TOKEN_ENV)
+    if not token:
+        raise ValueError(f"Refusing to serve exports without a token: set {TOKEN_ENV}")
+
+    server = ThreadingHTTPServer((host, port), _ExportHandler)
+    server.daemon_threads = True
+    server.token = token
+    threading.Thread(target=server.serve_forever, name="exports", daemon=True).start()
+    return server
+
+
+# -----------------------------------------------------------
+# CLI
+# -----------------------------------------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export mood logs and journal entries.")
+    parser.add_argument("source", choices=(*SOURCES, "serve"))
+    parser.add_argument("--format", choices=FORMATS, default="csv")
+    parser.add_argument("--out", default="-", help="output file (default: stdout)")
+    parser.add_argument("--since", help="ISO date/datetime, inclusive")
+    parser.add_argument("--until", help="ISO date/datetime; a bare date includes that day")
+    parser.add_argument("--user", help="one student's rows / journal")
+    parser.add_argument("--cohort", help="one cohort's rows (moods only)")
+    parser.add_argument("--mood", help="comma-separated moods (labels or aliases)")
+    parser.add_argument("--redact", choices=REDACTION, default=DEFAULT_REDACTION,
+                        help="default: pii")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9110)
+    args = parser.parse_args(argv)
+
+    if args.source == "serve":
+        try:
+            server = serve_exports(args.host, args.port)
+        except ValueError as e:
+            parser.error(str(e))
+        print(f"Exports on http://{args.host}:{server.server_address[1]}/export/<moods|journal>")
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            pass
+        return None
+
+    filters = {
+        "since": args.since,
+        "until": args.until,
+        "user_id": args.user,
+        "moods": args.mood.split(",") if args.mood else None,
+        "redact": args.redact,
+    }
+    if args.source == "moods":
+        filters["cohort"] = args.cohort
+
+    try:
+        written = export_to_file(args.out, args.source, args.format, **filters)
+    except ValueError as e:
+        parser.error(str(e))
+    if args.out != "-":
+        print(f"Wrote {written} bytes to {args.out}")
+    return written
+
+
+if __name__ == "__main__":
+    main()
@@ -11,47 +11,109 @@ Stores user mood logs for:
 Logs are appended to data/emotion_logs.csv
 Structure:
 timestamp, mood, confidence, user_message
+
+`mood` is stored as the integer code from src.utils.moods; rows written
+before the taxonomy existed hold labels and are still read correctly.
+
+Rows logged with a user_id / cohort are also appended, without the
+message, to that user's / cohort's partition (analytics/partitions.py),
+so per-student queries read only that student's rows.
+
+Logs live in the shared state backend (src/utils/state_backend.py): plain
+CSV files with the default local backend, SQLite / Redis when several
+replicas must write one log. A row and its partition copies go out in
+one batched round trip.
 """
 
 import os
+import io
 import csv
 from datetime import datetime
 
+from analytics.partitions import PARTITION_DIR, PARTITION_HEADER, partition_path, partition_paths
+from src.utils.moods import to_code
+from src.utils.state_backend import get_state_backend
+
 
 DATA_DIR = "data"
 LOG_FILE = os.path.join(DATA_DIR, "emotion_logs.csv")
+HEADER = ["timestamp", "mood", "confidence", "user_message"]
 
 
-class AnalyticsLogger:
+def _csv_text(rows) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    return buffer.getvalue()
 
-    def __init__(self):
-        os.makedirs(DATA_DIR, exist_ok=True)
 
-        # Initialize CSV with headers if missing
-        if not os.path.exists(LOG_FILE):
-            with open(LOG_FILE, "w", newline="", encoding="utf-8") as f:
-                writer = csv.writer(f)
-                writer.writerow(["timestamp", "mood", "confidence", "user_message"])
-
-    def log_mood(self, mood: str, confidence: float, user_message: str):
-        """Append mood analysis entry to CSV."""
+class AnalyticsLogger:
+    """
+    Appends are process-safe: each call writes its rows in one append
+    (a single write() under an exclusive file lock with the local backend),
+    so several Streamlit workers / CLIs / replicas can share one log.
+    """
+
+    def __init__(self, log_file=LOG_FILE, partition_dir=PARTITION_DIR, backend=None):
+        self.log_file = log_file
+        self.partition_dir = partition_dir
+        self.header = _csv_text([HEADER])
+        self.partition_header = _csv_text([PARTITION_HEADER])
+        self.backend = backend or get_state_backend()
+
+        # Initialize CSV with headers if missing (checked under the lock)
+        self.backend.append(self.log_file, "", header=self.header)
+
+    def _append(self, rows, user_id=None, cohort=None):
+        """Rows to the global log and, without the message, to their partitions."""
+        with self.backend.batched():
+            self.backend.append(self.log_file, _csv_text(rows), header=self.header)
+            paths = partition_paths(user_id, cohort, self.partition_dir)
+            if paths:
+                text = _csv_text(row[:len(PARTITION_HEADER)] for row in rows)
+                for path in paths:
+                    self.backend.append(path, text, header=self.partition_header)
+
+    def log_mood(self, mood, confidence: float, user_message: str, user_id=None, cohort=None):
+        """Append mood analysis entry to CSV. `mood` may be a code or label."""
         timestamp = datetime.utcnow().isoformat()
 
-        with open(LOG_FILE, "a", newline="", encoding="utf-8") as f:
-            writer = csv.writer(f)
-            writer.writerow([timestamp, mood, confidence, user_message])
-
-    def load_logs(self):
-        """Load logs as list of dicts."""
+        row = [timestamp, int(to_code(mood)), confidence, user_message]
+        self._append([row], user_id, cohort)
+
+    def log_many(self, rows, user_id=None, cohort=None):
+        """
+        Bulk-append (timestamp, mood, confidence, user_message) rows
+        with a single locked write per file. Used by backfills.
+        """
+        rows = [
+            [timestamp, int(to_code(mood)), confidence, user_message]
+            for timestamp, mood, confidence, user_message in rows
+        ]
+        if rows:
+            self._append(rows, user_id, cohort)
+
+    def load_logs(self, user_id=None, cohort=None):
+        """
+        Load logs as list of dicts: the global log, or one user's /
+        cohort's partition (user_id wins if both are given; partition
+        rows have no user_message).
+        """
         logs = []
 
-        if not os.path.exists(LOG_FILE):
+        path = self.log_file
+        if user_id is not None:
+            path = partition_path("user", user_id, self.partition_dir)
+        elif cohort is not None:
+            path = partition_path("cohort", cohort, self.partition_dir)
+
+        text = self.backend.read(path).decode("utf-8")
+        if not text:
             return logs
 
-        with open(LOG_FILE, "r", encoding="utf-8") as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                logs.append(row)
+        reader = csv.DictReader(io.StringIO(text, newline=""))
+        for row in reader:
+            row["mood"] = to_code(row["mood"])
+            logs.append(row)
 
         return logs
 
@@ -0,0 +1,49 @@
+# analytics/partitions.py
+
+"""
+Mood Log Partitions
+-------------------
+Besides the global emotion log, every row tagged with a user (and/or a
+cohort) is also appended to that user's / cohort's own CSV. Partitions
+hold only timestamp, mood and confidence (PARTITION_HEADER): the message
+text stays in the global log and is never copied.
+
+- Partition lookup is a hash of the id, so finding one student's log
+  never touches anyone else's rows (the "user" half of the index)
+- Rows are appended in time order, so each partition is sorted by
+  timestamp and range queries are a binary search (the "timestamp" half)
+- Files are spread over 256 subdirectories, so 100k students never put
+  100k files in one directory
+
+Layout:
+    data/emotion_partitions/user/<h[:2]>/<h>.csv
+    data/emotion_partitions/cohort/<h[:2]>/<h>.csv
+with h = md5(id). Ids never appear in paths.
+"""
+
+import os
+
+from src.utils.state_backend import hashed_name
+
+
+PARTITION_DIR = os.path.join("data", "emotion_partitions")
+KINDS = ("user", "cohort")
+PARTITION_HEADER = ["timestamp", "mood", "confidence"]
+
+
+def partition_path(kind: str, key, root: str = PARTITION_DIR) -> str:
+    """CSV path holding the rows of one user or cohort."""
+    if kind not in KINDS:
+        raise ValueError(f"Unknown partition kind: {kind!r} (expected one of {KINDS})")
+
+    return hashed_name(os.path.join(root, kind), key, ".csv")
+
+
+def partition_paths(user_id=None, cohort=None, root: str = PARTITION_DIR):
+    """Paths a row tagged with `user_id` / `cohort` is written to."""
+    paths = []
+    if user_id is not None:
+        paths.append(partition_path("user", user_id, root))
+    if cohort is not None:
+        paths.append(partition_path("cohort", cohort, root))
+    return paths
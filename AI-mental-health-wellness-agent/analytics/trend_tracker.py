@@ -8,70 +8,404 @@ Reads from emotion_logs.csv and produces:
 - Weekly emotion trends
 - Count of each emotion
 - Daily emotional timeline
-- Trend data for Streamlit charts
+- Rolling per-mood shares, mood transition matrix, streaks and
+  intensity trends over a configurable window
+- Trend data for Streamlit charts, downsampled to a bounded number of
+  points for any selected range (see analytics/downsample.py)
 
 Used by the real-time dashboard in streamlit_app/app.py
+
+Moods are handled as integer codes internally and converted to labels
+only in the returned chart data. All aggregations are vectorized NumPy
+over the code / day-index arrays, so they stay fast on millions of rows;
+outputs are sized per day or per mood, never per raw row.
+
+The rolling window defaults to analytics.trend_window_days in agent.yaml.
+
+Every query takes optional user= / cohort= filters. Those are answered
+from the matching partition (analytics/partitions.py) rather than the
+global log, and parsed partitions are cached per file, so a per-student
+dashboard costs the same whether the deployment has 10 or 100k students.
+
+Logs are append-only: each cached frame remembers the byte offset it was
+parsed up to, and the next query parses only the rows appended since.
+
+Logs are read through the shared state backend (src/utils/state_backend.py),
+so every replica charts the same data.
 """
 
+import csv
+import io
 import os
+from collections import OrderedDict
+
+import numpy as np
 import pandas as pd
+import yaml
 from datetime import datetime, timedelta
 
+from analytics.downsample import lttb_frame, pick_bucket
+from analytics.partitions import PARTITION_DIR, partition_path
+from src.utils.moods import LABELS, to_code
+from src.utils.state_backend import get_state_backend
+
 
 LOG_FILE = os.path.join("data", "emotion_logs.csv")
+CONFIG_PATH = "config/agent.yaml"
+
+NUM_MOODS = len(LABELS)
+
+# Upper bound on points per series sent to a chart
+MAX_CHART_POINTS = 200
+
+# Parsed logs kept in memory (global log + recently viewed partitions)
+MAX_CACHED_FRAMES = 256
+
+# Columns the trend queries need (message text is never loaded)
+COLUMNS = ["timestamp", "mood", "confidence"]
+
+
+def _window_from_config(config_path: str, default: int = 7) -> int:
+    try:
+        with open(config_path, "r", encoding="utf-8") as f:
+            config = yaml.safe_load(f) or {}
+        return int(config.get("analytics", {}).get("trend_window_days", default))
+    except (OSError, ValueError, yaml.YAMLError):
+        return default
 
 
 class TrendTracker:
 
-    def __init__(self):
-        pass
+    def __init__(self, log_file=LOG_FILE, window_days=None, config_path=CONFIG_PATH,
+                 partition_dir=PARTITION_DIR, backend=None):
+        self.log_file = log_file
+        self.partition_dir = partition_dir
+        self.window_days = window_days or _window_from_config(config_path)
+        self.backend = backend or get_state_backend()
 
-    def _load_df(self):
-        """Load CSV as DataFrame, create if missing."""
-        if not os.path.exists(LOG_FILE):
-            return pd.DataFrame(columns=["timestamp", "mood", "confidence", "user_message"])
+        # path -> (bytes parsed, csv columns, frame); extended as the log grows
+        self._frames = OrderedDict()
 
-        df = pd.read_csv(LOG_FILE)
+    def _path(self, user=None, cohort=None):
+        if user is not None:
+            return partition_path("user", user, self.partition_dir)
+        if cohort is not None:
+            return partition_path("cohort", cohort, self.partition_dir)
+        return self.log_file
 
-        if df.empty:
-            return df
+    def _load_df(self, user=None, cohort=None):
+        """
+        Load the global log, or one user's / cohort's partition, as a
+        DataFrame. Logs are append-only, so each frame is cached with the
+        byte offset it covers and only rows appended since are parsed;
+        frames are shared between calls, callers must not modify them in place.
+        """
+        path = self._path(user, cohort)
+        size = self.backend.size(path)
+
+        cached = self._frames.get(path)
+        if cached is not None and cached[0] > size:
+            cached = None                       # log was rewritten: start over
+        offset, columns, df = cached or (0, None, None)
 
-        df["timestamp"] = pd.to_datetime(df["timestamp"])
+        if offset < size:
+            data = self.backend.read(path, offset, size - offset)
+            data = data[:data.rfind(b"\n") + 1]   # whole rows only
+            offset += len(data)
+
+            if columns is None:
+                head, _, data = data.partition(b"\n")
+                columns = next(csv.reader([head.decode("utf-8")]), None)
+
+            if columns:
+                new = self._parse(data, columns)
+                df = self._extend(df, new)
+
+        if df is None:
+            return pd.DataFrame(columns=COLUMNS)
+
+        self._frames[path] = (offset, columns, df)
+        self._frames.move_to_end(path)
+        if len(self._frames) > MAX_CACHED_FRAMES:
+            self._frames.popitem(last=False)
         return df
 
+    def _parse(self, data: bytes, columns):
+        """CSV rows (no header) into a frame of codes, times and confidences."""
+        if not data.strip():
+            return pd.DataFrame(columns=COLUMNS)
+
+        # rows with fewer fields than the header (e.g. no message) read as NaN there
+        df = pd.read_csv(io.BytesIO(data), header=None, names=columns, usecols=COLUMNS,
+                         dtype={"mood": str})
+        df["timestamp"] = pd.to_datetime(df["timestamp"], format="ISO8601")
+        df["mood"] = self._mood_codes(df["mood"])
+        df["confidence"] = pd.to_numeric(df["confidence"], errors="coerce").astype("float32")
+        return df.sort_values("timestamp", kind="stable", ignore_index=True)
+
+    @staticmethod
+    def _extend(df, new):
+        """Append newly parsed rows; re-sort only if they reach back in time."""
+        if df is None or df.empty:
+            return new
+        if new.empty:
+            return df
+        late = new["timestamp"].iloc[0] < df["timestamp"].iloc[-1]
+        df = pd.concat([df, new], ignore_index=True)
+        return df.sort_values("timestamp", kind="stable", ignore_index=True) if late else df
+
+    @staticmethod
+    def _mood_codes(column):
+        """Map labels/codes to int8 codes, resolving each distinct value once."""
+        positions, uniques = pd.factorize(column)
+        # trailing 0 (neutral) catches factorize's -1 for missing values
+        lookup = np.array([to_code(u) for u in uniques] + [0], dtype=np.int8)
+        return lookup[positions]
+
+    @staticmethod
+    def _labels(codes):
+        return [LABELS[c] for c in codes]
+
+    @staticmethod
+    def _day_index(df):
+        """(first_day, per-row day offset) as numpy arrays."""
+        days = df["timestamp"].to_numpy().astype("datetime64[D]")
+        first = days.min()
+        return first, (days - first).astype(np.int64)
+
+    def _daily_counts(self, df):
+        """(dates, n_days x NUM_MOODS count matrix)."""
+        first, offset = self._day_index(df)
+        n_days = int(offset.max()) + 1
+        flat = offset * NUM_MOODS + df["mood"].to_numpy()
+        counts = np.bincount(flat, minlength=n_days * NUM_MOODS).reshape(n_days, NUM_MOODS)
+        dates = pd.date_range(pd.Timestamp(first), periods=n_days, freq="D")
+        return dates, counts
+
+    @staticmethod
+    def _rolling_sum(values, window: int):
+        """Trailing rolling sum along axis 0 via cumulative sums."""
+        csum = np.cumsum(values, axis=0, dtype=np.float64)
+        out = csum.copy()
+        out[window:] = csum[window:] - csum[:-window]
+        return out
+
     # -----------------------------------------------------------
     # Weekly Mood Frequency (Bar Chart)
     # -----------------------------------------------------------
-    def weekly_mood_counts(self):
-        df = self._load_df()
+    def weekly_mood_counts(self, user=None, cohort=None):
+        df = self._load_df(user, cohort)
         if df.empty:
             return {}
 
-        one_week_ago = datetime.utcnow() - timedelta(days=7)
-        recent = df[df["timestamp"] >= one_week_ago]
+        since = datetime.utcnow() - timedelta(days=self.window_days)
+        recent = df["mood"].to_numpy()[df["timestamp"].to_numpy() >= np.datetime64(since)]
 
-        if recent.empty:
+        if recent.size == 0:
             return {}
 
-        return recent["mood"].value_counts().to_dict()
+        counts = np.bincount(recent, minlength=NUM_MOODS)
+        return {LABELS[c]: int(n) for c, n in enumerate(counts) if n}
 
     # -----------------------------------------------------------
     # Daily Mood Trend (Line Chart)
     # -----------------------------------------------------------
-    def daily_trend(self):
-        df = self._load_df()
+    def daily_trend(self, user=None, cohort=None):
+        """{date: {mood label: count}} for every day with entries."""
+        df = self._load_df(user, cohort)
         if df.empty:
             return {}
 
-        df["date"] = df["timestamp"].dt.date
-        trend = df.groupby("date")["mood"].agg(list).to_dict()
-        return trend
+        dates, counts = self._daily_counts(df)
+        active = counts.sum(axis=1) > 0
+
+        return {
+            date.date(): {LABELS[c]: int(n) for c, n in enumerate(row) if n}
+            for date, row in zip(dates[active], counts[active])
+        }
+
+    # -----------------------------------------------------------
+    # Downsampled Mood Series (Line Chart, zoomable)
+    # -----------------------------------------------------------
+    def time_range(self, user=None, cohort=None):
+        """(first, last) timestamp in the log, or None when empty."""
+        df = self._load_df(user, cohort)
+        if df.empty:
+            return None
+        ts = df["timestamp"]
+        return ts.iloc[0].to_pydatetime(), ts.iloc[-1].to_pydatetime()
+
+    def mood_series(self, start=None, end=None, max_points=MAX_CHART_POINTS, method="bucket",
+                    user=None, cohort=None):
+        """
+        Mood counts over time for [start, end], capped at `max_points` rows.
+
+        method="bucket": adaptive time buckets; the narrower the range, the
+                         finer the bucket (down to 1h), so zooming in gives
+                         more detail for the same payload.
+        method="lttb":   count at a finer bucket, then keep the rows LTTB
+                         picks for each mood series.
+
+        Returns a DataFrame indexed by bucket start, one column per mood
+        present in the range; the bucket width is in frame.attrs["bucket"].
+        """
+        df = self._load_df(user, cohort)
+        if df.empty:
+            return pd.DataFrame()
+
+        ts = df["timestamp"].to_numpy()
+        lo = 0 if start is None else int(np.searchsorted(ts, np.datetime64(pd.Timestamp(start)), "left"))
+        hi = len(ts) if end is None else int(np.searchsorted(ts, np.datetime64(pd.Timestamp(end)), "right"))
+        if lo >= hi:
+            return pd.DataFrame()
+
+        ts = ts[lo:hi]
+        codes = df["mood"].to_numpy()[lo:hi].astype(np.int64)
+
+        first = pd.Timestamp(start) if start is not None else pd.Timestamp(ts[0])
+        last = pd.Timestamp(end) if end is not None else pd.Timestamp(ts[-1])
+        span = max((last - first).total_seconds(), 1.0)
+
+        budget = max_points * 8 if method == "lttb" else max_points
+        width, label = pick_bucket(span, budget)
+
+        origin = first.floor("D") if width >= 86400 else first.floor("h")
+        seconds = (ts - np.datetime64(origin)) // np.timedelta64(1, "s")
+        bucket = (seconds // width).astype(np.int64)
+
+        n_buckets = int(bucket.max()) + 1
+        counts = np.bincount(bucket * NUM_MOODS + codes, minlength=n_buckets * NUM_MOODS)
+        counts = counts.reshape(n_buckets, NUM_MOODS)
+
+        present = np.flatnonzero(counts.sum(axis=0))
+        counts = counts[:, present]
+        index = origin + pd.to_timedelta(np.arange(n_buckets) * width, unit="s")
+
+        if method == "lttb":
+            keep = lttb_frame(np.arange(n_buckets), list(counts.T), max_points)
+            counts, index = counts[keep], index[keep]
+
+        frame = pd.DataFrame(counts, index=index, columns=self._labels(present))
+        frame.attrs["bucket"] = label
+        return frame
+
+    # -----------------------------------------------------------
+    # Rolling Mood Shares (Line Chart)
+    # -----------------------------------------------------------
+    def rolling_mood_shares(self, window_days=None, user=None, cohort=None):
+        """
+        Per-day share of each mood over a trailing window.
+        DataFrame indexed by date, one column per mood label, rows sum to 1
+        (0 where the window holds no entries).
+        """
+        df = self._load_df(user, cohort)
+        if df.empty:
+            return pd.DataFrame(columns=list(LABELS))
+
+        window = window_days or self.window_days
+        dates, counts = self._daily_counts(df)
+        rolled = self._rolling_sum(counts, window)
+        totals = rolled.sum(axis=1, keepdims=True)
+        shares = np.divide(rolled, totals, out=np.zeros_like(rolled), where=totals > 0)
+
+        return pd.DataFrame(shares, index=dates.date, columns=list(LABELS))
+
+    # -----------------------------------------------------------
+    # Mood Transitions (Heatmap)
+    # -----------------------------------------------------------
+    def transition_matrix(self, normalize=True, user=None, cohort=None):
+        """
+        How often mood A is followed by mood B in consecutive entries.
+        Rows: "from" mood, columns: "to" mood. Row-normalized by default.
+        """
+        df = self._load_df(user, cohort)
+        labels = list(LABELS)
+        if len(df) < 2:
+            return pd.DataFrame(0.0, index=labels, columns=labels)
+
+        codes = df["mood"].to_numpy().astype(np.int64)
+        flat = codes[:-1] * NUM_MOODS + codes[1:]
+        matrix = np.bincount(flat, minlength=NUM_MOODS * NUM_MOODS).reshape(NUM_MOODS, NUM_MOODS)
+        matrix = matrix.astype(np.float64)
+
+        if normalize:
+            totals = matrix.sum(axis=1, keepdims=True)
+            matrix = np.divide(matrix, totals, out=np.zeros_like(matrix), where=totals > 0)
+
+        return pd.DataFrame(matrix, index=labels, columns=labels)
+
+    # -----------------------------------------------------------
+    # Streaks
+    # -----------------------------------------------------------
+    def streaks(self, user=None, cohort=None):
+        """
+        Run-length stats over consecutive entries:
+        - current: mood and length of the latest run
+        - longest: longest run per mood label
+        - active_days: consecutive days (up to the latest entry) with entries
+        """
+        df = self._load_df(user, cohort)
+        if df.empty:
+            return {"current": None, "longest": {}, "active_days": 0}
+
+        codes = df["mood"].to_numpy()
+        starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+        lengths = np.diff(np.r_[starts, codes.size])
+        run_moods = codes[starts]
+
+        longest = np.zeros(NUM_MOODS, dtype=np.int64)
+        np.maximum.at(longest, run_moods, lengths)
+
+        _, offset = self._day_index(df)
+        days = np.unique(offset)
+        gaps = np.flatnonzero(np.diff(days) != 1)
+        active_days = int(days.size - (gaps[-1] + 1)) if gaps.size else int(days.size)
+
+        return {
+            "current": {"mood": LABELS[run_moods[-1]], "length": int(lengths[-1])},
+            "longest": {LABELS[c]: int(n) for c, n in enumerate(longest) if n},
+            "active_days": active_days,
+        }
+
+    # -----------------------------------------------------------
+    # Intensity Trend (Line Chart)
+    # -----------------------------------------------------------
+    def intensity_trend(self, window_days=None, user=None, cohort=None):
+        """
+        Rolling mean of confidence (used as intensity) per day, plus the
+        slope of the daily means over the last window (per day).
+        """
+        df = self._load_df(user, cohort)
+        if df.empty:
+            return {"series": pd.Series(dtype="float64"), "slope": 0.0}
+
+        window = window_days or self.window_days
+        first, offset = self._day_index(df)
+        n_days = int(offset.max()) + 1
+
+        conf = df["confidence"].to_numpy(dtype=np.float64)
+        valid = ~np.isnan(conf)
+        sums = np.bincount(offset[valid], weights=conf[valid], minlength=n_days)
+        counts = np.bincount(offset[valid], minlength=n_days).astype(np.float64)
+
+        rolled_sum = self._rolling_sum(sums, window)
+        rolled_count = self._rolling_sum(counts, window)
+        rolling = np.divide(rolled_sum, rolled_count, out=np.full(n_days, np.nan), where=rolled_count > 0)
+
+        dates = pd.date_range(pd.Timestamp(first), periods=n_days, freq="D").date
+        series = pd.Series(rolling, index=dates, name="intensity")
+
+        daily = np.divide(sums, counts, out=np.full(n_days, np.nan), where=counts > 0)[-window:]
+        x = np.arange(daily.size)[~np.isnan(daily)]
+        slope = float(np.polyfit(x, daily[x], 1)[0]) if x.size >= 2 else 0.0
+
+        return {"series": series, "slope": round(slope, 4)}
 
     # -----------------------------------------------------------
     # Most Frequent Mood of the Week
     # -----------------------------------------------------------
-    def dominant_weekly_mood(self):
-        counts = self.weekly_mood_counts()
+    def dominant_weekly_mood(self, user=None, cohort=None):
+        counts = self.weekly_mood_counts(user=user, cohort=cohort)
         if not counts:
             return None
         return max(counts, key=counts.get)
@@ -79,8 +413,8 @@ class TrendTracker:
     # -----------------------------------------------------------
     # Mood Confidence Average
     # -----------------------------------------------------------
-    def average_confidence(self):
-        df = self._load_df()
+    def average_confidence(self, user=None, cohort=None):
+        df = self._load_df(user, cohort)
         if df.empty:
             return 0
         return float(df["confidence"].mean())
@@ -88,15 +422,16 @@ class TrendTracker:
     # -----------------------------------------------------------
     # Usage stats (for dashboard)
     # -----------------------------------------------------------
-    def usage_stats(self):
-        df = self._load_df()
+    def usage_stats(self, user=None, cohort=None):
+        df = self._load_df(user, cohort)
         if df.empty:
             return {
                 "total_entries": 0,
                 "unique_days": 0
             }
 
-        unique_days = df["timestamp"].dt.date.nunique()
+        _, offset = self._day_index(df)
+        unique_days = int(np.unique(offset).size)
 
         return {
             "total_entries": len(df),
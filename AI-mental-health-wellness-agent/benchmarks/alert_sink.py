@@ -0,0 +1,128 @@
+# benchmarks/alert_sink.py
+
+"""
+Alert Sink
+----------
+Local stand-in for the on-call webhook, so crisis-alert delivery
+(src/agent/crisis_outbox.py) can be tested offline.
+
+- POST /alerts  records the JSON body and answers 204
+- Optional injected 503 responses and latency, to exercise retries/backoff
+- received: every alert accepted, in arrival order (duplicates included)
+
+Run:
+    python -m benchmarks.alert_sink --port 8766 --fail-rate 0.3
+
+Then add a webhook target with url "http://127.0.0.1:8766/alerts" to the
+`crisis_alerts` section of config/agent.yaml (or use
+benchmarks/crisis_alerts.py, which starts its own sink).
+"""
+
+import argparse
+import json
+import random
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, status: int):
+        self.send_response(status)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        body = self.rfile.read(length)
+        server = self.server
+
+        if self.path != "/alerts":
+            self._reply(404)
+            return
+        if server.latency_ms:
+            time.sleep(server.latency_ms / 1000.0)
+        if server.should_fail():
+            self._reply(503)
+            return
+
+        try:
+            alert = json.loads(body)
+        except ValueError:
+            self._reply(400)
+            return
+
+        server.record(alert, self.headers.get("Idempotency-Key"))
+        self._reply(204)
+
+
+class AlertSink(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, host="127.0.0.1", port=8766, fail_rate=0.0, latency_ms=0.0, seed=0, verbose=False):
+        super().__init__((host, port), _Handler)
+        self.fail_rate = fail_rate
+        self.latency_ms = latency_ms
+        self.verbose = verbose
+        self.received = []
+        self.rejected = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/alerts"
+
+    def should_fail(self) -> bool:
+        with self._lock:
+            if self.fail_rate and self._rng.random() < self.fail_rate:
+                self.rejected += 1
+                return True
+            return False
+
+    def record(self, alert: dict, idempotency_key: str = None):
+        with self._lock:
+            self.received.append(alert)
+        if self.verbose:
+            print(f"alert {alert.get('id')} user={alert.get('user_id')} attempt={alert.get('attempt')}")
+
+    def start(self):
+        """Serve in a background thread (for benchmarks)."""
+        thread = threading.Thread(target=self.serve_forever, daemon=True)
+        thread.start()
+        return thread
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run a local crisis-alert webhook receiver.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--fail-rate", type=float, default=0.0)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    server = AlertSink(args.host, args.port, fail_rate=args.fail_rate,
+                       latency_ms=args.latency_ms, seed=args.seed, verbose=True)
+    print(f"Alert sink listening on {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
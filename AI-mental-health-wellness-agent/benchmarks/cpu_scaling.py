@@ -0,0 +1,99 @@
+# benchmarks/cpu_scaling.py
+
+"""
+CPU Stage Scaling
+-----------------
+Pushes synthetic messages through the CPU-bound stages (keyword mood,
+Hindi translation) from a pool of client threads, the way a threaded
+server would, and compares:
+
+- inline:           stages run in the client threads (GIL-bound)
+- process (N):      CPUExecutor warm process pool with N workers, calls
+                    batched by the dispatcher
+
+for N = 1, 2, 4, ... up to the core count. Throughput should grow with N
+on a multi-core host, while inline stays flat however many threads run.
+
+Run from the project root:
+    python -m benchmarks.cpu_scaling --messages 20000 --threads 16
+"""
+
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.load_replay import latency_summary, synthetic_messages
+from src.pipelines.cpu_executor import CPUExecutor
+
+
+STAGE_MIX = ("keyword_mood", "translate_hi")
+
+
+def drive(executor: CPUExecutor, messages, threads: int) -> dict:
+    """Each message runs every stage in STAGE_MIX; returns throughput + latency."""
+    latencies = []
+
+    def handle(text):
+        t0 = time.perf_counter()
+        futures = [executor.submit(stage, text) for stage in STAGE_MIX]
+        for f in futures:
+            f.result()
+        latencies.append(time.perf_counter() - t0)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(handle, messages))
+    elapsed = time.perf_counter() - start
+
+    return {
+        "seconds": round(elapsed, 3),
+        "messages_per_s": round(len(messages) / elapsed, 1),
+        "latency": latency_summary(latencies),
+    }
+
+
+def worker_levels(max_workers: int):
+    n, levels = 1, []
+    while n < max_workers:
+        levels.append(n)
+        n *= 2
+    return levels + [max_workers]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure CPU-stage throughput across cores.")
+    parser.add_argument("--messages", type=int, default=20000)
+    parser.add_argument("--threads", type=int, default=16, help="client threads")
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--max-wait-ms", type=float, default=2.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    # long-ish messages so each stage does real work
+    messages = [" ".join(m) for m in zip(*[synthetic_messages(args.messages, seed=args.seed + i)
+                                           for i in range(4)])]
+
+    report = {"cores": os.cpu_count(), "messages": len(messages), "threads": args.threads, "runs": []}
+
+    inline = CPUExecutor(mode="inline")
+    report["runs"].append({"mode": "inline", **drive(inline, messages, args.threads)})
+
+    for workers in worker_levels(args.max_workers):
+        executor = CPUExecutor(mode="process", workers=workers, batch_size=args.batch_size,
+                               max_wait_ms=args.max_wait_ms)
+        executor.warm()
+        result = drive(executor, messages, args.threads)
+        result["batches"] = executor.stats["batches"]
+        result["calls_per_batch"] = round(executor.stats["calls"] / max(executor.stats["batches"], 1), 1)
+        executor.shutdown()
+        report["runs"].append({"mode": "process", "workers": workers, **result})
+
+    print(json.dumps(report, indent=2))
+    return report
+
+
+if __name__ == "__main__":
+    main()
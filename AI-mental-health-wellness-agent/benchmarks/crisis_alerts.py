@@ -0,0 +1,114 @@
+# benchmarks/crisis_alerts.py
+
+"""
+Crisis-Alert Outbox Benchmark
+-----------------------------
+Exercises src/agent/crisis_outbox.py against the local webhook stand-in
+(benchmarks/alert_sink.py) with injected failures.
+
+1. enqueue latency on the request path (the cost a crisis reply pays)
+2. delivery: every distinct student/session alerted exactly once per
+   dedupe window despite repeats, retries and backoff
+3. restart: alerts enqueued while no dispatcher runs are delivered by the
+   next outbox started on the same directory
+
+Run from the project root:
+    python -m benchmarks.crisis_alerts --alerts 2000 --fail-rate 0.3
+"""
+
+import argparse
+import json
+import tempfile
+import time
+
+from benchmarks.alert_sink import AlertSink
+from benchmarks.load_replay import percentile
+from src.agent.crisis_outbox import CrisisOutbox, WebhookTarget
+
+
+MESSAGE = "I keep thinking about how to end my life"
+
+
+def make_outbox(outbox_dir: str, url: str) -> CrisisOutbox:
+    return CrisisOutbox([WebhookTarget(url, timeout_s=2.0)], outbox_dir=outbox_dir,
+                        max_attempts=20, backoff_base_s=0.01, backoff_max_s=0.2, poll_s=0.05)
+
+
+def bench_enqueue(outbox: CrisisOutbox, alerts: int, students: int) -> dict:
+    """Enqueue `alerts` messages spread over `students` sessions (repeats are deduped)."""
+    latencies = {"queued": [], "deduped": []}
+    for i in range(alerts):
+        t0 = time.perf_counter()
+        alert_id = outbox.enqueue(f"student-{i % students}", MESSAGE, session_id="s1")
+        latencies["queued" if alert_id else "deduped"].append(time.perf_counter() - t0)
+
+    us = lambda v: round(v * 1e6, 1)
+    report = {}
+    for kind, values in latencies.items():
+        values.sort()
+        if values:
+            report[kind] = {
+                "count": len(values),
+                "p50_us": us(percentile(values, 50)),
+                "p99_us": us(percentile(values, 99)),
+                "max_us": us(values[-1]),
+            }
+    return report
+
+
+def run(alerts: int, students: int, fail_rate: float, seed: int = 0) -> dict:
+    sink = AlertSink(port=0, fail_rate=fail_rate, seed=seed)
+    sink.start()
+    report = {"alerts": alerts, "students": students, "fail_rate": fail_rate}
+
+    try:
+        with tempfile.TemporaryDirectory() as outbox_dir:
+            outbox = make_outbox(outbox_dir, sink.url).start()
+            report["enqueue"] = bench_enqueue(outbox, alerts, students)
+
+            start = time.perf_counter()
+            drained = outbox.drain(timeout=60)
+            report["delivery"] = {
+                "drained": drained,
+                "seconds": round(time.perf_counter() - start, 3),
+                "webhook_503s": sink.rejected,
+                "received": len(sink.received),
+                "distinct_students": len({a["user_id"] for a in sink.received}),
+                **outbox.snapshot(),
+            }
+            outbox.stop()
+
+            # restart: queue without a dispatcher, then let a fresh outbox deliver
+            before = len(sink.received)
+            offline = make_outbox(outbox_dir, sink.url)
+            for i in range(10):
+                offline.enqueue(f"late-student-{i}", MESSAGE, session_id="s2")
+            restarted = make_outbox(outbox_dir, sink.url).start()
+            report["restart"] = {
+                "drained": restarted.drain(timeout=30),
+                "recovered": restarted.snapshot().get("recovered", 0),
+                "delivered_after_restart": len(sink.received) - before,
+            }
+            restarted.stop()
+    finally:
+        sink.shutdown()
+        sink.server_close()
+
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the crisis-alert outbox.")
+    parser.add_argument("--alerts", type=int, default=2000)
+    parser.add_argument("--students", type=int, default=200)
+    parser.add_argument("--fail-rate", type=float, default=0.3)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    report = run(args.alerts, args.students, args.fail_rate, args.seed)
+    print(json.dumps(report, indent=2))
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+# benchmarks/crisis_latency.py
+
+"""
+Crisis Latency Under Load
+-------------------------
+Drives PriorityScheduler with rising levels of normal traffic (StubLLM
+latency) and interleaves crisis messages at a fixed rate, then reports
+crisis-path latency per load level.
+
+The crisis p99 should stay flat as normal load grows: crisis replies are
+answered at admission and never queue behind LLM work.
+
+Run from the project root:
+    python -m benchmarks.crisis_latency --levels 10 50 200 --duration 5
+"""
+
+import argparse
+import json
+import random
+import time
+
+from benchmarks.load_replay import build_pipeline, latency_summary, synthetic_messages
+from benchmarks.stub_llm import StubLLM, LATENCY_DISTRIBUTIONS
+from src.pipelines.scheduler import PriorityScheduler
+
+
+CRISIS_MESSAGES = [
+    "I want to die, nothing matters anymore",
+    "I keep thinking about how to end my life",
+    "I might hurt myself tonight",
+    "honestly I can't live like this",
+]
+
+
+def run_level(scheduler, normal_rate: float, crisis_rate: float, duration: float, seed: int = 0) -> dict:
+    """Offer normal + crisis traffic for `duration` seconds at the given rates."""
+    rng = random.Random(seed)
+    normal = synthetic_messages(int(normal_rate * duration) + 1, seed=seed)
+
+    events = [(i / normal_rate, False) for i in range(int(normal_rate * duration))]
+    events += [(i / crisis_rate, True) for i in range(int(crisis_rate * duration))]
+    events.sort()
+
+    crisis_latencies, futures = [], []
+    start = time.perf_counter()
+
+    for offset, is_crisis in events:
+        delay = start + offset - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+
+        t0 = time.perf_counter()
+        if is_crisis:
+            reply = scheduler.submit(rng.choice(CRISIS_MESSAGES)).result()
+            crisis_latencies.append(time.perf_counter() - t0)
+            assert reply["safe"] is False
+        else:
+            futures.append(scheduler.submit(next(normal)))
+
+    backlog = sum(1 for f in futures if not f.done())
+    for f in futures:
+        try:
+            f.result()
+        except Exception:
+            pass
+
+    return {
+        "normal_rate": normal_rate,
+        "crisis_rate": crisis_rate,
+        "normal_backlog_at_end": backlog,
+        "crisis_latency": latency_summary(crisis_latencies),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure crisis-path latency under rising normal load.")
+    parser.add_argument("--levels", type=float, nargs="+", default=[10, 50, 200],
+                        help="normal arrivals per second, one run per level")
+    parser.add_argument("--crisis-rate", type=float, default=5.0)
+    parser.add_argument("--duration", type=float, default=5.0, help="seconds per level")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--latency", choices=LATENCY_DISTRIBUTIONS, default="lognormal")
+    parser.add_argument("--latency-ms", type=float, default=300.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    llm = StubLLM(latency=args.latency, latency_ms=args.latency_ms, seed=args.seed)
+    report = []
+
+    for level in args.levels:
+        scheduler = PriorityScheduler(build_pipeline(llm), workers=args.workers)
+        result = run_level(scheduler, level, args.crisis_rate, args.duration, seed=args.seed)
+        result["scheduler"] = scheduler.crisis_stats()
+        scheduler.shutdown(wait=False)
+        report.append(result)
+
+    print(json.dumps(report, indent=2))
+    return report
+
+
+if __name__ == "__main__":
+    main()
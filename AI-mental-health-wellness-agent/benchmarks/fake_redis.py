@@ -0,0 +1,186 @@
+# benchmarks/fake_redis.py
+
+"""
+Fake Redis Server
+-----------------
+In-process Redis-protocol (RESP2) server covering the commands that
+RedisBackend (src/utils/state_backend.py) sends, so the shared-state
+path can be exercised offline without a Redis install.
+
+Commands: PING AUTH SELECT HGET HSET HGETALL HDEL DEL SETNX APPEND
+          GETRANGE STRLEN FLUSHDB DBSIZE
+
+Run:
+    python -m benchmarks.fake_redis --port 6379
+
+Then set `state.backend: "redis"` in config/agent.yaml (or use
+benchmarks/state_backends.py, which starts its own server).
+"""
+
+import argparse
+import socket
+import socketserver
+import threading
+
+from src.utils.state_backend import read_reply
+
+
+def _simple(text: str) -> bytes:
+    return b"+%s\r\n" % text.encode("utf-8")
+
+
+def _error(text: str) -> bytes:
+    return b"-%s\r\n" % text.encode("utf-8")
+
+
+def _int(n: int) -> bytes:
+    return b":%d\r\n" % n
+
+
+def _bulk(data) -> bytes:
+    if data is None:
+        return b"$-1\r\n"
+    return b"$%d\r\n%s\r\n" % (len(data), data)
+
+
+def _array(items) -> bytes:
+    return b"*%d\r\n" % len(items) + b"".join(_bulk(i) for i in items)
+
+
+WRONGTYPE = "WRONGTYPE Operation against a key holding the wrong kind of value"
+
+
+class _Handler(socketserver.StreamRequestHandler):
+
+    def setup(self):
+        super().setup()
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def handle(self):
+        while True:
+            try:
+                command = read_reply(self.rfile)
+            except (ConnectionError, OSError):
+                return
+            if not isinstance(command, list) or not command:
+                self.wfile.write(_error("ERR protocol error"))
+                return
+
+            self.server.commands += 1
+            self.wfile.write(self.server.dispatch(command[0].decode().upper(), command[1:]))
+
+
+class FakeRedisServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, host="127.0.0.1", port=6379):
+        super().__init__((host, port), _Handler)
+        self.data = {}                  # key -> bytearray (string) or dict (hash)
+        self.commands = 0
+        self._lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"redis://{host}:{port}/0"
+
+    def start(self):
+        """Serve in a background thread (for benchmarks)."""
+        thread = threading.Thread(target=self.serve_forever, daemon=True)
+        thread.start()
+        return thread
+
+    def _typed(self, key, kind):
+        value = self.data.get(key)
+        if value is not None and not isinstance(value, kind):
+            raise TypeError
+        return value
+
+    def dispatch(self, name: str, args) -> bytes:
+        with self._lock:
+            try:
+                return self._dispatch(name, args)
+            except TypeError:
+                return _error(WRONGTYPE)
+            except (IndexError, ValueError):
+                return _error(f"ERR wrong arguments for '{name.lower()}' command")
+
+    def _dispatch(self, name: str, args) -> bytes:
+        if name == "PING":
+            return _simple("PONG")
+        if name in ("AUTH", "SELECT"):
+            return _simple("OK")
+        if name == "FLUSHDB":
+            self.data.clear()
+            return _simple("OK")
+        if name == "DBSIZE":
+            return _int(len(self.data))
+
+        if name == "HGET":
+            h = self._typed(args[0], dict) or {}
+            return _bulk(h.get(args[1]))
+        if name == "HSET":
+            h = self._typed(args[0], dict)
+            if h is None:
+                h = self.data[args[0]] = {}
+            pairs = list(zip(args[1::2], args[2::2]))
+            if not pairs or len(args) % 2 == 0:
+                raise ValueError
+            added = sum(field not in h for field, _ in pairs)
+            h.update(pairs)
+            return _int(added)
+        if name == "HGETALL":
+            h = self._typed(args[0], dict) or {}
+            return _array([x for kv in h.items() for x in kv])
+        if name == "HDEL":
+            h = self._typed(args[0], dict) or {}
+            removed = sum(h.pop(f, None) is not None for f in args[1:])
+            if args[0] in self.data and not h:
+                del self.data[args[0]]
+            return _int(removed)
+        if name == "DEL":
+            return _int(sum(self.data.pop(k, None) is not None for k in args))
+
+        if name == "SETNX":
+            if args[0] in self.data:
+                return _int(0)
+            self.data[args[0]] = bytearray(args[1])
+            return _int(1)
+        if name == "APPEND":
+            s = self._typed(args[0], bytearray)
+            if s is None:
+                s = self.data[args[0]] = bytearray()
+            s += args[1]
+            return _int(len(s))
+        if name == "GETRANGE":
+            s = self._typed(args[0], bytearray) or bytearray()
+            start, end = int(args[1]), int(args[2])
+            n = len(s)
+            start = max(start + n, 0) if start < 0 else start
+            end = end + n if end < 0 else min(end, n - 1)
+            return _bulk(bytes(s[start:end + 1]) if start <= end else b"")
+        if name == "STRLEN":
+            return _int(len(self._typed(args[0], bytearray) or b""))
+
+        return _error(f"ERR unknown command '{name.lower()}'")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run an in-process fake Redis server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=6379)
+    args = parser.parse_args(argv)
+
+    server = FakeRedisServer(args.host, args.port)
+    print(f"Fake Redis listening on {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+# benchmarks/journal_lsh.py
+
+"""
+Journal LSH Benchmark
+---------------------
+Builds a JournalIndex over N synthetic journal entries (default 1M) and
+compares similar-entry lookups against a brute-force scan.
+
+Reports:
+- build time and entries / second
+- query latency percentiles and candidates examined per query
+- best-match recall against exact Jaccard on a sample of queries (brute force is
+  only run for those, on a capped slice of the corpus)
+
+Run from the project root:
+    python -m benchmarks.journal_lsh --entries 1000000 --queries 200
+"""
+
+import argparse
+import json
+import random
+import time
+
+import numpy as np
+
+from benchmarks.load_replay import latency_summary
+from src.tools.journal_index import JournalIndex, _band_hashes, shingles
+
+
+SUBJECTS = ["exam", "presentation", "roommate", "assignment", "internship", "parents",
+            "deadline", "project", "interview", "hostel", "semester", "lab report",
+            "group work", "placement", "viva", "friend", "coach", "scholarship"]
+FEELINGS = ["stressed", "anxious", "tired", "overwhelmed", "nervous", "sad", "angry",
+            "lonely", "calm", "happy", "confused", "frustrated", "hopeful", "restless"]
+DETAILS = ["couldn't sleep last night", "skipped breakfast again", "talked to my sister",
+           "went for a long walk", "stayed up revising", "had a headache all day",
+           "felt better after music", "argued on the phone", "missed the bus",
+           "finished half the chapters", "cried a little", "laughed with friends",
+           "kept checking my phone", "ate dinner alone", "practised the slides twice"]
+WHEN = ["today", "this morning", "tonight", "before class", "after the lecture",
+        "on the weekend", "all week"]
+
+
+def synthetic_entry(rng: random.Random) -> str:
+    return (f"{rng.choice(WHEN).capitalize()} I felt {rng.choice(FEELINGS)} about the "
+            f"{rng.choice(SUBJECTS)} and {rng.choice(DETAILS)}. "
+            f"Also {rng.choice(DETAILS)} because of the {rng.choice(SUBJECTS)}.")
+
+
+def jaccard(a: set, b: set) -> float:
+    return len(a & b) / len(a | b) if a or b else 0.0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark MinHash/LSH journal retrieval.")
+    parser.add_argument("--entries", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("-k", type=int, default=3)
+    parser.add_argument("--brute-cap", type=int, default=200_000,
+                        help="entries scanned by the brute-force baseline")
+    parser.add_argument("--batch", type=int, default=10_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    index = JournalIndex()
+
+    start = time.perf_counter()
+    for done in range(0, args.entries, args.batch):
+        n = min(args.batch, args.entries - done)
+        index.add_many((None, synthetic_entry(rng)) for _ in range(n))
+    build_s = time.perf_counter() - start
+
+    queries = [synthetic_entry(rng) for _ in range(args.queries)]
+
+    latencies, candidates = [], []
+    results = []
+    for q in queries:
+        t0 = time.perf_counter()
+        found = index.similar(q, k=args.k, min_similarity=0.0)
+        latencies.append(time.perf_counter() - t0)
+        results.append(found)
+
+        bands = _band_hashes(index.hasher.signature(q)[None, :])[0]
+        candidates.append(index._candidates(bands).size)
+
+    # brute-force baseline on a capped prefix of the corpus
+    cap = min(args.brute_cap, len(index))
+    corpus = [shingles(text) for _, text in index.entries[:cap]]
+    sample = queries[:min(20, len(queries))]
+
+    recall_hits, brute_latencies = 0, []
+    for q, found in zip(sample, results):
+        qs = shingles(q)
+        t0 = time.perf_counter()
+        scores = np.fromiter((jaccard(qs, s) for s in corpus), dtype=np.float64, count=cap)
+        brute_latencies.append(time.perf_counter() - t0)
+
+        best = scores.max() if cap else 0.0
+        # a hit: LSH's best result is (one of) the exact best within the prefix,
+        # or is at least as similar as it
+        lsh_best = max((jaccard(qs, shingles(f["text"])) for f in found), default=0.0)
+        recall_hits += lsh_best >= best - 1e-9
+
+    report = {
+        "entries": len(index),
+        "build_s": round(build_s, 2),
+        "build_entries_per_s": round(len(index) / build_s, 1) if build_s else 0.0,
+        "query_latency": latency_summary(latencies),
+        "candidates_per_query": {
+            "mean": round(float(np.mean(candidates)), 1) if candidates else 0.0,
+            "max": int(np.max(candidates)) if candidates else 0,
+        },
+        "brute_force": {
+            "scanned": cap,
+            "latency": latency_summary(brute_latencies),
+            "best_match_recall": round(recall_hits / len(sample), 3) if sample else 0.0,
+        },
+    }
+    print(json.dumps(report, indent=2))
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+# benchmarks/llm_throughput.py
+
+"""
+LLM Client Throughput
+---------------------
+Drives LLMClient against the local mock server to measure what the
+transport layer sustains: requests/second, latency percentiles,
+connection reuse, retries and breaker trips.
+
+Run from the project root:
+    python -m benchmarks.llm_throughput --threads 32 --requests 2000 \\
+        --max-concurrency 16 --latency-ms 50 --fail-rate 0.02
+"""
+
+import argparse
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.load_replay import latency_summary, synthetic_messages
+from benchmarks.mock_llm_server import MockLLMServer
+from benchmarks.stub_llm import StubLLM, LATENCY_DISTRIBUTIONS
+from src.llm.client import LLMClient, LLMError
+from src.llm.providers import MockProvider
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure LLMClient throughput against the mock server.")
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--max-concurrency", type=int, default=8)
+    parser.add_argument("--pool-size", type=int, default=8)
+    parser.add_argument("--max-retries", type=int, default=3)
+    parser.add_argument("--latency", choices=LATENCY_DISTRIBUTIONS, default="fixed")
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--jitter-ms", type=float, default=10.0)
+    parser.add_argument("--fail-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    stub = StubLLM(latency=args.latency, latency_ms=args.latency_ms,
+                   jitter_ms=args.jitter_ms, seed=args.seed)
+    server = MockLLMServer(port=0, llm=stub, fail_rate=args.fail_rate, seed=args.seed)
+    server.start()
+
+    client = LLMClient(
+        MockProvider(model_name="mock", base_url=server.base_url),
+        max_concurrency=args.max_concurrency,
+        pool_size=args.pool_size,
+        max_retries=args.max_retries,
+        backoff_base_s=0.01,
+        backoff_max_s=0.1,
+    )
+
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+
+    def one(message):
+        start = time.perf_counter()
+        try:
+            client.complete(message)
+        except LLMError as e:
+            with lock:
+                errors.append(type(e).__name__)
+            return
+        with lock:
+            latencies.append(time.perf_counter() - start)
+
+    messages = list(synthetic_messages(args.requests, seed=args.seed))
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.threads) as pool:
+        list(pool.map(one, messages))
+    duration = time.perf_counter() - start
+
+    report = {
+        "requests": args.requests,
+        "duration_s": round(duration, 3),
+        "throughput_rps": round(len(latencies) / duration, 2) if duration else 0.0,
+        "latency": latency_summary(latencies),
+        "errors": len(errors),
+        "client": client.snapshot(),
+    }
+    print(json.dumps(report, indent=2))
+
+    client.close()
+    server.shutdown()
+    server.server_close()
+    return report
+
+
+if __name__ == "__main__":
+    main()
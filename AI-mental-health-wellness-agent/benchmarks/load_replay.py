@@ -0,0 +1,307 @@
+# benchmarks/load_replay.py
+
+"""
+Load Replay Harness
+-------------------
+Replays realistic traffic through WellnessPipeline at a fixed arrival rate
+and concurrency, using the deterministic StubLLM so runs are offline and
+repeatable. With --cassette the real LLM client is used instead, replaying
+recorded production responses and latencies (src/llm/cassette.py).
+
+Traffic sources:
+- synthetic : messages built from data/emotions.json signals
+- corpus    : entries parsed from a journal file (store_journal_entry format)
+
+Reports:
+- throughput (completed requests / second)
+- latency percentiles (p50, p90, p95, p99, max)
+- error rate and error types
+- file-I/O counts (open() calls by mode and by path)
+
+Run from the project root:
+    python -m benchmarks.load_replay --rate 50 --concurrency 8 --requests 500
+    python -m benchmarks.load_replay --source corpus \\
+        --corpus streamlit_app/data/journal_entries.txt --latency lognormal
+    python -m benchmarks.load_replay --cassette data/cassettes/llm.jsonl.gz \\
+        --cassette-mode record      # once, against the configured provider
+    python -m benchmarks.load_replay --cassette data/cassettes/llm.jsonl.gz
+"""
+
+import argparse
+import builtins
+import json
+import os
+import random
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.stub_llm import StubLLM, LATENCY_DISTRIBUTIONS, EMOTIONS_FILE
+
+
+DEFAULT_CORPUS = os.path.join("streamlit_app", "data", "journal_entries.txt")
+
+SYNTHETIC_TEMPLATES = [
+    "I have been {signal} all week because of exams.",
+    "Honestly I'm {signal} and I don't know what to do.",
+    "Today I felt {signal} after my presentation.",
+    "My roommate and I argued, now I'm {signal}.",
+    "Just checking in, feeling {signal}.",
+]
+
+
+# -----------------------------------------------------------
+# Traffic sources
+# -----------------------------------------------------------
+def synthetic_messages(count: int, seed: int = 0, emotions_file: str = EMOTIONS_FILE):
+    """Yield `count` synthetic messages seeded from emotions.json signals."""
+    with open(emotions_file, "r", encoding="utf-8") as f:
+        emotions = json.load(f)
+
+    signals = [s for info in emotions.values() for s in info.get("signals", [])]
+    rng = random.Random(seed)
+
+    for _ in range(count):
+        template = rng.choice(SYNTHETIC_TEMPLATES)
+        yield template.format(signal=rng.choice(signals))
+
+
+def corpus_messages(path: str, count: int):
+    """Yield `count` messages cycling over entries of a journal file."""
+    with open(path, "r", encoding="utf-8") as f:
+        content = f.read()
+
+    entries = []
+    for block in content.split("-" * 50):
+        lines = [l.strip() for l in block.strip().splitlines() if l.strip()]
+        # drop the "[timestamp]" header line
+        if lines and lines[0].startswith("[") and lines[0].endswith("]"):
+            lines = lines[1:]
+        if lines:
+            entries.append(" ".join(lines))
+
+    if not entries:
+        raise ValueError(f"No journal entries found in {path}")
+
+    for i in range(count):
+        yield entries[i % len(entries)]
+
+
+# -----------------------------------------------------------
+# File-I/O accounting
+# -----------------------------------------------------------
+class IOCounter:
+    """
+    Context manager that counts builtins.open() calls process-wide.
+    Counts are keyed by mode ("read"/"write") and by path.
+    """
+
+    def __init__(self):
+        self.by_mode = Counter()
+        self.by_path = Counter()
+        self._lock = threading.Lock()
+        self._original = None
+
+    def __enter__(self):
+        self._original = builtins.open
+        original = self._original
+
+        def counting_open(file, mode="r", *args, **kwargs):
+            kind = "read" if mode.startswith("r") and "+" not in mode else "write"
+            with self._lock:
+                self.by_mode[kind] += 1
+                self.by_path[str(file)] += 1
+            return original(file, mode, *args, **kwargs)
+
+        builtins.open = counting_open
+        return self
+
+    def __exit__(self, *exc):
+        builtins.open = self._original
+        return False
+
+    def summary(self, total_requests: int) -> dict:
+        total = sum(self.by_mode.values())
+        return {
+            "opens": total,
+            "reads": self.by_mode["read"],
+            "writes": self.by_mode["write"],
+            "opens_per_request": round(total / total_requests, 3) if total_requests else 0,
+            "by_path": dict(self.by_path.most_common(10)),
+        }
+
+
+# -----------------------------------------------------------
+# Stats
+# -----------------------------------------------------------
+def percentile(sorted_values, pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(int(round(pct / 100.0 * len(sorted_values) + 0.5)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+def latency_summary(latencies) -> dict:
+    values = sorted(latencies)
+    ms = lambda v: round(v * 1000, 2)
+    return {
+        "p50_ms": ms(percentile(values, 50)),
+        "p90_ms": ms(percentile(values, 90)),
+        "p95_ms": ms(percentile(values, 95)),
+        "p99_ms": ms(percentile(values, 99)),
+        "max_ms": ms(values[-1]) if values else 0.0,
+        "mean_ms": ms(sum(values) / len(values)) if values else 0.0,
+    }
+
+
+# -----------------------------------------------------------
+# Replay
+# -----------------------------------------------------------
+def replay(pipeline, messages, rate: float = 10.0, concurrency: int = 4,
+           lang: str = "en", arrivals: str = "constant", seed: int = 0) -> dict:
+    """
+    Replay messages through pipeline.run() with an open-loop arrival schedule.
+
+    rate:        target arrivals per second (0 = as fast as possible)
+    concurrency: worker threads serving requests
+    arrivals:    "constant" spacing or "poisson" (exponential gaps)
+
+    Latency is measured from scheduled arrival, so queueing delay is included
+    when the pipeline cannot keep up with the offered rate.
+    """
+    messages = list(messages)
+    rng = random.Random(seed)
+
+    latencies = []
+    errors = Counter()
+    lock = threading.Lock()
+
+    def handle(message, scheduled):
+        try:
+            pipeline.run(message, lang=lang)
+            ok = True
+        except Exception as e:
+            ok = False
+            with lock:
+                errors[type(e).__name__] += 1
+        elapsed = time.perf_counter() - scheduled
+        if ok:
+            with lock:
+                latencies.append(elapsed)
+
+    io = IOCounter()
+    with io, ThreadPoolExecutor(max_workers=concurrency) as pool:
+        start = time.perf_counter()
+        next_at = start
+
+        for message in messages:
+            now = time.perf_counter()
+            if next_at > now:
+                time.sleep(next_at - now)
+            pool.submit(handle, message, next_at)
+
+            if rate > 0:
+                gap = rng.expovariate(rate) if arrivals == "poisson" else 1.0 / rate
+                next_at += gap
+            else:
+                next_at = time.perf_counter()
+
+        pool.shutdown(wait=True)
+        duration = time.perf_counter() - start
+
+    total = len(messages)
+    failed = sum(errors.values())
+
+    return {
+        "requests": total,
+        "completed": total - failed,
+        "duration_s": round(duration, 3),
+        "offered_rate": rate,
+        "throughput_rps": round((total - failed) / duration, 2) if duration else 0.0,
+        "latency": latency_summary(latencies),
+        "error_rate": round(failed / total, 4) if total else 0.0,
+        "errors": dict(errors),
+        "file_io": io.summary(total),
+    }
+
+
+def build_pipeline(llm):
+    """Default pipeline factory; overridable for experiments."""
+    from src.pipelines.wellness_pipeline import WellnessPipeline
+    return WellnessPipeline(llm=llm)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay load through WellnessPipeline with a stub LLM.")
+    parser.add_argument("--source", choices=("synthetic", "corpus"), default="synthetic")
+    parser.add_argument("--corpus", default=DEFAULT_CORPUS, help="journal file for --source corpus")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--rate", type=float, default=20.0, help="arrivals per second (0 = unthrottled)")
+    parser.add_argument("--arrivals", choices=("constant", "poisson"), default="constant")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--lang", default="en")
+    parser.add_argument("--latency", choices=LATENCY_DISTRIBUTIONS, default="lognormal")
+    parser.add_argument("--latency-ms", type=float, default=300.0)
+    parser.add_argument("--jitter-ms", type=float, default=100.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--cassette", help="use the real LLM client with this cassette file")
+    parser.add_argument("--cassette-mode", choices=("record", "replay"), default="replay")
+    parser.add_argument("--time-scale", type=float, default=1.0,
+                        help="replay: recorded latency multiplier (0 = no delay)")
+    parser.add_argument("--output", help="write the JSON report to this path")
+    args = parser.parse_args(argv)
+
+    if args.cassette:
+        from src.llm.cassette import Cassette
+        from src.llm.client import get_client
+
+        # the process-wide client, so detect_mood is covered too
+        llm = get_client()
+        llm.cassette = Cassette(args.cassette, mode=args.cassette_mode, time_scale=args.time_scale)
+    else:
+        llm = StubLLM(
+            latency=args.latency,
+            latency_ms=args.latency_ms,
+            jitter_ms=args.jitter_ms,
+            error_rate=args.error_rate,
+            seed=args.seed,
+        )
+    pipeline = build_pipeline(llm)
+
+    if args.source == "corpus":
+        messages = corpus_messages(args.corpus, args.requests)
+    else:
+        messages = synthetic_messages(args.requests, seed=args.seed)
+
+    report = replay(
+        pipeline,
+        messages,
+        rate=args.rate,
+        concurrency=args.concurrency,
+        lang=args.lang,
+        arrivals=args.arrivals,
+        seed=args.seed,
+    )
+    if hasattr(pipeline, "latency_stats"):
+        report["latency_budget"] = pipeline.latency_stats()
+    if args.cassette:
+        llm.close()
+        report["llm"] = llm.snapshot()
+    else:
+        report["llm_calls"] = llm.calls
+
+    text = json.dumps(report, indent=2)
+    print(text)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+# benchmarks/mock_llm_server.py
+
+"""
+Mock LLM Server
+---------------
+Local OpenAI-compatible endpoint backed by StubLLM, so the real HTTP
+client (src/llm/client.py) can be measured offline.
+
+- POST /v1/chat/completions  (OpenAI response shape)
+- HTTP/1.1 keep-alive, one thread per connection
+- Optional injected 429/503 responses to exercise retries and the breaker
+
+Run:
+    python -m benchmarks.mock_llm_server --port 8765 --latency-ms 200
+
+Then set `provider: "mock"` in config/agent.yaml (or use
+benchmarks/llm_throughput.py, which starts its own server).
+"""
+
+import argparse
+import json
+import random
+import socket
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from benchmarks.stub_llm import StubLLM, LATENCY_DISTRIBUTIONS
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        # headers and body go out in separate writes; avoid Nagle stalls
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, status: int, payload: dict, headers=None):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length) or b"{}")
+        server = self.server
+
+        if server.fail_rate and server.rng.random() < server.fail_rate:
+            self._reply(503, {"error": "injected failure"}, {"Retry-After": "0"})
+            return
+
+        messages = request.get("messages", [])
+        prompt = messages[-1]["content"] if messages else ""
+        text = server.llm(prompt)
+
+        self._reply(200, {
+            "object": "chat.completion",
+            "model": request.get("model", "mock"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": text},
+                "finish_reason": "stop",
+            }],
+        })
+
+
+class MockLLMServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, host="127.0.0.1", port=8765, llm=None, fail_rate=0.0, seed=0):
+        super().__init__((host, port), _Handler)
+        self.llm = llm or StubLLM(latency="none")
+        self.fail_rate = fail_rate
+        self.rng = random.Random(seed)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        """Serve in a background thread (for benchmarks)."""
+        thread = threading.Thread(target=self.serve_forever, daemon=True)
+        thread.start()
+        return thread
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run a local OpenAI-compatible stub LLM server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", choices=LATENCY_DISTRIBUTIONS, default="lognormal")
+    parser.add_argument("--latency-ms", type=float, default=300.0)
+    parser.add_argument("--jitter-ms", type=float, default=100.0)
+    parser.add_argument("--fail-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    llm = StubLLM(latency=args.latency, latency_ms=args.latency_ms,
+                  jitter_ms=args.jitter_ms, seed=args.seed)
+    server = MockLLMServer(args.host, args.port, llm=llm, fail_rate=args.fail_rate, seed=args.seed)
+
+    print(f"Mock LLM listening on {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
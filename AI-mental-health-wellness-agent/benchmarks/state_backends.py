@@ -0,0 +1,132 @@
+# benchmarks/state_backends.py
+
+"""
+State Backend Benchmark
+-----------------------
+Drives the shared-state path of a request (cache lookup, mood log row with
+its user partition, session turn, cache write) through each backend from
+several "replicas" (independent backend instances / connection pools on
+the same store), then checks the replicas agree.
+
+- local  : files in a temp directory
+- sqlite : one database in a temp directory
+- redis  : the in-process fake (benchmarks/fake_redis.py), or a real
+           server with --redis-url
+
+Reports per backend: throughput, request latency percentiles, round trips
+per request (writes are batched, so this should be 2: one read + one
+flush), and whether every replica sees every row.
+
+Run from the project root:
+    python -m benchmarks.state_backends --requests 2000 --replicas 3
+"""
+
+import argparse
+import json
+import random
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from analytics.logger import AnalyticsLogger
+from benchmarks.fake_redis import FakeRedisServer
+from benchmarks.load_replay import latency_summary, synthetic_messages
+from src.agent.memory import SessionStore
+from src.utils.cache import CacheManager
+from src.utils.state_backend import create_backend
+
+
+def make_replicas(kind: str, count: int, workdir: str, redis_url: str):
+    if kind == "local":
+        return [create_backend("local", root=workdir) for _ in range(count)]
+    if kind == "sqlite":
+        return [create_backend("sqlite", path=f"{workdir}/state.db") for _ in range(count)]
+    return [create_backend("redis", url=redis_url) for _ in range(count)]
+
+
+def drive(backends, messages, threads: int, users: int, seed: int = 0) -> dict:
+    replicas = [
+        {
+            "backend": b,
+            "cache": CacheManager(backend=b),
+            "log": AnalyticsLogger(backend=b),
+            "sessions": SessionStore(backend=b),
+        }
+        for b in backends
+    ]
+    rng = random.Random(seed)
+    jobs = [(rng.randrange(len(replicas)), f"user-{rng.randrange(users)}", m) for m in messages]
+    latencies, lock = [], threading.Lock()
+
+    def handle(job):
+        replica_no, user, message = job
+        r = replicas[replica_no]
+        t0 = time.perf_counter()
+
+        cached = r["cache"].get(message)
+        with r["backend"].batched():
+            r["log"].log_mood("stressed", 0.8, message, user_id=user)
+            r["sessions"].add_turn(user, message, "stub reply")
+            if cached is None:
+                r["cache"].set(message, {"mood": "stressed"})
+
+        with lock:
+            latencies.append(time.perf_counter() - t0)
+
+    base = [dict(b.stats) for b in backends]
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(handle, jobs))
+    elapsed = time.perf_counter() - start
+
+    round_trips = sum(b.stats["round_trips"] - s.get("round_trips", 0) for b, s in zip(backends, base))
+    rows_seen = [len(r["log"].load_logs()) for r in replicas]
+
+    return {
+        "seconds": round(elapsed, 3),
+        "requests_per_s": round(len(jobs) / elapsed, 1) if elapsed else 0.0,
+        "latency": latency_summary(latencies),
+        "round_trips_per_request": round(round_trips / len(jobs), 2) if jobs else 0.0,
+        "rows_seen_by_each_replica": rows_seen,
+        "consistent": all(n == len(jobs) for n in rows_seen),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark shared-state backends.")
+    parser.add_argument("--backends", default="local,sqlite,redis")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--replicas", type=int, default=3)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--redis-url", help="real Redis server (default: in-process fake)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    messages = list(synthetic_messages(args.requests, seed=args.seed))
+    report = {"requests": args.requests, "replicas": args.replicas, "runs": {}}
+
+    server = None
+    redis_url = args.redis_url
+    if redis_url is None:
+        server = FakeRedisServer(port=0)
+        server.start()
+        redis_url = server.url
+
+    try:
+        for kind in args.backends.split(","):
+            with tempfile.TemporaryDirectory() as workdir:
+                backends = make_replicas(kind, args.replicas, workdir, redis_url)
+                report["runs"][kind] = drive(backends, messages, args.threads, args.users, args.seed)
+    finally:
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+
+    print(json.dumps(report, indent=2))
+    return report
+
+
+if __name__ == "__main__":
+    main()
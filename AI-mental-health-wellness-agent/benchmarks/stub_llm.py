@@ -0,0 +1,137 @@
+# benchmarks/stub_llm.py
+
+"""
+Stub LLM
+--------
+Deterministic stand-in for the real model, used for load testing and
+capacity planning without network access or API spend.
+
+- Same prompt + same seed -> same response
+- Mood prompts get a JSON answer based on data/emotions.json signals
+- Everything else gets a short supportive reply
+- Latency is drawn from a configurable distribution
+
+Usage:
+    llm = StubLLM(latency="lognormal", latency_ms=400, jitter_ms=150, seed=7)
+    pipeline = WellnessPipeline(llm=llm)
+"""
+
+import json
+import math
+import os
+import random
+import threading
+import time
+import zlib
+
+
+EMOTIONS_FILE = os.path.join("data", "emotions.json")
+
+LATENCY_DISTRIBUTIONS = ("none", "fixed", "uniform", "normal", "lognormal", "exponential")
+
+REPLIES = [
+    "Thanks for sharing that with me. It sounds like a lot to carry right now.",
+    "I hear you. Let's take this one small step at a time.",
+    "That makes sense. Would you like to try a short breathing exercise together?",
+    "It's okay to feel this way. What usually helps you feel a little lighter?",
+]
+
+
+class StubLLM:
+    """
+    Callable LLM stand-in: llm(prompt) -> str.
+
+    latency:     one of LATENCY_DISTRIBUTIONS
+    latency_ms:  mean (or fixed) latency in milliseconds
+    jitter_ms:   spread (uniform half-width / normal stddev / lognormal sigma in ms)
+    error_rate:  fraction of calls that raise RuntimeError
+    """
+
+    def __init__(self, latency="fixed", latency_ms=300.0, jitter_ms=100.0,
+                 error_rate=0.0, seed=0, emotions_file=EMOTIONS_FILE):
+        if latency not in LATENCY_DISTRIBUTIONS:
+            raise ValueError(f"Unknown latency distribution: {latency}")
+
+        self.latency = latency
+        self.latency_ms = float(latency_ms)
+        self.jitter_ms = float(jitter_ms)
+        self.error_rate = float(error_rate)
+
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.calls = 0
+
+        self.signals = {}
+        if os.path.exists(emotions_file):
+            with open(emotions_file, "r", encoding="utf-8") as f:
+                emotions = json.load(f)
+            for mood, info in emotions.items():
+                for signal in info.get("signals", []):
+                    self.signals[signal.lower()] = mood
+
+    # -----------------------------------------------------------
+    # Latency model
+    # -----------------------------------------------------------
+    def sample_latency(self) -> float:
+        """Return one latency sample in seconds."""
+        with self._lock:
+            rng = self._rng
+            mean, spread = self.latency_ms, self.jitter_ms
+
+            if self.latency == "none":
+                ms = 0.0
+            elif self.latency == "fixed":
+                ms = mean
+            elif self.latency == "uniform":
+                ms = rng.uniform(mean - spread, mean + spread)
+            elif self.latency == "normal":
+                ms = rng.gauss(mean, spread)
+            elif self.latency == "lognormal":
+                # Parameterised so the distribution mean equals latency_ms
+                sigma = math.sqrt(math.log(1 + (spread / mean) ** 2)) if mean > 0 else 0.0
+                mu = math.log(mean) - sigma ** 2 / 2 if mean > 0 else 0.0
+                ms = rng.lognormvariate(mu, sigma)
+            else:
+                ms = rng.expovariate(1.0 / mean) if mean > 0 else 0.0
+
+        return max(ms, 0.0) / 1000.0
+
+    # -----------------------------------------------------------
+    # Deterministic answers
+    # -----------------------------------------------------------
+    def classify(self, text: str) -> str:
+        """Keyword mood guess from emotions.json signals."""
+        text = text.lower()
+        for signal, mood in self.signals.items():
+            if signal in text:
+                return mood
+        return "neutral"
+
+    def respond(self, prompt: str) -> str:
+        digest = zlib.crc32(prompt.encode("utf-8"))
+
+        if '"mood"' in prompt or "emotion classifier" in prompt:
+            return json.dumps({
+                "mood": self.classify(prompt),
+                "confidence": round(0.5 + (digest % 50) / 100, 2),
+                "reason": "stub classification"
+            })
+
+        return REPLIES[digest % len(REPLIES)]
+
+    def __call__(self, prompt: str) -> str:
+        with self._lock:
+            self.calls += 1
+            fail = self.error_rate > 0 and self._rng.random() < self.error_rate
+
+        delay = self.sample_latency()
+        if delay:
+            time.sleep(delay)
+
+        if fail:
+            raise RuntimeError("stub LLM injected failure")
+
+        return self.respond(prompt)
+
+    # ADK-style tools call `.llm(prompt)`
+    llm = __call__
@@ -0,0 +1,166 @@
+# benchmarks/write_stress.py
+
+"""
+Concurrent Write Stress Test
+----------------------------
+Spawns N writer processes that append to the same emotion log and
+journal file (through AnalyticsLogger and store_journal_entry) while a
+reader process keeps loading the log, then verifies:
+
+- every CSV row parses into exactly 4 fields
+- every (writer, sequence) pair appears exactly once
+- every journal entry is a complete "[timestamp] / text / dashes" block
+- the reader never saw a malformed row
+
+Exits non-zero on any integrity failure; tests/test_write_stress.py runs
+a small version of it with pytest.
+
+Run from the project root:
+    python -m benchmarks.write_stress --writers 8 --rows 2000
+"""
+
+import argparse
+import csv
+import json
+import multiprocessing as mp
+import os
+import sys
+import tempfile
+import time
+
+
+def _writer(log_path, journal_path, writer_id, rows, barrier):
+    from analytics.logger import AnalyticsLogger
+    from src.tools.journal_tool import store_journal_entry
+
+    log = AnalyticsLogger(log_file=log_path)
+    barrier.wait()
+
+    # long, comma- and newline-heavy messages make interleaving visible
+    padding = "x, y; \"quoted\"\nline " * 20
+    for seq in range(rows):
+        log.log_mood("stressed", 0.5, f"w{writer_id}:{seq}|{padding}")
+        if seq % 10 == 0:
+            store_journal_entry(f"w{writer_id}:{seq}|{padding}", path=journal_path)
+
+
+def _reader(log_path, stop, result, barrier):
+    from analytics.logger import AnalyticsLogger
+
+    log = AnalyticsLogger(log_file=log_path)
+    loads, bad = 0, 0
+    barrier.wait()
+    while True:
+        for row in log.load_logs():
+            if None in row or len(row) != 4 or "|" not in (row.get("user_message") or ""):
+                bad += 1
+        loads += 1
+        if stop.is_set():
+            break
+    result.put({"loads": loads, "bad_rows_seen": bad})
+
+
+def verify_log(path, writers, rows):
+    seen = set()
+    problems = 0
+
+    with open(path, "r", newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        if len(header) != 4:
+            problems += 1
+        for row in reader:
+            if len(row) != 4:
+                problems += 1
+                continue
+            tag = row[3].split("|", 1)[0]
+            if tag in seen:
+                problems += 1
+            seen.add(tag)
+
+    expected = {f"w{w}:{s}" for w in range(writers) for s in range(rows)}
+    missing = len(expected - seen)
+    return {"rows": len(seen), "missing": missing, "malformed_or_duplicate": problems}
+
+
+def verify_journal(path, writers, rows):
+    with open(path, "r", encoding="utf-8") as f:
+        content = f.read()
+
+    blocks = [b.strip() for b in content.split("-" * 50) if b.strip()]
+    malformed = 0
+    for block in blocks:
+        lines = block.splitlines()
+        if not (lines[0].startswith("[") and lines[0].endswith("]")) or "|" not in lines[1]:
+            malformed += 1
+
+    expected = writers * len(range(0, rows, 10))
+    return {"entries": len(blocks), "expected": expected, "malformed": malformed}
+
+
+def run(writers: int, rows: int, workdir: str = None) -> dict:
+    """Run the stress test in `workdir` (default: a new temp dir); report["ok"] is the verdict."""
+    workdir = workdir or tempfile.mkdtemp(prefix="write_stress_")
+    log_path = os.path.join(workdir, "emotion_logs.csv")
+    journal_path = os.path.join(workdir, "journal_entries.txt")
+
+    # writers and the reader all start together
+    barrier = mp.Barrier(writers + 2)
+    stop = mp.Event()
+    result = mp.Queue()
+
+    procs = [mp.Process(target=_writer, args=(log_path, journal_path, w, rows, barrier))
+             for w in range(writers)]
+    reader = mp.Process(target=_reader, args=(log_path, stop, result, barrier))
+
+    for p in procs + [reader]:
+        p.start()
+    barrier.wait()
+    start = time.perf_counter()
+
+    for p in procs:
+        p.join()
+    elapsed = time.perf_counter() - start
+    stop.set()
+    reader_stats = result.get()
+    reader.join()
+
+    log_check = verify_log(log_path, writers, rows)
+    journal_check = verify_journal(journal_path, writers, rows)
+    total = writers * rows
+
+    report = {
+        "writers": writers,
+        "rows_per_writer": rows,
+        "seconds": round(elapsed, 3),
+        "rows_per_s": round(total / elapsed, 1) if elapsed else 0.0,
+        "log": log_check,
+        "journal": journal_check,
+        "reader": reader_stats,
+        "writer_exit_codes": [p.exitcode for p in procs],
+        "workdir": workdir,
+    }
+    report["ok"] = (
+        all(code == 0 for code in report["writer_exit_codes"])
+        and log_check["missing"] == 0
+        and log_check["malformed_or_duplicate"] == 0
+        and journal_check["malformed"] == 0
+        and journal_check["entries"] == journal_check["expected"]
+        and reader_stats["bad_rows_seen"] == 0
+    )
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stress-test concurrent analytics/journal appends.")
+    parser.add_argument("--writers", type=int, default=8)
+    parser.add_argument("--rows", type=int, default=1000, help="rows per writer")
+    args = parser.parse_args(argv)
+
+    report = run(args.writers, args.rows)
+    print(json.dumps(report, indent=2))
+    sys.exit(0 if report["ok"] else 1)
+
+
+if __name__ == "__main__":
+    main()
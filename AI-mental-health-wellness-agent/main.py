@@ -8,17 +8,26 @@ This script:
 - Loads configuration
 - Initializes the pipeline
 - Runs safety checks
-- Processes user messages
-- Logs mood analytics
+- Processes user messages (the pipeline logs mood analytics)
 - Returns final agent response
+
+Options:
+    python main.py --user-id <id> [--cohort <cohort>]
+        tag this session's mood rows with a student / cohort (per-student
+        analytics, see analytics/partitions.py); default: a random id
+    python main.py --profile-memory [--metrics-port 9108]
+        periodic tracemalloc snapshots + structure sizes, served as JSON at
+        http://127.0.0.1:<port>/metrics/memory (see src/utils/memory_profiler.py)
 """
 
+import argparse
+import uuid
+
 import yaml
 
-from src.agent.safety import SafetyGuard
+from src.llm.client import get_client
 from src.pipelines.wellness_pipeline import WellnessPipeline
 from src.utils.logger import logger
-from analytics.logger import analytics_logger
 
 
 def load_config():
@@ -33,7 +42,27 @@ def load_config():
         raise e
 
 
-def run_agent():
+def start_memory_profiler(metrics_port=None, pipeline=None):
+    """Opt-in memory diagnostics; see the `diagnostics` section of agent.yaml."""
+    from src.utils.memory_profiler import MemoryProfiler, serve_metrics
+
+    profiler = MemoryProfiler()
+    profiler.watch_defaults(pipeline)
+    profiler.start()
+
+    if metrics_port:
+        serve_metrics(profiler, port=metrics_port)
+        logger.info(f"Memory metrics at http://127.0.0.1:{metrics_port}/metrics/memory")
+    return profiler
+
+
+def start_snapshots():
+    """Warm restart: restore in the background, then snapshot periodically and on exit."""
+    from src.utils.snapshots import SnapshotManager
+    return SnapshotManager.from_config().restore_async().start()
+
+
+def run_agent(profile_memory=False, metrics_port=None, user_id=None, cohort=None):
     """
     Entry point for user interaction on CLI.
 
@@ -43,8 +72,14 @@ def run_agent():
 
     config = load_config()
 
-    safety = SafetyGuard()
-    pipeline = WellnessPipeline()
+    pipeline = WellnessPipeline(llm=get_client())
+
+    if profile_memory:
+        start_memory_profiler(metrics_port, pipeline)
+
+    start_snapshots()
+    session_id = uuid.uuid4().hex
+    user_id = user_id or session_id
 
     print("\n🤖 AI Mental Wellness Agent Ready!")
     print("Type 'exit' to quit.\n")
@@ -59,11 +94,11 @@ def run_agent():
         # -----------------------------------------
         # SAFETY CHECK
         # -----------------------------------------
-        flagged = safety.check(user_message)
-
-        if flagged["flagged"]:
+        if pipeline.is_crisis(user_message):
+            # on-call counselors are alerted in the background
+            pipeline.report_crisis(user_message, user_id=user_id, session_id=session_id)
             print("\n⚠️ SAFETY NOTICE:")
-            print(flagged["message"])
+            print(pipeline.crisis_response()["response"])
             continue
 
         # -----------------------------------------
@@ -71,16 +106,7 @@ def run_agent():
         # -----------------------------------------
         logger.info(f"Processing message: {user_message}")
 
-        output = pipeline.run(user_message)
-
-        # -----------------------------------------
-        # LOG MOOD FOR ANALYTICS
-        # -----------------------------------------
-        analytics_logger.log_mood(
-            mood=output["mood"]["mood"],
-            confidence=output["mood"]["confidence"],
-            user_message=user_message
-        )
+        output = pipeline.run(user_message, user_id=user_id, cohort=cohort)
 
         # -----------------------------------------
         # DISPLAY FINAL AGENT MESSAGE
@@ -90,4 +116,14 @@ def run_agent():
 
 
 if __name__ == "__main__":
-    run_agent()
+    parser = argparse.ArgumentParser(description="Run the wellness agent on the command line.")
+    parser.add_argument("--user-id", default=None, help="student id for analytics (default: random)")
+    parser.add_argument("--cohort", default=None, help="cohort / class id for analytics")
+    parser.add_argument("--profile-memory", action="store_true",
+                        help="take periodic tracemalloc snapshots and check memory budgets")
+    parser.add_argument("--metrics-port", type=int, default=None,
+                        help="serve the latest memory report at /metrics/memory")
+    args = parser.parse_args()
+
+    run_agent(profile_memory=args.profile_memory, metrics_port=args.metrics_port,
+              user_id=args.user_id, cohort=args.cohort)
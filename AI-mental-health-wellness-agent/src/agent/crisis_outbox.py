@@ -0,0 +1,557 @@
+# src/agent/crisis_outbox.py
+
+"""
+Crisis-Alert Outbox
+-------------------
+Notifies on-call counselors when a message is flagged as a crisis, without
+the student's reply waiting on the notification.
+
+- enqueue(): the request path. One small write() to an append-only log
+  (alerts.log, opened O_APPEND once per process), no lock file, no
+  network: a few microseconds. The record is in the OS page cache, so
+  it survives a crash of this process; the dispatcher fsyncs the log as
+  soon as it picks the record up.
+- A background dispatcher thread reads new records, delivers them to
+  every configured target and appends the outcome (delivered / dead /
+  deduped) to alerts.acked. Failed deliveries are retried with
+  exponential backoff and jitter, up to max_attempts.
+- On start-up, records in alerts.log without an ack are delivered, so
+  alerts queued before a crash or restart are not lost. Delivery is
+  at-least-once: every alert carries an `id` receivers can dedupe on.
+- Dedupe: one alert per student/session per dedupe_window_s. Checked in
+  enqueue() (in-process) and again by the dispatcher against the log, so
+  it also holds across processes and restarts.
+- Several processes (Streamlit workers, the CLI) may enqueue into the
+  same outbox_dir; a lock file makes exactly one of them the dispatcher.
+
+Alerts are rare and deduped, so the log and ack files are not rotated;
+delete both while the agent is stopped to start afresh.
+
+Targets are pluggable (register_target): webhook, email and file are
+built in. benchmarks/alert_sink.py is a local webhook receiver for tests.
+
+Settings come from the `crisis_alerts` section of agent.yaml. Alerts are
+off until a target is configured, and the flagged message is not copied
+into the outbox or the alerts unless include_message is set.
+"""
+
+import atexit
+import json
+import os
+import random
+import smtplib
+import threading
+import time
+import urllib.request
+import uuid
+from collections import Counter
+from email.message import EmailMessage
+
+import yaml
+
+from src.utils.file_lock import append_locked
+from src.utils.logger import logger
+
+try:
+    import fcntl
+except ImportError:     # Windows
+    fcntl = None
+    import msvcrt
+
+
+CONFIG_PATH = "config/agent.yaml"
+OUTBOX_DIR = os.path.join("data", "outbox")
+
+# Longest message excerpt included in an alert
+MESSAGE_EXCERPT = 500
+# In-process dedupe entries kept before expired ones are pruned
+MAX_RECENT_KEYS = 10000
+
+
+# -----------------------------------------------------------
+# Delivery targets
+# -----------------------------------------------------------
+class AlertTarget:
+    """Delivers one alert. Raise on failure; the dispatcher retries."""
+
+    name = "target"
+
+    def send(self, alert: dict):
+        raise NotImplementedError
+
+
+class FileTarget(AlertTarget):
+    """Appends alerts as JSON lines (for a log shipper, or for tests)."""
+
+    name = "file"
+
+    def __init__(self, path: str = os.path.join(OUTBOX_DIR, "crisis_alerts.jsonl")):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+    def send(self, alert: dict):
+        append_locked(self.path, json.dumps(alert, ensure_ascii=False) + "\n", fsync=True)
+
+
+class WebhookTarget(AlertTarget):
+    """POSTs the alert as JSON. Any non-2xx status or network error is a failure."""
+
+    name = "webhook"
+
+    def __init__(self, url: str, timeout_s: float = 5.0, token_env: str = None, headers: dict = None):
+        self.url = url
+        self.timeout_s = timeout_s
+        self.token_env = token_env
+        self.headers = dict(headers or {})
+
+    def send(self, alert: dict):
+        headers = {"Content-Type": "application/json", "Idempotency-Key": alert["id"], **self.headers}
+        token = os.environ.get(self.token_env) if self.token_env else None
+        if token:
+            headers["Authorization"] = f"Bearer {token}"
+
+        request = urllib.request.Request(
+            self.url, data=json.dumps(alert).encode("utf-8"), headers=headers, method="POST"
+        )
+        # urlopen raises HTTPError for 4xx/5xx
+        with urllib.request.urlopen(request, timeout=self.timeout_s) as response:
+            response.read()
+
+
+class EmailTarget(AlertTarget):
+    """Sends a plain-text email to the on-call address(es) over SMTP."""
+
+    name = "email"
+
+    def __init__(self, host: str, sender: str, recipients, port: int = 587, starttls: bool = True,
+                 username: str = None, password_env: str = "ALERT_SMTP_PASSWORD", timeout_s: float = 10.0):
+        self.host = host
+        self.port = port
+        self.sender = sender
+        self.recipients = [recipients] if isinstance(recipients, str) else list(recipients)
+        self.starttls = starttls
+        self.username = username
+        self.password_env = password_env
+        self.timeout_s = timeout_s
+
+    def send(self, alert: dict):
+        msg = EmailMessage()
+        msg["Subject"] = f"[Crisis alert] student {alert['user_id']}"
+        msg["From"] = self.sender
+        msg["To"] = ", ".join(self.recipients)
+        msg["Message-ID"] = f"<{alert['id']}@crisis-alert>"
+
+        lines = [
+            "A message in the wellness agent was flagged as a possible crisis.",
+            "",
+            f"Student:  {alert['user_id']}",
+            f"Session:  {alert.get('session_id') or '-'}",
+            f"Flagged:  {alert['flagged_at']}",
+            f"Language: {alert.get('lang', 'en')}",
+            f"Alert id: {alert['id']}",
+        ]
+        if alert.get("message"):
+            lines += ["", "Message:", alert["message"]]
+        msg.set_content("\n".join(lines))
+
+        with smtplib.SMTP(self.host, self.port, timeout=self.timeout_s) as smtp:
+            if self.starttls:
+                smtp.starttls()
+            if self.username:
+                smtp.login(self.username, os.environ.get(self.password_env, ""))
+            smtp.send_message(msg)
+
+
+TARGETS = {
+    "file": FileTarget,
+    "webhook": WebhookTarget,
+    "email": EmailTarget,
+}
+
+
+def register_target(name: str, target_cls):
+    """Make a custom AlertTarget subclass available to the `targets` config list."""
+    TARGETS[name] = target_cls
+
+
+def create_target(name: str, **kwargs) -> AlertTarget:
+    if name not in TARGETS:
+        raise ValueError(f"Unknown alert target: {name}")
+    return TARGETS[name](**kwargs)
+
+
+# -----------------------------------------------------------
+# Dispatcher lock
+# -----------------------------------------------------------
+def _try_lock(f) -> bool:
+    """Non-blocking exclusive lock; released when `f` is closed."""
+    try:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+        return True
+    except OSError:
+        return False
+
+
+def _prune_oldest(times: dict, horizon: float):
+    """
+    Drop keys seen before `horizon`, oldest first (dicts are in time order),
+    and at least half of them, so pruning is amortized O(1) per insert.
+    Dropping a key that is still inside its window early only means that
+    student could be alerted twice, never that an alert is lost.
+    """
+    keep = MAX_RECENT_KEYS // 2
+    for key in list(times):
+        if len(times) <= keep and times[key] >= horizon:
+            break
+        del times[key]
+
+
+# -----------------------------------------------------------
+# Outbox
+# -----------------------------------------------------------
+class CrisisOutbox:
+
+    def __init__(self, targets, outbox_dir: str = OUTBOX_DIR, dedupe_window_s: float = 900,
+                 max_attempts: int = 8, backoff_base_s: float = 2.0, backoff_max_s: float = 300.0,
+                 include_message: bool = False, poll_s: float = 5.0):
+        self.targets = list(targets)
+        self.dedupe_window_s = dedupe_window_s
+        self.max_attempts = max_attempts
+        self.backoff_base_s = backoff_base_s
+        self.backoff_max_s = backoff_max_s
+        self.include_message = include_message
+        self.poll_s = poll_s
+
+        os.makedirs(outbox_dir, exist_ok=True)
+        self.log_path = os.path.join(outbox_dir, "alerts.log")
+        self.ack_path = os.path.join(outbox_dir, "alerts.acked")
+        self.lock_path = os.path.join(outbox_dir, "dispatch.lock")
+
+        # request path: one O_APPEND descriptor, one write() per alert
+        self._fd = os.open(self.log_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+        self._recent = {}                   # dedupe key -> monotonic time of last enqueue
+        self._lock = threading.Lock()
+        self._created = time.time()
+        self.stats = Counter()
+
+        # dispatcher state (dispatcher thread only)
+        self._offset = 0
+        self._partial = b""
+        self._pending = {}                  # alert id -> delivery state
+        self._accepted = {}                 # dedupe key -> flagged_at of the last accepted alert
+
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._lock_file = None
+
+    @classmethod
+    def from_config(cls, config_path: str = CONFIG_PATH):
+        settings = {}
+        try:
+            with open(config_path, "r", encoding="utf-8") as f:
+                settings = (yaml.safe_load(f) or {}).get("crisis_alerts", {}) or {}
+        except FileNotFoundError:
+            pass
+
+        targets = [
+            create_target(spec["type"], **{k: v for k, v in spec.items() if k != "type"})
+            for spec in settings.get("targets") or []
+        ]
+        return cls(
+            targets,
+            outbox_dir=settings.get("outbox_dir", OUTBOX_DIR),
+            dedupe_window_s=settings.get("dedupe_window_s", 900),
+            max_attempts=settings.get("max_attempts", 8),
+            backoff_base_s=settings.get("backoff_base_s", 2.0),
+            backoff_max_s=settings.get("backoff_max_s", 300.0),
+            include_message=settings.get("include_message", False),
+            poll_s=settings.get("poll_s", 5.0),
+        )
+
+    @staticmethod
+    def dedupe_key(user_id: str, session_id: str = None) -> str:
+        return f"{user_id}\x1f{session_id or ''}"
+
+    # ---------------------------------------------------------
+    # Request path
+    # ---------------------------------------------------------
+    def enqueue(self, user_id: str, message: str = None, session_id: str = None, lang: str = "en"):
+        """
+        Queue an alert for on-call counselors. Returns the alert id, or None
+        if this student/session was already alerted within the dedupe window.
+        Never blocks on delivery.
+        """
+        key = self.dedupe_key(user_id, session_id)
+        now = time.monotonic()
+
+        with self._lock:
+            last = self._recent.get(key)
+            if last is not None and now - last < self.dedupe_window_s:
+                self.stats["deduped"] += 1
+                return None
+            alert_id = uuid.uuid4().hex
+            record = {
+                "id": alert_id,
+                "key": key,
+                "user_id": user_id,
+                "session_id": session_id,
+                "lang": lang,
+                "flagged_at": time.time(),
+            }
+            if self.include_message and message:
+                record["message"] = message[:MESSAGE_EXCERPT]
+
+            os.write(self._fd, (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8"))
+            self.stats["enqueued"] += 1
+
+            # only a queued alert suppresses repeats: if the write failed, the
+            # student's next crisis message must still reach a counselor
+            self._recent.pop(key, None)     # keep insertion order == time order
+            self._recent[key] = now
+            if len(self._recent) > MAX_RECENT_KEYS:
+                _prune_oldest(self._recent, now - self.dedupe_window_s)
+
+        self._wake.set()
+        return alert_id
+
+    # ---------------------------------------------------------
+    # Dispatcher
+    # ---------------------------------------------------------
+    def start(self):
+        """Start the background dispatcher (alerts still pending at exit are sent on the next start)."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._loop, name="crisis-outbox", daemon=True)
+            self._thread.start()
+            atexit.register(self.stop)
+        return self
+
+    def stop(self, timeout: float = 5.0):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+        if self._lock_file is not None:
+            self._lock_file.close()
+            self._lock_file = None
+
+    def _loop(self):
+        # another process may already be dispatching this outbox
+        while not self._acquire_dispatch_lock():
+            if self._stop.wait(self.poll_s):
+                return
+
+        try:
+            self._recover()
+        except Exception as e:
+            logger.error(f"Crisis outbox recovery failed: {e}")
+
+        while not self._stop.is_set():
+            try:
+                self._read_new()
+                self._deliver_due()
+            except Exception as e:
+                logger.error(f"Crisis outbox dispatch failed: {e}")
+            self._wake.wait(self._next_wakeup())
+            self._wake.clear()
+
+    def _acquire_dispatch_lock(self) -> bool:
+        f = open(self.lock_path, "a+b")
+        if _try_lock(f):
+            self._lock_file = f
+            return True
+        f.close()
+        return False
+
+    def _recover(self):
+        """Rebuild delivery state from the log and the ack file."""
+        acked = {}
+        try:
+            with open(self.ack_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        ack = json.loads(line)
+                    except ValueError:
+                        continue            # torn last line from a crash
+                    acked[ack["id"]] = ack["status"]
+        except FileNotFoundError:
+            pass
+
+        for record in self._new_records():
+            status = acked.get(record["id"])
+            if status is None:
+                self._admit(record)
+            elif status != "deduped":
+                self._remember(record["key"], record["flagged_at"])
+
+        leftover = sum(1 for state in self._pending.values() if state["record"]["flagged_at"] < self._created)
+        with self._lock:
+            self.stats["recovered"] += leftover
+        if leftover:
+            logger.warning(f"Crisis outbox: {leftover} undelivered alert(s) from a previous run")
+
+    def _new_records(self):
+        """Complete records appended since the last read."""
+        with open(self.log_path, "rb") as f:
+            f.seek(self._offset)
+            data = f.read()
+            if data:
+                os.fsync(f.fileno())
+
+        lines = (self._partial + data).split(b"\n")
+        partial = lines.pop()               # incomplete tail, finished by a later write
+        for line in lines:
+            try:
+                yield json.loads(line)
+            except ValueError:
+                logger.error("Crisis outbox: skipping unreadable record")
+
+        # advanced only once every record was taken, so drain() never sees a gap
+        self._offset += len(data)
+        self._partial = partial
+
+    def _read_new(self):
+        for record in self._new_records():
+            self._admit(record)
+
+    def _admit(self, record: dict):
+        key, flagged_at = record["key"], record["flagged_at"]
+        last = self._accepted.get(key)
+        if last is not None and flagged_at - last < self.dedupe_window_s:
+            # alerted by another process (or before a restart) within the window
+            self._ack(record["id"], "deduped", 0)
+            with self._lock:
+                self.stats["deduped"] += 1
+            return
+
+        self._remember(key, flagged_at)
+        self._pending[record["id"]] = {
+            "record": record,
+            "remaining": list(range(len(self.targets))),
+            "attempts": 0,
+            "next_at": time.monotonic(),
+            "error": None,
+        }
+
+    def _remember(self, key: str, flagged_at: float):
+        self._accepted.pop(key, None)
+        self._accepted[key] = flagged_at
+        if len(self._accepted) > MAX_RECENT_KEYS:
+            _prune_oldest(self._accepted, flagged_at - self.dedupe_window_s)
+
+    def _deliver_due(self):
+        now = time.monotonic()
+        for alert_id, state in list(self._pending.items()):
+            if state["next_at"] <= now and not self._stop.is_set():
+                self._deliver(alert_id, state)
+
+    def _deliver(self, alert_id: str, state: dict):
+        state["attempts"] += 1
+        alert = self._payload(state["record"], state["attempts"])
+
+        still_failing = []
+        for index in state["remaining"]:
+            target = self.targets[index]
+            try:
+                target.send(alert)
+            except Exception as e:
+                still_failing.append(index)
+                state["error"] = f"{target.name}: {e}"
+                with self._lock:
+                    self.stats[f"failed:{target.name}"] += 1
+            else:
+                with self._lock:
+                    self.stats[f"sent:{target.name}"] += 1
+        state["remaining"] = still_failing
+
+        if not still_failing:
+            self._ack(alert_id, "delivered", state["attempts"])
+            with self._lock:
+                self.stats["delivered"] += 1
+                self.stats["retries"] += state["attempts"] - 1
+            del self._pending[alert_id]
+            logger.info(f"Crisis alert {alert_id} delivered (attempt {state['attempts']})")
+            return
+
+        if state["attempts"] >= self.max_attempts:
+            self._ack(alert_id, "dead", state["attempts"])
+            with self._lock:
+                self.stats["dead"] += 1
+            del self._pending[alert_id]
+            logger.error(f"Crisis alert {alert_id} not delivered after {state['attempts']} attempts: {state['error']}")
+            return
+
+        delay = min(self.backoff_max_s, self.backoff_base_s * 2 ** (state["attempts"] - 1))
+        state["next_at"] = time.monotonic() + random.uniform(delay / 2, delay)
+
+    def _payload(self, record: dict, attempt: int) -> dict:
+        alert = {k: v for k, v in record.items() if k != "key"}
+        alert["flagged_at"] = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(record["flagged_at"]))
+        alert["attempt"] = attempt
+        return alert
+
+    def _ack(self, alert_id: str, status: str, attempts: int):
+        line = json.dumps({"id": alert_id, "status": status, "attempts": attempts, "at": time.time()})
+        append_locked(self.ack_path, line + "\n", fsync=True)
+
+    def _next_wakeup(self) -> float:
+        if not self._pending:
+            return self.poll_s
+        soonest = min(state["next_at"] for state in self._pending.values())
+        return min(self.poll_s, max(soonest - time.monotonic(), 0.0))
+
+    # ---------------------------------------------------------
+    # Metrics
+    # ---------------------------------------------------------
+    def snapshot(self) -> dict:
+        with self._lock:
+            stats = dict(self.stats)
+        return {
+            **stats,
+            "pending": len(self._pending),
+            "dispatcher": self._lock_file is not None,
+            "targets": [t.name for t in self.targets],
+        }
+
+    def drain(self, timeout: float = 10.0) -> bool:
+        """Wait until everything enqueued so far is delivered or given up on (for tests/benchmarks)."""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            caught_up = os.path.getsize(self.log_path) <= self._offset and not self._partial
+            if self._lock_file is not None and caught_up and not self._pending:
+                return True
+            self._wake.set()
+            time.sleep(0.01)
+        return False
+
+
+_outbox = None
+_outbox_lock = threading.Lock()
+
+
+def get_crisis_outbox(config_path: str = CONFIG_PATH):
+    """
+    Process-wide outbox built from the `crisis_alerts` section of agent.yaml,
+    with its dispatcher running. None when alerts are disabled or no
+    target is configured.
+    """
+    global _outbox
+    if _outbox is None:
+        with _outbox_lock:
+            if _outbox is None:
+                settings = {}
+                try:
+                    with open(config_path, "r", encoding="utf-8") as f:
+                        settings = (yaml.safe_load(f) or {}).get("crisis_alerts", {}) or {}
+                except FileNotFoundError:
+                    pass
+                if not settings.get("enabled", False):
+                    return None
+                if not settings.get("targets"):
+                    logger.warning("crisis_alerts is enabled but has no targets; counselors will not be alerted")
+                    return None
+                _outbox = CrisisOutbox.from_config(config_path).start()
+    return _outbox
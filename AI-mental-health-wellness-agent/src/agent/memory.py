@@ -1,8 +1,22 @@
 # src/agent/memory.py
 
+import json
+import os
 import time
 from collections import deque
 
+from src.utils.moods import to_code
+from src.utils.state_backend import get_state_backend, hashed_name
+
+
+SESSION_DIR = os.path.join("data", "sessions")
+
+# history() reads this much of the end of a session log (more if needed)
+TAIL_BYTES = 16 * 1024
+
+# a session log past this size is cut back to its last max_messages messages
+MAX_LOG_BYTES = 256 * 1024
+
 
 class ConversationMemory:
     """
@@ -39,28 +53,111 @@ class EmotionMemory:
     - trend analysis
     - weekly charts
     - dashboard analytics
+
+    Entries are stored as compact (mood code, intensity, timestamp) tuples;
+    use src.utils.moods.to_label() when displaying them.
     """
 
     def __init__(self):
         self.logs = []  # in-memory list; CSV will be handled separately
 
     def record(self, emotion, intensity):
-        """Record an emotional snapshot."""
-        self.logs.append({
-            "emotion": emotion,
-            "intensity": intensity,
-            "timestamp": time.time()
-        })
+        """Record an emotional snapshot. `emotion` may be a code or label."""
+        self.logs.append((to_code(emotion), intensity, time.time()))
+
+    @staticmethod
+    def _as_dict(entry):
+        code, intensity, timestamp = entry
+        return {"emotion": code, "intensity": intensity, "timestamp": timestamp}
 
     def get_recent(self, limit=30):
         """Return recent emotional entries."""
-        return self.logs[-limit:]
+        return [self._as_dict(e) for e in self.logs[-limit:]]
 
     def get_all(self):
         """Return complete emotional history."""
-        return self.logs
+        return [self._as_dict(e) for e in self.logs]
+
+
+class SessionStore:
+    """
+    Per-session conversation history in the shared state backend, so a
+    student's next message can land on any replica:
+    - one append-only JSON-lines log per session (hashed session id)
+    - a whole turn (message + reply) is a single append
+    - journal entries recalled for a turn are kept with it (role "journal"),
+      so recalled context never leaves the student's own session
+    - history() reads only the end of the log, so a request costs the same
+      however long the session; logs past max_log_bytes are compacted
+    """
+
+    def __init__(self, backend=None, root=SESSION_DIR, max_messages=20,
+                 tail_bytes=TAIL_BYTES, max_log_bytes=MAX_LOG_BYTES):
+        self.backend = backend or get_state_backend()
+        self.root = root
+        self.max_messages = max_messages
+        self.tail_bytes = tail_bytes
+        self.max_log_bytes = max_log_bytes
+
+    def _name(self, session_id):
+        return hashed_name(self.root, session_id, ".jsonl")
+
+    def add(self, session_id, role, content):
+        self.add_many(session_id, [(role, content)])
+
+    def add_turn(self, session_id, user_text, reply, recalled=()):
+        """
+        Record the student's message and the agent's reply together, after
+        any past journal entries recalled for it (from find_similar_entries).
+        """
+        journal = [("journal", f"[{entry['timestamp']}] {entry['text']}") for entry in recalled]
+        self.add_many(session_id, journal + [("user", user_text), ("assistant", reply)])
+
+    def add_many(self, session_id, messages):
+        now = time.time()
+        lines = "".join(
+            json.dumps({"role": role, "content": content, "timestamp": now}, ensure_ascii=False) + "\n"
+            for role, content in messages
+        )
+        self.backend.append(self._name(session_id), lines)
+
+    def history(self, session_id, limit=None):
+        """The last `limit` (default max_messages) messages, oldest first."""
+        limit = limit or self.max_messages
+        name = self._name(session_id)
+        size = self.backend.size(name)
+
+        window = self.tail_bytes
+        while True:
+            start = max(size - window, 0)
+            lines = self.backend.read(name, start, size - start).split(b"\n")
+            if start > 0:
+                lines = lines[1:]               # may start mid-line
+            lines = [line for line in lines if line]
+            if start == 0 or len(lines) >= max(limit, self.max_messages):
+                break
+            window *= 4
+
+        if size > self.max_log_bytes:
+            self._compact(name, lines[-self.max_messages:])
+        return [json.loads(line) for line in lines[-limit:]]
+
+    def _compact(self, name, lines):
+        """
+        Replace the log with its last messages. A turn appended by another
+        replica between the read and this rewrite is lost; a student's
+        turns arrive one at a time, so that only costs old context.
+        """
+        self.backend.execute([
+            ("delete", (name,)),
+            ("append", (name, b"".join(line + b"\n" for line in lines).decode("utf-8"), None)),
+        ])
+
+    def clear(self, session_id):
+        self.backend.delete(self._name(session_id))
 
 
 # GLOBAL SINGLETON-LIKE HELPERS
 conversation_memory = ConversationMemory()
 emotion_memory = EmotionMemory()
+session_store = SessionStore()
@@ -44,7 +44,7 @@ Your job:
 MOOD_ANALYSIS_PROMPT = """
 Analyze the emotional tone of the message and return:
 {
-    "emotion": "<one of: happy, sad, anxious, stressed, angry, confused, neutral>",
+    "emotion": "<one of: neutral, happy, sad, stressed, anxious, angry>",
     "intensity": "<1-5>"
 }
 Message: "{text}"
@@ -81,7 +81,7 @@ Text: "{text}"
 
 PROMPT_MOOD_ANALYSIS = """
 You are an emotion classifier. Identify the user's emotion clearly.
-Possible emotions: happy, sad, stressed, anxious, angry, neutral, tired, overwhelmed.
+Possible emotions: neutral, happy, sad, stressed, anxious, angry.
 Respond ONLY with the single emotion word.
 """
 
@@ -103,3 +103,23 @@ Combine all insights into final wellness packet:
 
 Return final structured JSON.
 """
+
+# --- Reply Templates (static fragments, pre-translated by the Hindi catalog) ---
+
+REPLY_MOOD_LINE = "You're feeling **{mood}**."
+
+REPLY_STRATEGIES_HEADER = "Here are some helpful strategies:"
+
+REPLY_RESOURCES_HEADER = "Helpful resources:"
+
+REPLY_BUSY = "I'm handling a lot of conversations right now, so here is a quick check-in while things calm down."
+
+REPLY_SLOW = "I'm taking longer than usual to think this through, so here is a quick check-in for now."
+
+REPLY_TEMPLATES = [
+    REPLY_MOOD_LINE,
+    REPLY_STRATEGIES_HEADER,
+    REPLY_RESOURCES_HEADER,
+    REPLY_BUSY,
+    REPLY_SLOW,
+]
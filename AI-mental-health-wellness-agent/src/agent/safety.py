@@ -11,6 +11,11 @@ class SafetyManager:
         self.crisis_keywords = config["safety"]["crisis_keywords"]
         self.crisis_message = config["safety"]["crisis_response_message"]
 
+        # All keywords in one pattern: a single scan per message
+        self._crisis_pattern = re.compile(
+            "|".join(re.escape(k.lower()) for k in self.crisis_keywords) or r"(?!)"
+        )
+
     # ---------------------------------------------------------
     # 1. Crisis Detection (High Priority)
     # ---------------------------------------------------------
@@ -18,21 +23,19 @@ class SafetyManager:
         """
         Detects if the message indicates danger or self-harm.
         """
-        text = text.lower()
-
-        for keyword in self.crisis_keywords:
-            if keyword.lower() in text:
-                return True
-
-        return False
+        return self._crisis_pattern.search(text.lower()) is not None
 
     # ---------------------------------------------------------
     # 2. Crisis Response
     # ---------------------------------------------------------
-    def get_crisis_response(self) -> str:
+    def get_crisis_response(self, lang: str = "en") -> str:
         """
         Standard crisis response template.
+        Hindi comes from the pre-translated catalog (no per-request work).
         """
+        if lang == "hi":
+            from src.tools.translator import get_hindi_catalog
+            return get_hindi_catalog().translate(self.crisis_message)
         return self.crisis_message
 
     # ---------------------------------------------------------
@@ -0,0 +1,166 @@
+# src/llm/cassette.py
+
+"""
+LLM Cassettes
+-------------
+Record / replay for LLM calls at the transport level (LLMClient._send),
+so every caller that goes through the client is covered: detect_mood,
+response generation, bulk analysis.
+
+- record: calls go to the provider as usual; each successful request ->
+  response pair is kept together with its measured latency
+- replay: nothing leaves the process; the recorded response is returned,
+  optionally after sleeping for the recorded latency (x time_scale)
+
+Requests are matched on the URL path + request body (the body contains the
+prompt, model and sampling settings; API keys live in headers and are never
+stored). When the same request was recorded several times, replays cycle
+through the recordings in order.
+
+File format: gzip-compressed JSON lines
+    {"version": 1}
+    {"key": <sha256>, "response": <body text>, "latency_ms": <float>}
+    ...
+
+Configured from the `cassette` block of the `model` section in agent.yaml;
+benchmarks can attach one directly:
+    get_client().cassette = Cassette("data/cassettes/llm.jsonl.gz", mode="replay")
+"""
+
+import atexit
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import Counter
+from urllib.parse import urlsplit
+
+
+CASSETTE_PATH = os.path.join("data", "cassettes", "llm.jsonl.gz")
+VERSION = 1
+
+MODES = ("off", "record", "replay")
+
+
+class CassetteMiss(LookupError):
+    """Raised in replay mode for a request that was never recorded."""
+
+
+def request_key(url: str, body: bytes) -> str:
+    h = hashlib.sha256(urlsplit(url).path.encode("utf-8"))
+    h.update(b"\0")
+    h.update(body)
+    return h.hexdigest()
+
+
+class Cassette:
+
+    def __init__(self, path: str = CASSETTE_PATH, mode: str = "replay", time_scale: float = 1.0):
+        if mode not in MODES:
+            raise ValueError(f"Unknown cassette mode: {mode!r}")
+
+        self.path = path
+        self.mode = mode
+        self.time_scale = float(time_scale)
+
+        self.tracks = {}                    # key -> [(response bytes, latency_s), ...]
+        self._cursor = Counter()
+        self._dirty = False
+        self._lock = threading.Lock()
+        self.stats = Counter()
+
+        if mode != "off":
+            self.load()
+        if mode == "record":
+            atexit.register(self.save)
+
+    @classmethod
+    def from_settings(cls, settings: dict):
+        """Build from the `model.cassette` block; None when disabled."""
+        settings = settings or {}
+        mode = settings.get("mode", "off")
+        if mode == "off":
+            return None
+        return cls(
+            path=settings.get("path", CASSETTE_PATH),
+            mode=mode,
+            time_scale=settings.get("time_scale", 1.0),
+        )
+
+    def __len__(self):
+        return sum(len(t) for t in self.tracks.values())
+
+    # ---------------------------------------------------------
+    # File
+    # ---------------------------------------------------------
+    def load(self):
+        try:
+            with gzip.open(self.path, "rt", encoding="utf-8") as f:
+                header = json.loads(f.readline() or "{}")
+                if header.get("version") != VERSION:
+                    raise ValueError(f"{self.path} is not a version-{VERSION} cassette")
+                for line in f:
+                    rec = json.loads(line)
+                    self.tracks.setdefault(rec["key"], []).append(
+                        (rec["response"].encode("utf-8"), rec["latency_ms"] / 1000.0)
+                    )
+        except FileNotFoundError:
+            pass
+
+    def save(self):
+        """Write all recordings (atomic replace). No-op when nothing changed."""
+        with self._lock:
+            if not self._dirty:
+                return
+            records = [(k, r, l) for k, track in self.tracks.items() for r, l in track]
+            self._dirty = False
+
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        with gzip.open(tmp, "wt", encoding="utf-8") as f:
+            f.write(json.dumps({"version": VERSION}) + "\n")
+            for key, response, latency in records:
+                f.write(json.dumps({
+                    "key": key,
+                    "response": response.decode("utf-8"),
+                    "latency_ms": round(latency * 1000.0, 3),
+                }, ensure_ascii=False) + "\n")
+        os.replace(tmp, self.path)
+
+    # ---------------------------------------------------------
+    # Transport hook
+    # ---------------------------------------------------------
+    def send(self, send, url: str, headers: dict, body: bytes) -> bytes:
+        """Wrap one transport call: send(url, headers, body) -> response bytes."""
+        if self.mode == "replay":
+            return self.play(url, body)
+        if self.mode == "off":
+            return send(url, headers, body)
+
+        start = time.perf_counter()
+        data = send(url, headers, body)         # errors are not recorded
+        self.record(url, body, data, time.perf_counter() - start)
+        return data
+
+    def record(self, url: str, body: bytes, response: bytes, latency_s: float):
+        with self._lock:
+            self.tracks.setdefault(request_key(url, body), []).append((response, latency_s))
+            self._dirty = True
+            self.stats["recorded"] += 1
+
+    def play(self, url: str, body: bytes) -> bytes:
+        key = request_key(url, body)
+        with self._lock:
+            track = self.tracks.get(key)
+            if not track:
+                self.stats["misses"] += 1
+                raise CassetteMiss(f"no recording for request {key[:12]}")
+            response, latency = track[self._cursor[key] % len(track)]
+            self._cursor[key] += 1
+            self.stats["hits"] += 1
+
+        if self.time_scale > 0 and latency > 0:
+            time.sleep(latency * self.time_scale)
+        return response
@@ -0,0 +1,349 @@
+# src/llm/client.py
+
+"""
+LLM Client
+----------
+Transport layer for every LLM call made by the agent.
+
+- HTTP keep-alive connection pool (stdlib http.client, no extra deps)
+- Bounded concurrency via a semaphore
+- Per-request timeouts
+- Retries with full-jitter exponential backoff (honours Retry-After)
+- Circuit breaker that fails fast while the provider is down
+- Pluggable providers (see providers.py), configured from the `model`
+  section of config/agent.yaml
+- Optional record / replay of provider responses (see cassette.py)
+
+Usage:
+    from src.llm.client import get_client
+    llm = get_client()
+    text = llm("Say hi")          # same as llm.complete("Say hi")
+"""
+
+import http.client
+import random
+import threading
+import time
+from collections import Counter
+from urllib.parse import urlsplit
+
+import yaml
+
+from src.llm.cassette import Cassette
+from src.llm.providers import create_provider
+
+
+CONFIG_PATH = "config/agent.yaml"
+
+RETRYABLE_STATUS = {408, 409, 425, 429, 500, 502, 503, 504}
+
+
+def _provider_failing(e) -> bool:
+    """Transport errors, 5xx and 429 count against the breaker; other 4xx are the request's fault."""
+    return e.status is None or e.status >= 500 or e.status == 429
+
+
+class LLMError(Exception):
+    """Raised when an LLM call fails after retries."""
+
+    def __init__(self, message, status=None, retryable=False, retry_after=None):
+        super().__init__(message)
+        self.status = status
+        self.retryable = retryable
+        self.retry_after = retry_after
+
+
+class CircuitOpenError(LLMError):
+    """Raised without calling the provider while the breaker is open."""
+
+
+# -----------------------------------------------------------
+# Connection pool
+# -----------------------------------------------------------
+class ConnectionPool:
+    """
+    Keeps idle keep-alive connections per (scheme, host, port).
+    At most `size` idle connections are kept per origin; extra ones are closed.
+    """
+
+    def __init__(self, size: int = 8, timeout: float = 30.0):
+        self.size = size
+        self.timeout = timeout
+        self._idle = {}
+        self._lock = threading.Lock()
+        self.created = 0
+        self.reused = 0
+
+    def acquire(self, scheme: str, host: str, port: int):
+        key = (scheme, host, port)
+        with self._lock:
+            idle = self._idle.get(key)
+            if idle:
+                self.reused += 1
+                return idle.pop()
+            self.created += 1
+
+        conn_cls = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+        return conn_cls(host, port, timeout=self.timeout)
+
+    def release(self, scheme: str, host: str, port: int, conn, reusable: bool = True):
+        if not reusable:
+            conn.close()
+            return
+
+        key = (scheme, host, port)
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            if len(idle) < self.size:
+                idle.append(conn)
+                return
+        conn.close()
+
+    def close(self):
+        with self._lock:
+            conns = [c for idle in self._idle.values() for c in idle]
+            self._idle = {}
+        for conn in conns:
+            conn.close()
+
+
+# -----------------------------------------------------------
+# Circuit breaker
+# -----------------------------------------------------------
+class CircuitBreaker:
+    """
+    closed    -> normal operation
+    open      -> after `threshold` consecutive failures; calls fail fast
+    half-open -> after `reset_s`, one trial call is let through
+
+    Only provider failures count (see _provider_failing): a bad prompt or
+    key must not fail fast every other caller.
+    """
+
+    def __init__(self, threshold: int = 5, reset_s: float = 30.0):
+        self.threshold = threshold
+        self.reset_s = reset_s
+        self.failures = 0
+        self.opened_at = None
+        self._trial = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_s:
+            return "half-open"
+        return "open"
+
+    def allow(self) -> bool:
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return True
+            if state == "half-open" and not self._trial:
+                self._trial = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._trial = False
+            if self.failures >= self.threshold:
+                self.opened_at = time.monotonic()
+
+    def release_trial(self):
+        """End a half-open trial without a verdict (e.g. the call never reached the provider)."""
+        with self._lock:
+            self._trial = False
+
+
+# -----------------------------------------------------------
+# Client
+# -----------------------------------------------------------
+class LLMClient:
+
+    def __init__(self, provider, timeout_s: float = 30.0, max_concurrency: int = 8,
+                 max_retries: int = 3, backoff_base_s: float = 0.5, backoff_max_s: float = 8.0,
+                 pool_size: int = 8, breaker_threshold: int = 5, breaker_reset_s: float = 30.0,
+                 cassette: Cassette = None):
+        self.provider = provider
+        self.cassette = cassette
+        self.timeout_s = timeout_s
+        self.max_retries = max_retries
+        self.backoff_base_s = backoff_base_s
+        self.backoff_max_s = backoff_max_s
+
+        self.pool = ConnectionPool(size=pool_size, timeout=timeout_s)
+        self.breaker = CircuitBreaker(threshold=breaker_threshold, reset_s=breaker_reset_s)
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._rng = random.Random()
+
+        self.stats = Counter()
+        self._stats_lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config_path: str = CONFIG_PATH, **overrides):
+        """Build a client from the `model` section of agent.yaml."""
+        with open(config_path, "r", encoding="utf-8") as f:
+            model = (yaml.safe_load(f) or {}).get("model", {})
+        model.update(overrides)
+
+        provider = create_provider(
+            model.get("provider", "openai"),
+            model_name=model.get("model_name"),
+            temperature=model.get("temperature", 0.4),
+            max_tokens=model.get("max_tokens", 500),
+            base_url=model.get("base_url"),
+        )
+
+        return cls(
+            provider,
+            timeout_s=model.get("timeout_s", 30.0),
+            max_concurrency=model.get("max_concurrency", 8),
+            max_retries=model.get("max_retries", 3),
+            pool_size=model.get("pool_size", 8),
+            breaker_threshold=model.get("breaker_threshold", 5),
+            breaker_reset_s=model.get("breaker_reset_s", 30.0),
+            cassette=Cassette.from_settings(model.get("cassette")),
+        )
+
+    def _count(self, key: str, n: int = 1):
+        with self._stats_lock:
+            self.stats[key] += n
+
+    # -----------------------------------------------------------
+    # One HTTP round-trip
+    # -----------------------------------------------------------
+    def _send(self, url: str, headers: dict, body: bytes) -> bytes:
+        if self.cassette is not None:
+            return self.cassette.send(self._post, url, headers, body)
+        return self._post(url, headers, body)
+
+    def _post(self, url: str, headers: dict, body: bytes) -> bytes:
+        parts = urlsplit(url)
+        scheme = parts.scheme or "http"
+        port = parts.port or (443 if scheme == "https" else 80)
+        path = parts.path + (f"?{parts.query}" if parts.query else "")
+
+        conn = self.pool.acquire(scheme, parts.hostname, port)
+        reusable = False
+        try:
+            conn.request("POST", path, body=body, headers=headers)
+            response = conn.getresponse()
+            data = response.read()
+            reusable = not response.will_close
+        except (OSError, http.client.HTTPException) as e:
+            raise LLMError(f"transport error: {e}", retryable=True) from e
+        finally:
+            self.pool.release(scheme, parts.hostname, port, conn, reusable)
+
+        if response.status >= 400:
+            retry_after = response.getheader("Retry-After")
+            try:
+                retry_after = float(retry_after) if retry_after else None
+            except ValueError:
+                retry_after = None
+            raise LLMError(
+                f"HTTP {response.status}: {data[:200]!r}",
+                status=response.status,
+                retryable=response.status in RETRYABLE_STATUS,
+                retry_after=retry_after,
+            )
+
+        return data
+
+    def _backoff(self, attempt: int, retry_after=None) -> float:
+        delay = self._rng.uniform(0, min(self.backoff_max_s, self.backoff_base_s * (2 ** attempt)))
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, self.backoff_max_s))
+        return delay
+
+    # -----------------------------------------------------------
+    # Public API
+    # -----------------------------------------------------------
+    def complete(self, prompt: str, system: str = None) -> str:
+        """Send one prompt and return the completion text."""
+        if not self._slots.acquire(timeout=self.timeout_s):
+            self._count("rejected")
+            raise LLMError("timed out waiting for a free LLM slot")
+
+        try:
+            url, headers, body = self.provider.build_request(prompt, system=system)
+            attempt = 0
+
+            while True:
+                if not self.breaker.allow():
+                    self._count("short_circuited")
+                    raise CircuitOpenError("LLM circuit breaker is open")
+
+                self._count("attempts")
+                try:
+                    data = self._send(url, headers, body)
+                    text = self.provider.parse_response(data)
+                except LLMError as e:
+                    if _provider_failing(e):
+                        self.breaker.record_failure()
+                    else:
+                        self.breaker.release_trial()
+                    if not e.retryable or attempt >= self.max_retries:
+                        self._count("failures")
+                        raise
+                    self._count("retries")
+                    time.sleep(self._backoff(attempt, e.retry_after))
+                    attempt += 1
+                    continue
+                except (KeyError, IndexError, ValueError) as e:
+                    self.breaker.record_success()
+                    self._count("failures")
+                    raise LLMError(f"unexpected response format: {e}") from e
+                except Exception:
+                    # anything else (e.g. a cassette miss) must not pin the half-open trial
+                    self.breaker.release_trial()
+                    self._count("failures")
+                    raise
+
+                self.breaker.record_success()
+                self._count("successes")
+                return text
+        finally:
+            self._slots.release()
+
+    __call__ = complete
+
+    def snapshot(self) -> dict:
+        """Counters for dashboards / benchmarks."""
+        with self._stats_lock:
+            out = dict(self.stats)
+        out["connections_created"] = self.pool.created
+        out["connections_reused"] = self.pool.reused
+        out["breaker"] = self.breaker.state
+        if self.cassette is not None:
+            out["cassette"] = {"mode": self.cassette.mode, **self.cassette.stats}
+        return out
+
+    def close(self):
+        self.pool.close()
+        if self.cassette is not None and self.cassette.mode == "record":
+            self.cassette.save()
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client() -> LLMClient:
+    """Process-wide client built from config/agent.yaml on first use."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = LLMClient.from_config()
+    return _client
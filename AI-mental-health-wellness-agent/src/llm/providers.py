@@ -0,0 +1,134 @@
+# src/llm/providers.py
+
+"""
+LLM Providers
+-------------
+A provider knows how to turn a prompt into an HTTP request for one API
+and how to read the completion text back out of the response.
+Transport concerns (pooling, retries, concurrency) live in client.py.
+
+Built-in providers:
+- openai : OpenAI chat completions
+- gemini : Google Gemini generateContent
+- mock   : OpenAI-compatible local server (benchmarks/mock_llm_server.py)
+
+Add your own with register_provider("name", ProviderClass).
+"""
+
+import json
+import os
+
+
+class Provider:
+    name = "base"
+    default_base_url = ""
+
+    def __init__(self, model_name: str, temperature: float = 0.4, max_tokens: int = 500,
+                 base_url: str = None, api_key: str = None):
+        self.model_name = model_name
+        self.temperature = temperature
+        self.max_tokens = max_tokens
+        self.base_url = (base_url or self.default_base_url).rstrip("/")
+        self.api_key = api_key
+
+    def build_request(self, prompt: str, system: str = None):
+        """Return (url, headers, body_bytes) for a POST request."""
+        raise NotImplementedError
+
+    def parse_response(self, body: bytes) -> str:
+        """Extract completion text from a successful response body."""
+        raise NotImplementedError
+
+
+class OpenAIProvider(Provider):
+    name = "openai"
+    default_base_url = "https://api.openai.com"
+    api_key_env = "OPENAI_API_KEY"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if self.api_key is None:
+            self.api_key = os.environ.get(self.api_key_env)
+
+    def build_request(self, prompt: str, system: str = None):
+        messages = []
+        if system:
+            messages.append({"role": "system", "content": system})
+        messages.append({"role": "user", "content": prompt})
+
+        body = {
+            "model": self.model_name,
+            "messages": messages,
+            "temperature": self.temperature,
+            "max_tokens": self.max_tokens,
+        }
+
+        headers = {"Content-Type": "application/json"}
+        if self.api_key:
+            headers["Authorization"] = f"Bearer {self.api_key}"
+
+        url = f"{self.base_url}/v1/chat/completions"
+        return url, headers, json.dumps(body).encode("utf-8")
+
+    def parse_response(self, body: bytes) -> str:
+        data = json.loads(body)
+        return data["choices"][0]["message"]["content"]
+
+
+class GeminiProvider(Provider):
+    name = "gemini"
+    default_base_url = "https://generativelanguage.googleapis.com"
+    api_key_env = "GEMINI_API_KEY"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if self.api_key is None:
+            self.api_key = os.environ.get(self.api_key_env)
+
+    def build_request(self, prompt: str, system: str = None):
+        body = {
+            "contents": [{"role": "user", "parts": [{"text": prompt}]}],
+            "generationConfig": {
+                "temperature": self.temperature,
+                "maxOutputTokens": self.max_tokens,
+            },
+        }
+        if system:
+            body["systemInstruction"] = {"parts": [{"text": system}]}
+
+        headers = {"Content-Type": "application/json"}
+        if self.api_key:
+            headers["x-goog-api-key"] = self.api_key
+
+        url = f"{self.base_url}/v1beta/models/{self.model_name}:generateContent"
+        return url, headers, json.dumps(body).encode("utf-8")
+
+    def parse_response(self, body: bytes) -> str:
+        data = json.loads(body)
+        parts = data["candidates"][0]["content"]["parts"]
+        return "".join(p.get("text", "") for p in parts)
+
+
+class MockProvider(OpenAIProvider):
+    """OpenAI wire format against a local server; no API key needed."""
+    name = "mock"
+    default_base_url = "http://127.0.0.1:8765"
+    api_key_env = "MOCK_LLM_API_KEY"
+
+
+PROVIDERS = {
+    "openai": OpenAIProvider,
+    "gemini": GeminiProvider,
+    "mock": MockProvider,
+}
+
+
+def register_provider(name: str, provider_cls):
+    """Make a custom Provider subclass available to LLMClient.from_config()."""
+    PROVIDERS[name] = provider_cls
+
+
+def create_provider(name: str, **kwargs) -> Provider:
+    if name not in PROVIDERS:
+        raise ValueError(f"Unknown LLM provider: {name}")
+    return PROVIDERS[name](**kwargs)
@@ -0,0 +1,190 @@
+# src/pipelines/admission.py
+
+"""
+Admission Control
+-----------------
+Wraps WellnessPipeline so one client cannot starve everyone else.
+
+- Per-user token buckets (rate + burst) stop scripted users and stuck
+  Streamlit rerun loops
+- A global cap on concurrent LLM-path requests, with a bounded wait
+  queue in front of it
+- When a request is rate limited, the queue is full, or it waited too
+  long, it is shed: answered with the pipeline's cheap local reply
+  (keyword mood + coping suggestions + resources) instead of an LLM call
+- Crisis messages skip all of the above (and queue an on-call alert):
+  they go through the scheduler's crisis lane first (src/pipelines/scheduler.py),
+  which also tracks their latency against the crisis budget
+
+Limits come from the `admission` section of agent.yaml; metrics() reports
+queue depth, in-flight count, rejection counters and crisis latency.
+"""
+
+import threading
+import time
+from collections import Counter, OrderedDict
+
+import yaml
+
+from src.agent.prompts import REPLY_BUSY
+from src.pipelines.scheduler import PriorityScheduler
+from src.tools.coping_suggester import DEFAULT_USER
+
+
+CONFIG_PATH = "config/agent.yaml"
+
+DEFAULTS = {
+    "user_rate_per_min": 20,
+    "user_burst": 5,
+    "max_concurrency": 8,
+    "max_queue": 32,
+    "queue_timeout_s": 10.0,
+    "max_users": 10000,
+}
+
+
+class TokenBucket:
+    """Classic token bucket; callers serialize access."""
+
+    __slots__ = ("rate", "capacity", "tokens", "updated")
+
+    def __init__(self, rate_per_s: float, capacity: float):
+        self.rate = rate_per_s
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def take(self, now: float = None) -> bool:
+        now = time.monotonic() if now is None else now
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1.0:
+            self.tokens -= 1.0
+            return True
+        return False
+
+
+class AdmissionController:
+
+    def __init__(self, pipeline, config_path: str = CONFIG_PATH, scheduler: PriorityScheduler = None,
+                 **overrides):
+        settings = dict(DEFAULTS)
+        try:
+            with open(config_path, "r", encoding="utf-8") as f:
+                settings.update((yaml.safe_load(f) or {}).get("admission", {}) or {})
+        except FileNotFoundError:
+            pass
+        settings.update(overrides)
+
+        self.pipeline = pipeline
+        # only its crisis lane is used here; normal traffic runs on the caller's thread
+        self.scheduler = scheduler or PriorityScheduler(pipeline, config_path=config_path)
+        self.user_rate = settings["user_rate_per_min"] / 60.0
+        self.user_burst = settings["user_burst"]
+        self.max_concurrency = settings["max_concurrency"]
+        self.max_queue = settings["max_queue"]
+        self.queue_timeout_s = settings["queue_timeout_s"]
+        self.max_users = settings["max_users"]
+
+        self._buckets = OrderedDict()     # user_id -> TokenBucket (LRU)
+        self._cond = threading.Condition()
+        self._active = 0
+        self._waiting = 0
+        self.stats = Counter()
+
+    def __getattr__(self, name):
+        # add_journal, get_resources, flight_stats, ... pass straight through
+        if name in ("pipeline", "scheduler"):
+            raise AttributeError(name)
+        return getattr(self.pipeline, name)
+
+    # ---------------------------------------------------------
+    # Admission
+    # ---------------------------------------------------------
+    def _bucket(self, user_id: str) -> TokenBucket:
+        bucket = self._buckets.get(user_id)
+        if bucket is None:
+            bucket = self._buckets[user_id] = TokenBucket(self.user_rate, self.user_burst)
+            if len(self._buckets) > self.max_users:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(user_id)
+        return bucket
+
+    def _admit(self, user_id: str):
+        """Take a concurrency slot. Returns None, or the reason for shedding."""
+        with self._cond:
+            reason = self._wait_for_slot(user_id)
+            self.stats[reason or "admitted"] += 1
+            if reason is None:
+                self._active += 1
+            return reason
+
+    def _wait_for_slot(self, user_id: str):
+        # called with self._cond held
+        if not self._bucket(user_id).take():
+            return "rate_limited"
+
+        if self._active >= self.max_concurrency:
+            if self._waiting >= self.max_queue:
+                return "queue_full"
+
+            self._waiting += 1
+            self.stats["queued"] += 1
+            try:
+                ready = self._cond.wait_for(
+                    lambda: self._active < self.max_concurrency,
+                    timeout=self.queue_timeout_s,
+                )
+            finally:
+                self._waiting -= 1
+            if not ready:
+                return "queue_timeout"
+
+        return None
+
+    def _release(self):
+        with self._cond:
+            self._active -= 1
+            self._cond.notify()
+
+    def run(self, user_text: str, lang="en", user_id: str = DEFAULT_USER, cohort: str = None):
+        """Same contract as WellnessPipeline.run(), plus a `shed` key when shed."""
+        reply = self.scheduler.admit_crisis(user_text, lang=lang, user_id=user_id)
+        if reply is not None:
+            with self._cond:
+                self.stats["crisis"] += 1
+            return reply
+
+        reason = self._admit(user_id)
+        if reason is not None:
+            return self.shed_response(user_text, lang=lang, reason=reason, user_id=user_id)
+
+        try:
+            return self.pipeline.run_admitted(user_text, lang=lang, user_id=user_id, cohort=cohort)
+        finally:
+            self._release()
+
+    # ---------------------------------------------------------
+    # Load shedding
+    # ---------------------------------------------------------
+    def shed_response(self, user_text: str, lang="en", reason="overloaded",
+                      user_id: str = DEFAULT_USER):
+        """Local reply, no LLM: see WellnessPipeline.local_response()."""
+        return self.pipeline.local_response(user_text, lang=lang, reason=reason,
+                                            header=REPLY_BUSY, user_id=user_id)
+
+    # ---------------------------------------------------------
+    # Metrics
+    # ---------------------------------------------------------
+    def metrics(self) -> dict:
+        with self._cond:
+            return {
+                "queue_depth": self._waiting,
+                "in_flight": self._active,
+                "max_concurrency": self.max_concurrency,
+                "max_queue": self.max_queue,
+                "tracked_users": len(self._buckets),
+                **self.stats,
+                "crisis_latency": self.scheduler.crisis_stats(),
+            }
@@ -0,0 +1,335 @@
+# src/pipelines/bulk_analysis.py
+
+"""
+Bulk Analysis (backfill) CLI
+----------------------------
+Streams a historical dump through the same stages as the live agent:
+
+    safety check -> mood detection -> analytics logging
+
+Inputs:
+- journal txt (store_journal_entry format: "[timestamp]" / text / dashes)
+- CSV   (text column: text | message | user_message | content)
+- JSONL (same field names)
+Optional `user_id` / `cohort` columns are kept, and mood rows are logged
+to those partitions as well (analytics/partitions.py).
+
+Execution:
+- records are read in fixed-size batches, so memory stays constant
+- CPU-bound local stages (safety scan, keyword mood) run in a process pool
+- LLM mood detection runs on a bounded thread pool (--llm-concurrency);
+  identical texts in flight at the same time share one LLM call
+- results go to a JSONL file; mood rows are bulk-appended to the
+  emotion log once per batch
+- a checkpoint next to the output records progress; re-running the same
+  command resumes after the last completed batch
+- each batch's mood rows and a ledger entry (run id -> records logged) go
+  out in the same state-backend flush, so a run that crashed after
+  logging but before checkpointing does not log those rows again on
+  resume (one transaction with the sqlite backend; with local files or
+  Redis the ledger is the flush's last write)
+
+Crisis-flagged records are reported in the JSONL output but not logged
+to the emotion log (same as the live agent).
+
+Run from the project root:
+    python -m src.pipelines.bulk_analysis dump.txt --out results.jsonl
+    python -m src.pipelines.bulk_analysis chats.csv --out chats.jsonl --detector keyword
+"""
+
+import argparse
+import csv
+import json
+import os
+import time
+import uuid
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime
+from itertools import islice
+
+from src.utils.logger import logger
+
+
+TEXT_FIELDS = ("text", "message", "user_message", "content")
+BULK_LEDGER = os.path.join("data", "bulk_ledger.json")
+JOURNAL_SEPARATOR = "-" * 50
+
+
+# -----------------------------------------------------------
+# Readers (all streaming)
+# -----------------------------------------------------------
+def _journal_timestamp(header: str) -> str:
+    raw = header.strip()[1:-1].replace(" UTC", "")
+    try:
+        return datetime.strptime(raw, "%Y-%m-%d %H:%M:%S").isoformat()
+    except ValueError:
+        return raw
+
+
+def parse_journal(lines):
+    """Journal records from any iterable of lines (file, streamed log, ...)."""
+    timestamp, text = None, []
+    for line in lines:
+        line = line.strip()
+        if line == JOURNAL_SEPARATOR:
+            if text:
+                yield {"timestamp": timestamp, "text": " ".join(text)}
+            timestamp, text = None, []
+        elif not text and timestamp is None and line.startswith("[") and line.endswith("]"):
+            timestamp = _journal_timestamp(line)
+        elif line:
+            text.append(line)
+
+    if text:
+        yield {"timestamp": timestamp, "text": " ".join(text)}
+
+
+def read_journal(path):
+    with open(path, "r", encoding="utf-8") as f:
+        yield from parse_journal(f)
+
+
+def _from_row(row: dict):
+    text = next((row[k] for k in TEXT_FIELDS if row.get(k)), None)
+    if text is None:
+        return None
+    record = {"timestamp": row.get("timestamp"), "text": text}
+    for key in ("user_id", "cohort"):
+        if row.get(key):
+            record[key] = row[key]
+    return record
+
+
+def read_csv(path):
+    with open(path, "r", newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            record = _from_row(row)
+            if record:
+                yield record
+
+
+def read_jsonl(path):
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                record = _from_row(json.loads(line))
+                if record:
+                    yield record
+
+
+READERS = {"journal": read_journal, "csv": read_csv, "jsonl": read_jsonl}
+
+
+def detect_format(path: str) -> str:
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".csv":
+        return "csv"
+    if ext in (".jsonl", ".ndjson"):
+        return "jsonl"
+    return "journal"
+
+
+# -----------------------------------------------------------
+# Worker-side local stages (process pool)
+# -----------------------------------------------------------
+_safety = None
+_keyword = None
+
+
+def _init_worker(config_path: str, detector: str):
+    global _safety, _keyword
+    from src.agent.safety import SafetyManager
+    _safety = SafetyManager(config_path)
+
+    if detector == "keyword":
+        from src.tools.keyword_mood import KeywordMoodClassifier
+        _keyword = KeywordMoodClassifier()
+
+
+def _local_stage(text: str) -> dict:
+    out = {
+        "crisis": _safety.detect_crisis(text),
+        "severity": _safety.severity_score(text),
+    }
+    if _keyword is not None and not out["crisis"]:
+        out["mood"] = _keyword.classify(text)
+    return out
+
+
+# -----------------------------------------------------------
+# Checkpoints
+# -----------------------------------------------------------
+def _load_checkpoint(path: str, input_path: str) -> dict:
+    if not os.path.exists(path):
+        return {"input": input_path, "run": uuid.uuid4().hex, "records_done": 0, "out_bytes": 0}
+
+    with open(path, "r", encoding="utf-8") as f:
+        checkpoint = json.load(f)
+
+    if checkpoint.get("input") != input_path:
+        raise ValueError(f"Checkpoint {path} belongs to {checkpoint.get('input')}, not {input_path}")
+    checkpoint.setdefault("run", uuid.uuid4().hex)
+    return checkpoint
+
+
+def _save_checkpoint(path: str, checkpoint: dict):
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(checkpoint, f)
+    os.replace(tmp, path)
+
+
+# -----------------------------------------------------------
+# Runner
+# -----------------------------------------------------------
+def _llm_mood(text: str, llm) -> dict:
+    from src.tools.mood_detector import detect_mood
+    return detect_mood(text, llm=llm)
+
+
+def run_bulk(input_path: str, out_path: str, fmt: str = None, detector: str = "llm",
+             batch_size: int = 256, workers: int = None, llm_concurrency: int = 8,
+             log_analytics: bool = True, config_path: str = "config/agent.yaml") -> dict:
+    fmt = fmt or detect_format(input_path)
+    checkpoint_path = out_path + ".ckpt"
+    checkpoint = _load_checkpoint(checkpoint_path, input_path)
+    # the run id must be on disk before anything is logged under it
+    _save_checkpoint(checkpoint_path, checkpoint)
+
+    # Drop any output written after the last checkpoint (interrupted batch)
+    if os.path.exists(out_path):
+        with open(out_path, "r+b") as f:
+            f.truncate(checkpoint["out_bytes"])
+
+    analytics = None
+    logged_through = 0
+    if log_analytics:
+        from analytics.logger import analytics_logger
+        analytics = analytics_logger
+        # records below this were logged by an interrupted earlier attempt
+        logged_through = analytics.backend.hget(BULK_LEDGER, checkpoint["run"]) or 0
+
+    llm = None
+    if detector == "llm":
+        from src.llm.client import get_client
+        from src.utils.single_flight import CoalescedLLM
+        llm = CoalescedLLM(get_client())
+
+    records = READERS[fmt](input_path)
+    skipped = checkpoint["records_done"]
+    records = islice(records, skipped, None)
+
+    totals = {"processed": 0, "crisis": 0, "errors": 0, "logged": 0}
+    started = time.perf_counter()
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(config_path, detector)) as cpu_pool, \
+         ThreadPoolExecutor(max_workers=llm_concurrency) as llm_pool, \
+         open(out_path, "a", encoding="utf-8") as out:
+
+        chunksize = max(1, batch_size // (4 * (workers or os.cpu_count() or 1)))
+
+        while True:
+            batch = list(islice(records, batch_size))
+            if not batch:
+                break
+
+            texts = [r["text"] for r in batch]
+            local = list(cpu_pool.map(_local_stage, texts, chunksize=chunksize))
+
+            # LLM stage only for records that are not crises and have no local mood
+            pending = [i for i, l in enumerate(local) if not l["crisis"] and "mood" not in l]
+            futures = {i: llm_pool.submit(_llm_mood, texts[i], llm) for i in pending}
+
+            log_rows = defaultdict(list)    # (user_id, cohort) -> rows
+            batch_end = skipped + totals["processed"] + len(batch)
+            for i, record in enumerate(batch):
+                result = {
+                    "record": skipped + totals["processed"] + i,
+                    "timestamp": record.get("timestamp"),
+                    "crisis": local[i]["crisis"],
+                    "severity": local[i]["severity"],
+                }
+                for key in ("user_id", "cohort"):
+                    if key in record:
+                        result[key] = record[key]
+
+                mood = local[i].get("mood")
+                if i in futures:
+                    try:
+                        mood = futures[i].result()
+                    except Exception as e:
+                        result["error"] = f"{type(e).__name__}: {e}"
+                        totals["errors"] += 1
+
+                if mood:
+                    result.update({
+                        "mood": mood.get("mood"),
+                        "code": mood.get("code"),
+                        "confidence": mood.get("confidence"),
+                    })
+                if mood and result["record"] >= logged_through:
+                    log_rows[record.get("user_id"), record.get("cohort")].append((
+                        record.get("timestamp") or datetime.utcnow().isoformat(),
+                        mood.get("code", mood.get("mood")),
+                        mood.get("confidence"),
+                        record["text"],
+                    ))
+
+                if result["crisis"]:
+                    totals["crisis"] += 1
+
+                out.write(json.dumps(result, ensure_ascii=False) + "\n")
+
+            out.flush()
+            if analytics is not None and log_rows:
+                # one round trip per batch, whatever the number of partitions
+                with analytics.backend.batched():
+                    for (user_id, cohort), rows in log_rows.items():
+                        analytics.log_many(rows, user_id=user_id, cohort=cohort)
+                        totals["logged"] += len(rows)
+                    analytics.backend.hset(BULK_LEDGER, checkpoint["run"], batch_end)
+
+            totals["processed"] += len(batch)
+            checkpoint["records_done"] = batch_end
+            checkpoint["out_bytes"] = out.tell()
+            _save_checkpoint(checkpoint_path, checkpoint)
+
+            logger.info(f"bulk_analysis: {checkpoint['records_done']} records done")
+
+    elapsed = time.perf_counter() - started
+    totals["resumed_from"] = skipped
+    totals["seconds"] = round(elapsed, 2)
+    totals["records_per_s"] = round(totals["processed"] / elapsed, 1) if elapsed else 0.0
+    return totals
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Backfill mood analytics from historical dumps.")
+    parser.add_argument("input", help="journal .txt, .csv or .jsonl file")
+    parser.add_argument("--out", required=True, help="JSONL results file (checkpoint: <out>.ckpt)")
+    parser.add_argument("--format", choices=sorted(READERS), help="override format detection")
+    parser.add_argument("--detector", choices=("llm", "keyword"), default="llm")
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--workers", type=int, default=None, help="process pool size (default: CPU count)")
+    parser.add_argument("--llm-concurrency", type=int, default=8)
+    parser.add_argument("--no-analytics", action="store_true", help="don't append to the emotion log")
+    args = parser.parse_args(argv)
+
+    totals = run_bulk(
+        args.input,
+        args.out,
+        fmt=args.format,
+        detector=args.detector,
+        batch_size=args.batch_size,
+        workers=args.workers,
+        llm_concurrency=args.llm_concurrency,
+        log_analytics=not args.no_analytics,
+    )
+    print(json.dumps(totals, indent=2))
+
+
+if __name__ == "__main__":
+    main()
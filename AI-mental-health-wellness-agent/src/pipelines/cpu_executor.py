@@ -0,0 +1,271 @@
+# src/pipelines/cpu_executor.py
+
+"""
+CPU Stage Executor
+------------------
+Runs the pipeline's pure-Python, CPU-bound stages off the GIL:
+
+    keyword_mood  local mood classification
+    translate_hi  English -> Hindi (rule-based)
+    translate_en  Hindi -> English (rule-based)
+    trend         a TrendTracker method: (method name, kwargs)
+
+- mode="process": a warm process pool. Each worker builds the compiled
+  state once at start-up (keyword automaton, translation regexes, Hindi
+  catalog, trend tracker), and warm() forces every worker up before
+  traffic arrives.
+- The crisis check is not a stage: it is a single regex scan that must
+  never wait behind a batch, so it stays inline (src/pipelines/scheduler.py).
+- Calls from many threads are batched: a dispatcher thread collects up to
+  batch_size calls (or whatever arrives within max_wait_ms) and ships
+  them to a worker in one round trip, amortising pickling / IPC.
+- mode="inline": same stages, same API, run in the calling thread (the
+  default, so nothing changes until a pool is configured)
+- If a worker dies the pool is broken: the calls in flight fail with
+  BrokenProcessPool and a fresh pool is started for the next ones.
+
+Settings come from the `cpu_executor` section of agent.yaml.
+"""
+
+import os
+import queue
+import threading
+import time
+from collections import Counter
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import yaml
+
+
+CONFIG_PATH = "config/agent.yaml"
+
+
+# -----------------------------------------------------------
+# Worker-side state and stages
+# -----------------------------------------------------------
+_state = {}
+
+
+def _init_worker(config_path: str = CONFIG_PATH):
+    """Build the compiled per-process state once (also used inline)."""
+    if _state:
+        return
+
+    from analytics.trend_tracker import TrendTracker
+    from src.tools.keyword_mood import KeywordMoodClassifier
+    from src.tools.translator import get_hindi_catalog, translate_to_english
+
+    _state["keyword"] = KeywordMoodClassifier()
+    _state["hindi"] = get_hindi_catalog()
+    _state["to_english"] = translate_to_english
+    _state["trend"] = TrendTracker(config_path=config_path)
+
+
+def _stage_trend(call) -> object:
+    method, kwargs = call
+    return getattr(_state["trend"], method)(**(kwargs or {}))
+
+
+STAGES = {
+    "keyword_mood": lambda text: _state["keyword"].classify(text),
+    "translate_hi": lambda text: _state["hindi"].translate(text),
+    "translate_en": lambda text: _state["to_english"](text),
+    "trend": _stage_trend,
+}
+
+
+def _run_batch(calls):
+    """Run [(stage, arg), ...] in a worker; errors are returned per call."""
+    results = []
+    for stage, arg in calls:
+        try:
+            results.append((True, STAGES[stage](arg)))
+        except Exception as e:
+            results.append((False, e))
+    return results
+
+
+def _ping(_):
+    return os.getpid()
+
+
+# -----------------------------------------------------------
+# Executor
+# -----------------------------------------------------------
+class CPUExecutor:
+
+    def __init__(self, mode: str = "inline", workers: int = None, batch_size: int = 32,
+                 max_wait_ms: float = 2.0, config_path: str = CONFIG_PATH):
+        if mode not in ("inline", "process"):
+            raise ValueError(f"Unknown executor mode: {mode!r}")
+
+        self.mode = mode
+        self.workers = workers or os.cpu_count() or 1
+        self.batch_size = batch_size
+        self.max_wait_s = max_wait_ms / 1000.0
+        self.config_path = config_path
+        self.stats = Counter()
+
+        self._pool = None
+        self._pool_lock = threading.Lock()
+        self._queue = None
+        self._dispatcher = None
+
+        if mode == "inline":
+            _init_worker(config_path)
+        else:
+            self._pool = self._new_pool()
+            self._queue = queue.Queue()
+            self._dispatcher = threading.Thread(target=self._dispatch_loop,
+                                                name="cpu-batcher", daemon=True)
+            self._dispatcher.start()
+
+    @classmethod
+    def from_config(cls, config_path: str = CONFIG_PATH, **overrides):
+        """Build from the `cpu_executor` section of agent.yaml."""
+        settings = {}
+        try:
+            with open(config_path, "r", encoding="utf-8") as f:
+                settings = (yaml.safe_load(f) or {}).get("cpu_executor", {}) or {}
+        except FileNotFoundError:
+            pass
+        settings.update(overrides)
+
+        return cls(
+            mode=settings.get("mode", "inline"),
+            workers=settings.get("workers") or None,
+            batch_size=settings.get("batch_size", 32),
+            max_wait_ms=settings.get("max_wait_ms", 2.0),
+            config_path=config_path,
+        )
+
+    def _new_pool(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                   initargs=(self.config_path,))
+
+    def _replace_pool(self, broken: ProcessPoolExecutor):
+        """Swap a broken pool for a fresh one (once, however many callers notice)."""
+        with self._pool_lock:
+            if self._pool is not broken:
+                return
+            self._pool = self._new_pool()
+            self.stats["pool_restarts"] += 1
+        broken.shutdown(wait=False)
+
+    def warm(self):
+        """Start every worker (and its preload) now; returns worker pids."""
+        if self._pool is None:
+            return [os.getpid()]
+        return sorted(set(self._pool.map(_ping, range(self.workers * 4))))
+
+    # ---------------------------------------------------------
+    # Single calls (batched across threads)
+    # ---------------------------------------------------------
+    def submit(self, stage: str, arg) -> Future:
+        if stage not in STAGES:
+            raise KeyError(f"Unknown CPU stage: {stage!r}")
+
+        future = Future()
+        if self._pool is None:
+            self._settle(future, *_run_batch([(stage, arg)])[0])
+            return future
+
+        self._queue.put((stage, arg, future))
+        return future
+
+    @staticmethod
+    def _settle(future: Future, ok: bool, value):
+        if ok:
+            future.set_result(value)
+        else:
+            future.set_exception(value)
+
+    def run(self, stage: str, arg):
+        return self.submit(stage, arg).result()
+
+    def _dispatch_loop(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+
+            batch = [item]
+            deadline = time.monotonic() + self.max_wait_s
+            while len(batch) < self.batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if item is None:
+                    self._queue.put(None)       # let the outer loop exit
+                    break
+                batch.append(item)
+
+            try:
+                self._dispatch(batch)
+            except Exception as e:
+                # never let the dispatcher die: later run() calls would hang
+                for _, _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+
+    def _dispatch(self, batch):
+        self.stats["batches"] += 1
+        self.stats["calls"] += len(batch)
+        futures = [f for _, _, f in batch]
+        pool = self._pool
+
+        def deliver(done):
+            try:
+                results = done.result()
+            except Exception as e:          # worker died, pickling failed, ...
+                if isinstance(e, BrokenProcessPool):
+                    self._replace_pool(pool)
+                for f in futures:
+                    f.set_exception(e)
+                return
+            for f, (ok, value) in zip(futures, results):
+                self._settle(f, ok, value)
+
+        try:
+            done = pool.submit(_run_batch, [(s, a) for s, a, _ in batch])
+        except BrokenProcessPool:
+            # a worker died since the last batch; retry once on a fresh pool
+            self._replace_pool(pool)
+            pool = self._pool
+            done = pool.submit(_run_batch, [(s, a) for s, a, _ in batch])
+        done.add_done_callback(deliver)
+
+    # ---------------------------------------------------------
+    # Bulk calls
+    # ---------------------------------------------------------
+    def map(self, stage: str, args) -> list:
+        """Run a stage over many inputs, batch_size per worker round trip."""
+        args = list(args)
+        if self._pool is None:
+            return [STAGES[stage](a) for a in args]
+
+        chunks = [args[i:i + self.batch_size] for i in range(0, len(args), self.batch_size)]
+        out = []
+        pool = self._pool
+        try:
+            for results in pool.map(_run_batch, [[(stage, a) for a in c] for c in chunks]):
+                for ok, value in results:
+                    if not ok:
+                        raise value
+                    out.append(value)
+        except BrokenProcessPool:
+            self._replace_pool(pool)
+            raise
+        return out
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._queue.put(None)
+            self._dispatcher.join()
+            self._pool.shutdown(wait=True)
+            self._pool = None
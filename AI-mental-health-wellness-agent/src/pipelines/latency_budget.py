@@ -0,0 +1,236 @@
+# src/pipelines/latency_budget.py
+
+"""
+Latency Budget
+--------------
+Per-request latency SLO for the LLM path of WellnessPipeline.
+
+- LatencyBudget.call() runs the LLM path (mood detection + response
+  generation) on a worker thread and waits at most slo_ms for it. If it
+  is late, the pipeline answers from the local tier instead (keyword mood
+  + coping suggestions + resources). A late call that has not started is
+  cancelled; one that has is told through its Deadline, so it stops before
+  its next LLM call and drops its writes (the student never saw that
+  reply). At most workers + max_queue calls are pending; past that the
+  fallback answers at once.
+- HedgedLLM: if an LLM call has not returned after hedge_after_ms, a second
+  identical request is sent and whichever answers first wins. At most
+  max_hedge_fraction of calls are hedged, so a slow provider is not hit
+  with double load.
+- snapshot(): how often the SLO was missed and by how much (overrun =
+  completion time of the late call minus the SLO), plus hedge counters
+
+Settings come from the `latency_budget` section of agent.yaml.
+"""
+
+import threading
+import time
+from collections import Counter, deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from concurrent.futures import TimeoutError as FutureTimeout
+
+import yaml
+
+
+CONFIG_PATH = "config/agent.yaml"
+OVERRUN_SAMPLES = 10000
+
+DEFAULTS = {
+    "slo_ms": 8000,
+    "workers": 16,
+    "max_queue": 32,
+    "hedge_after_ms": 0,
+    "max_hedge_fraction": 0.1,
+}
+
+
+def _percentile(sorted_values, pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    rank = max(int(round(pct / 100.0 * len(sorted_values) + 0.5)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+class Deadline:
+    """
+    Passed to a function run under the SLO. It calls commit() right before
+    its side effects (mood log, session turn) and skips them when that
+    returns False: the caller has given up and answered with the fallback.
+    `abandoned` lets it stop early, e.g. before a second LLM call.
+    """
+
+    __slots__ = ("_lock", "_state")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._state = None          # None -> "committed" | "abandoned"
+
+    @property
+    def abandoned(self) -> bool:
+        return self._state == "abandoned"
+
+    def commit(self) -> bool:
+        with self._lock:
+            if self._state is None:
+                self._state = "committed"
+            return self._state == "committed"
+
+    def abandon(self) -> bool:
+        with self._lock:
+            if self._state is None:
+                self._state = "abandoned"
+            return self._state == "abandoned"
+
+
+class LatencyBudget:
+
+    def __init__(self, config_path: str = CONFIG_PATH, **overrides):
+        settings = dict(DEFAULTS)
+        try:
+            with open(config_path, "r", encoding="utf-8") as f:
+                settings.update((yaml.safe_load(f) or {}).get("latency_budget", {}) or {})
+        except FileNotFoundError:
+            pass
+        settings.update(overrides)
+
+        self.slo_s = (settings["slo_ms"] or 0) / 1000.0
+        self.hedge_after_s = (settings["hedge_after_ms"] or 0) / 1000.0
+        self.max_hedge_fraction = settings["max_hedge_fraction"]
+
+        workers = settings["workers"]
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="llm-path")
+        # running + queued LLM-path calls; past this the fallback answers at once
+        self._slots = threading.BoundedSemaphore(workers + settings["max_queue"])
+        # hedged calls wait on two requests at once, so they get their own threads
+        self._llm_pool = ThreadPoolExecutor(max_workers=2 * workers, thread_name_prefix="llm-call")
+
+        self._overruns = deque(maxlen=OVERRUN_SAMPLES)
+        self._lock = threading.Lock()
+        self.stats = Counter()
+
+    def _count(self, key: str, n: int = 1):
+        with self._lock:
+            self.stats[key] += n
+
+    # ---------------------------------------------------------
+    # Deadline
+    # ---------------------------------------------------------
+    def call(self, fn, *args, fallback=None):
+        """
+        fn(*args, deadline=Deadline()) if it finishes within the SLO, else
+        fallback(). Without an SLO (slo_ms: 0) fn runs inline and is never
+        cut off.
+        """
+        self._count("requests")
+        deadline = Deadline()
+        if not self.slo_s or fallback is None:
+            return fn(*args, deadline=deadline)
+
+        if not self._slots.acquire(blocking=False):
+            self._count("queue_full")
+            return fallback()
+
+        start = time.perf_counter()
+        try:
+            future = self._pool.submit(fn, *args, deadline=deadline)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda f: self._slots.release())
+
+        try:
+            result = future.result(timeout=self.slo_s)
+        except FutureTimeout:
+            self._count("slo_missed")
+            if future.cancel():
+                self._count("cancelled")            # never started
+                return fallback()
+            if not deadline.abandon():
+                # already committed its writes: serve it, a little late
+                self._count("late_served")
+                return future.result()
+            future.add_done_callback(lambda f: self._late(f, start))
+            return fallback()
+
+        self._count("within_slo")
+        return result
+
+    def _late(self, future, start: float):
+        overrun = time.perf_counter() - start - self.slo_s
+        with self._lock:
+            self.stats["late_failed" if future.exception() else "late_completed"] += 1
+            self._overruns.append(overrun)
+
+    # ---------------------------------------------------------
+    # Hedging
+    # ---------------------------------------------------------
+    def _may_hedge(self) -> bool:
+        with self._lock:
+            if self.stats["hedges_sent"] >= self.max_hedge_fraction * self.stats["llm_calls"]:
+                self.stats["hedges_skipped"] += 1
+                return False
+            self.stats["hedges_sent"] += 1
+            return True
+
+    def hedged(self, llm, prompt: str, *args, **kwargs):
+        """llm(prompt), with a second request if the first is slow."""
+        self._count("llm_calls")
+        if not self.hedge_after_s:
+            return llm(prompt, *args, **kwargs)
+
+        first = self._llm_pool.submit(llm, prompt, *args, **kwargs)
+        try:
+            return first.result(timeout=self.hedge_after_s)
+        except FutureTimeout:
+            pass
+
+        if not self._may_hedge():
+            return first.result()
+
+        second = self._llm_pool.submit(llm, prompt, *args, **kwargs)
+        done, _ = wait([first, second], return_when=FIRST_COMPLETED)
+        winner = first if first in done else second
+        if winner.exception() is not None:
+            winner = second if winner is first else first   # the other one may still succeed
+
+        if winner is second:
+            self._count("hedge_wins")
+        return winner.result()
+
+    # ---------------------------------------------------------
+    # Metrics
+    # ---------------------------------------------------------
+    def snapshot(self) -> dict:
+        with self._lock:
+            stats = dict(self.stats)
+            overruns = sorted(self._overruns)
+
+        requests = stats.get("requests", 0)
+        ms = lambda v: round(v * 1000, 1)
+        return {
+            "slo_ms": ms(self.slo_s),
+            "hedge_after_ms": ms(self.hedge_after_s),
+            **stats,
+            "slo_miss_rate": round(stats.get("slo_missed", 0) / requests, 4) if requests else 0.0,
+            "overrun_p50_ms": ms(_percentile(overruns, 50)),
+            "overrun_p95_ms": ms(_percentile(overruns, 95)),
+            "overrun_max_ms": ms(overruns[-1]) if overruns else 0.0,
+        }
+
+    def shutdown(self, wait: bool = True):
+        self._pool.shutdown(wait=wait)
+        self._llm_pool.shutdown(wait=wait)
+
+
+class HedgedLLM:
+    """
+    Wraps an LLM callable so slow calls are hedged through a LatencyBudget.
+    Sits under CoalescedLLM: coalesced callers share one hedged call.
+    """
+
+    def __init__(self, llm, budget: LatencyBudget):
+        self.llm = llm
+        self.budget = budget
+
+    def __call__(self, prompt: str, *args, **kwargs):
+        return self.budget.hedged(self.llm, prompt, *args, **kwargs)
@@ -0,0 +1,131 @@
+# src/pipelines/scheduler.py
+
+"""
+Priority Scheduler
+------------------
+Front door for WellnessPipeline under load.
+
+- Every message is admitted by the local safety check first (a single
+  regex scan, no LLM, no disk)
+- Crisis messages are answered inline with the prebuilt crisis reply;
+  they never queue behind normal traffic and never wait on the LLM.
+  The on-call alert is one append to the crisis-alert outbox and is
+  counted in the crisis latency.
+- Normal messages go to a bounded worker pool that runs the LLM path
+
+admit_crisis() is the crisis lane on its own: AdmissionController (the
+front door the Streamlit app uses, src/pipelines/admission.py) runs it
+before any rate limit or queue. submit() adds the worker pool for normal
+traffic (benchmarks/crisis_latency.py).
+
+Crisis latency is measured per message and compared with
+pipeline.crisis_latency_budget_ms in agent.yaml.
+"""
+
+import threading
+import time
+from collections import Counter, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import yaml
+
+from src.tools.coping_suggester import DEFAULT_USER
+
+
+CONFIG_PATH = "config/agent.yaml"
+LATENCY_SAMPLES = 10000
+
+
+def _percentile(sorted_values, pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    rank = max(int(round(pct / 100.0 * len(sorted_values) + 0.5)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+class PriorityScheduler:
+
+    def __init__(self, pipeline, workers: int = None, crisis_budget_ms: float = None,
+                 config_path: str = CONFIG_PATH):
+        settings = {}
+        if workers is None or crisis_budget_ms is None:
+            try:
+                with open(config_path, "r", encoding="utf-8") as f:
+                    settings = (yaml.safe_load(f) or {}).get("pipeline", {}) or {}
+            except FileNotFoundError:
+                pass
+
+        self.pipeline = pipeline
+        self.workers = workers or settings.get("workers", 8)
+        self.crisis_budget_ms = crisis_budget_ms or settings.get("crisis_latency_budget_ms", 20.0)
+
+        self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="wellness")
+        self._crisis_latencies = deque(maxlen=LATENCY_SAMPLES)
+        self._lock = threading.Lock()
+        self.stats = Counter()
+
+    # ---------------------------------------------------------
+    # Submission
+    # ---------------------------------------------------------
+    def submit(self, user_text: str, lang: str = "en", user_id: str = DEFAULT_USER,
+               cohort: str = None) -> Future:
+        """
+        Admit one message. Crisis replies come back as an already
+        completed Future; normal messages are queued on the worker pool.
+        """
+        reply = self.admit_crisis(user_text, lang=lang, user_id=user_id)
+        if reply is not None:
+            future = Future()
+            future.set_result(reply)
+            return future
+
+        with self._lock:
+            self.stats["normal"] += 1
+        return self._pool.submit(self.pipeline.run_admitted, user_text, lang, user_id, cohort)
+
+    def admit_crisis(self, user_text: str, lang: str = "en", user_id: str = DEFAULT_USER):
+        """
+        Crisis lane: the prebuilt crisis reply (and a queued on-call alert)
+        for a crisis message, answered inline; None for any other message.
+        """
+        start = time.perf_counter()
+        if not self.pipeline.is_crisis(user_text):
+            return None
+
+        self.pipeline.report_crisis(user_text, user_id=user_id, lang=lang)
+        reply = self.pipeline.crisis_response(lang)
+        self._record_crisis(time.perf_counter() - start)
+        return reply
+
+    def run(self, user_text: str, lang: str = "en", user_id: str = DEFAULT_USER, cohort: str = None):
+        """Blocking convenience wrapper around submit()."""
+        return self.submit(user_text, lang=lang, user_id=user_id, cohort=cohort).result()
+
+    def _record_crisis(self, seconds: float):
+        with self._lock:
+            self.stats["crisis"] += 1
+            self._crisis_latencies.append(seconds)
+            if seconds * 1000 > self.crisis_budget_ms:
+                self.stats["crisis_over_budget"] += 1
+
+    # ---------------------------------------------------------
+    # Metrics
+    # ---------------------------------------------------------
+    def crisis_stats(self) -> dict:
+        with self._lock:
+            values = sorted(self._crisis_latencies)
+            stats = dict(self.stats)
+
+        ms = lambda v: round(v * 1000, 3)
+        return {
+            "crisis": stats.get("crisis", 0),
+            "normal": stats.get("normal", 0),
+            "over_budget": stats.get("crisis_over_budget", 0),
+            "budget_ms": self.crisis_budget_ms,
+            "p50_ms": ms(_percentile(values, 50)),
+            "p99_ms": ms(_percentile(values, 99)),
+            "max_ms": ms(values[-1]) if values else 0.0,
+        }
+
+    def shutdown(self, wait: bool = True):
+        self._pool.shutdown(wait=wait)
@@ -7,17 +7,74 @@ Pipeline responsibilities:
 - Receive user input request
 - Apply safety checks
 - Detect emotion
-- Run orchestrator (LLM Response Engine)
+- Generate the reply (LLM Response Engine)
 - Log emotional data for dashboard
 - Prepare final structured response
 
 This file acts as a bridge between:
-ADK Agent <--> Tools <--> Orchestrator <--> Analytics
+UI / CLI <--> Tools <--> LLM <--> Analytics
+
+LLM calls are coalesced: identical prompts (mood detection, response
+generation) that are in flight at the same time share one request.
+
+The safety check is an admission step: is_crisis() is a local keyword
+scan and crisis_response() returns a prebuilt reply, so the crisis path
+never touches the LLM (see src/pipelines/scheduler.py). report_crisis()
+queues an alert for on-call counselors with one small append to the
+crisis-alert outbox; delivery happens in the background
+(src/agent/crisis_outbox.py).
+
+Replies on both paths are assembled by _format_reply(): an opening, the
+mood line, coping strategies and resources. Hindi replies reuse the
+pre-translated catalog fragments (src/tools/translator.py); only the
+free-text LLM reply is translated per request.
+
+CPU-bound local stages (keyword mood, translation, trend aggregation) go
+through self.cpu, which runs them inline or on a warm process pool
+(src/pipelines/cpu_executor.py).
+
+The LLM path runs under a latency SLO (src/pipelines/latency_budget.py):
+if it is late, local_response() answers instead and is what gets logged;
+the late LLM path drops its writes. Slow LLM calls may be hedged with a
+second request.
+
+Shared-state writes made while serving a request (mood log rows, the
+session turn, cache entries) are batched into one state-backend round
+trip at the end of the request (src/utils/state_backend.py).
 """
 
-from agent.orchestrator import MentalHealthAgent
-from analytics.trend_tracker import log_emotion
-from agent.safety import check_safety
+import asyncio
+
+from analytics.logger import analytics_logger
+from src.agent.crisis_outbox import get_crisis_outbox
+from src.agent.memory import emotion_memory, session_store
+from src.agent.prompts import (
+    PROMPT_CONVERSATION,
+    REPLY_MOOD_LINE,
+    REPLY_RESOURCES_HEADER,
+    REPLY_SLOW,
+    REPLY_STRATEGIES_HEADER,
+    USER_MESSAGE_WRAPPER,
+)
+from src.agent.safety import SafetyManager
+from src.pipelines.cpu_executor import CPUExecutor
+from src.pipelines.latency_budget import HedgedLLM, LatencyBudget
+from src.tools.coping_suggester import CopingSuggester, DEFAULT_USER
+from src.tools.journal_tool import find_similar_entries, store_journal_entry
+from src.tools.mood_detector import detect_mood
+from src.tools.resource_recommender import recommend_resources
+from src.tools.translator import get_hindi_catalog
+from src.utils.logger import logger
+from src.utils.single_flight import CoalescedLLM, SingleFlight
+from src.utils.state_backend import get_state_backend
+
+CRISIS_LANGS = ("en", "hi")
+
+# Similar past journal entries (the student's own) added to the conversation context
+RECALLED_ENTRIES = 2
+
+# Earlier messages of the session included in the reply prompt
+HISTORY_MESSAGES = 6
 
 
 class WellnessPipeline:
@@ -27,13 +84,60 @@ class WellnessPipeline:
     Entry point: pipeline.run(user_text, lang="en")
     """
 
-    def __init__(self, llm):
-        # Orchestrator is the core AI engine
-        self.orchestrator = MentalHealthAgent(llm)
+    def __init__(self, llm, cpu: CPUExecutor = None, budget: LatencyBudget = None, alerts=None):
+        # Latency SLO for the LLM path; slow LLM calls may be hedged
+        self.budget = budget or LatencyBudget()
+
+        # Identical concurrent prompts share one in-flight (hedged) LLM call
+        self.flights = SingleFlight()
+        self.llm = CoalescedLLM(HedgedLLM(llm, self.budget), self.flights)
+
+        # CPU-bound local stages (inline or process pool, per agent.yaml)
+        self.cpu = cpu or CPUExecutor.from_config()
+
+        # Coping suggestions for both the LLM path and the local tier
+        self.coping = CopingSuggester()
 
-    def run(self, user_text: str, lang="en"):
+        # Crisis replies are built once so serving one costs nothing
+        self.safety = SafetyManager()
+        self._crisis_replies = {
+            lang: {
+                "response": self.safety.get_crisis_response(lang),
+                "emotion": "critical",
+                "intensity": 10,
+                "suggestions": [],
+                "translated": None,
+                "safe": False
+            }
+            for lang in CRISIS_LANGS
+        }
+
+        # On-call counselor alerts (None when crisis_alerts is disabled)
+        self.alerts = alerts or get_crisis_outbox()
+
+    def is_crisis(self, user_text: str) -> bool:
+        """Admission check: local keyword scan only, never blocks."""
+        return self.safety.detect_crisis(user_text)
+
+    def crisis_response(self, lang="en"):
+        """Prebuilt crisis reply (copy, so callers may modify it)."""
+        reply = self._crisis_replies.get(lang, self._crisis_replies["en"])
+        return dict(reply)
+
+    def report_crisis(self, user_text: str, user_id: str = DEFAULT_USER, lang="en", session_id: str = None):
+        """Queue an on-call counselor alert; never waits on delivery."""
+        if self.alerts is None:
+            return
+        try:
+            self.alerts.enqueue(user_id, user_text, session_id=session_id, lang=lang)
+        except OSError as e:
+            # the student still gets the crisis reply
+            logger.error(f"Could not queue crisis alert: {e}")
+
+    def run(self, user_text: str, lang="en", user_id: str = DEFAULT_USER, cohort: str = None):
         """
-        Executes the full wellness pipeline.
+        Executes the full wellness pipeline. Mood rows are logged under
+        `user_id` / `cohort` (see analytics/partitions.py).
 
         Returns:
             {
@@ -47,40 +151,190 @@ class WellnessPipeline:
         """
 
         # 1. Primary safety check
-        safety_flag = check_safety(user_text)
-        if not safety_flag:
-            return {
-                "response": "I’m really concerned about your wellbeing. Please reach out to a trusted adult, counselor, or local mental health helpline immediately.",
-                "emotion": "critical",
-                "intensity": 10,
-                "suggestions": [],
-                "translated": None,
-                "safe": False
-            }
+        if self.is_crisis(user_text):
+            self.report_crisis(user_text, user_id=user_id, lang=lang)
+            return self.crisis_response(lang)
 
-        # 2. Run the mental health agent orchestrator
-        agent_output = self.orchestrator.generate(user_text, lang=lang)
+        return self.run_admitted(user_text, lang=lang, user_id=user_id, cohort=cohort)
 
-        # 3. Log emotion for dashboard trend graph
-        log_emotion(
-            emotion=agent_output["emotion"],
-            intensity=agent_output["intensity"]
+    def run_admitted(self, user_text: str, lang="en", user_id: str = DEFAULT_USER, cohort: str = None):
+        """
+        Normal (non-crisis) path; assumes the safety check already ran.
+        Falls back to local_response() when the LLM path misses the SLO.
+        """
+        return self.budget.call(
+            self._run_llm_path, user_text, lang, user_id, cohort,
+            fallback=lambda: self.local_response(user_text, lang=lang, user_id=user_id,
+                                                 cohort=cohort, record=True),
         )
 
-        # 4. Final structured output for Streamlit/Kaggle
+    def _run_llm_path(self, user_text: str, lang="en", user_id: str = DEFAULT_USER, cohort: str = None,
+                      deadline=None):
+        # every shared-state write below goes out in one round trip at the end
+        with get_state_backend().batched():
+            return self._generate(user_text, lang=lang, user_id=user_id, cohort=cohort, deadline=deadline)
+
+    def _generate(self, user_text: str, lang="en", user_id: str = DEFAULT_USER, cohort: str = None,
+                  deadline=None):
+        """
+        The LLM path. Under a latency budget, `deadline` says whether the
+        caller is still waiting; once it is not, nothing is logged.
+        """
+
+        # Continuity: the student's own session and similar past journal
+        # entries become context; the shared anonymous id gets neither
+        history, recalled = [], []
+        if user_id != DEFAULT_USER:
+            history = session_store.history(user_id, limit=HISTORY_MESSAGES)
+            seen = {m["content"] for m in history if m["role"] == "journal"}
+            recalled = [
+                entry for entry in find_similar_entries(user_text, k=RECALLED_ENTRIES, user_id=user_id)
+                if f"[{entry['timestamp']}] {entry['text']}" not in seen
+            ]
+
+        # 2. Mood detection and coping suggestions
+        mood = self._detect_mood(user_text)
+        suggestions = self.coping.suggest(mood["code"], user_id=user_id, message=user_text)
+        resources = recommend_resources(mood["code"], message=user_text)
+
+        # the student already got the local reply: skip the second LLM call
+        if deadline is not None and deadline.abandoned:
+            return None
+
+        # 3. Supportive reply
+        reply = self.llm(self._conversation_prompt(user_text, recalled, history))
+        opening = self.translate(reply, "hi") if lang == "hi" else reply
+        intensity = round(mood["confidence"] * 10)
+
+        # 4. Log emotion for dashboard trend graph (only for a reply that is served)
+        if deadline is not None and not deadline.commit():
+            return None
+        self._record(user_text, mood, intensity, reply, user_id, cohort, recalled)
+
+        # 5. Final structured output for Streamlit/CLI
         return {
-            "response": agent_output["response"],
-            "emotion": agent_output["emotion"],
-            "intensity": agent_output["intensity"],
-            "suggestions": agent_output["suggestions"],
-            "translated": agent_output["translated"],
+            "response": self._format_reply(opening, mood["mood"], suggestions, resources, lang),
+            "emotion": mood["mood"],
+            "intensity": intensity,
+            "suggestions": suggestions,
+            "translated": None,
             "safe": True
         }
 
-    # Pipeline helper: Journal entry route
-    def add_journal(self, text: str):
-        return self.orchestrator.add_journal(text)
+    @staticmethod
+    def _record(user_text: str, mood: dict, intensity: int, reply: str,
+                user_id: str = DEFAULT_USER, cohort: str = None, recalled=()):
+        """Mood log row, emotion memory and session turn for a reply the student saw."""
+        emotion_memory.record(mood["code"], intensity)
+        analytics_logger.log_mood(mood["code"], mood["confidence"], user_text,
+                                  user_id=None if user_id == DEFAULT_USER else user_id,
+                                  cohort=cohort)
+        # the shared anonymous id has no session: its history is never read
+        if user_id != DEFAULT_USER:
+            session_store.add_turn(user_id, user_text, reply, recalled=recalled)
+
+    def _detect_mood(self, user_text: str) -> dict:
+        """LLM mood (through self.llm); keyword mood when the answer is unusable."""
+        mood = detect_mood(user_text, llm=self.llm)
+        if not isinstance(mood, dict) or "code" not in mood:
+            return self.local_mood(user_text)
+        try:
+            mood["confidence"] = min(max(float(mood.get("confidence") or 0.0), 0.0), 1.0)
+        except (TypeError, ValueError):
+            mood["confidence"] = 0.0
+        return mood
+
+    @staticmethod
+    def _conversation_prompt(user_text: str, recalled, history) -> str:
+        parts = [PROMPT_CONVERSATION.strip()]
+        if recalled:
+            parts.append("Related entries from this student's journal:\n" +
+                         "\n".join(f"- {entry['text']}" for entry in recalled))
+        if history:
+            parts.append("Conversation so far:\n" +
+                         "\n".join(f"{m['role']}: {m['content']}" for m in history))
+        parts.append(USER_MESSAGE_WRAPPER.format(user_message=user_text).strip())
+        return "\n\n".join(parts)
+
+    @staticmethod
+    def _format_reply(opening: str, mood: str, suggestions, resources, lang="en") -> str:
+        """
+        Opening + mood line + strategies + resources. Hindi replies are
+        assembled from pre-translated catalog fragments; `opening` must
+        already be in the reply language.
+        """
+        tr = get_hindi_catalog().translate if lang == "hi" else (lambda text: text)
+        formatted = "\n".join(f"• {tr(s)}" for s in suggestions)
+        resources_fmt = "\n".join(f"• {tr(r['title'])}" for r in resources)
+
+        response = (
+            f"{opening}\n\n"
+            f"{tr(REPLY_MOOD_LINE).format(mood=tr(mood))}\n\n"
+            f"{tr(REPLY_STRATEGIES_HEADER)}\n{formatted}"
+        )
+        if resources_fmt:
+            response += f"\n\n{tr(REPLY_RESOURCES_HEADER)}\n{resources_fmt}"
+        return response
+
+    def local_response(self, user_text: str, lang="en", reason="slo_exceeded",
+                       header: str = REPLY_SLOW, user_id: str = DEFAULT_USER,
+                       cohort: str = None, record: bool = False):
+        """
+        Local-tier reply: keyword mood + coping suggestions + resources, no
+        LLM. With `record`, it is logged like an LLM-path reply.
+        """
+        mood = self.local_mood(user_text)
+        suggestions = self.coping.suggest(mood["code"], user_id=user_id, message=user_text)
+        resources = recommend_resources(mood["code"], message=user_text)
+        opening = get_hindi_catalog().translate(header) if lang == "hi" else header
+        response = self._format_reply(opening, mood["mood"], suggestions, resources, lang)
+        intensity = round(mood["confidence"] * 10)
+
+        if record:
+            with get_state_backend().batched():
+                self._record(user_text, mood, intensity, response, user_id, cohort)
+
+        return {
+            "response": response,
+            "emotion": mood["mood"],
+            "intensity": intensity,
+            "suggestions": suggestions,
+            "translated": None,
+            "safe": True,
+            "shed": reason
+        }
+
+    def latency_stats(self):
+        """SLO misses, overruns and hedging counters."""
+        return self.budget.snapshot()
+
+    async def run_async(self, user_text: str, lang="en"):
+        """
+        asyncio entry point. Runs the pipeline off the event loop; its LLM
+        calls still coalesce with threaded callers through self.flights.
+        """
+        return await asyncio.to_thread(self.run, user_text, lang)
+
+    # Pipeline helpers: CPU-bound local stages
+    def local_mood(self, text: str):
+        """Keyword mood (same result as detect_mood_local)."""
+        return self.cpu.run("keyword_mood", text)
+
+    def translate(self, text: str, lang="hi"):
+        return self.cpu.run("translate_hi" if lang == "hi" else "translate_en", text)
+
+    def trend(self, method: str, **kwargs):
+        """A TrendTracker query for the dashboard, e.g. trend("mood_series", start=...)."""
+        return self.cpu.run("trend", (method, kwargs))
+
+    def flight_stats(self):
+        """Executed / deduplicated / in-flight LLM call counters."""
+        return self.flights.snapshot()
+
+    # Pipeline helper: Journal entry route (the student's own journal)
+    def add_journal(self, text: str, user_id: str = DEFAULT_USER):
+        return store_journal_entry(text, user_id=None if user_id == DEFAULT_USER else user_id)
 
     # Pipeline helper: Mental health resource route
     def get_resources(self, emotion: str):
-        return self.orchestrator.get_resources(emotion)
+        return recommend_resources(emotion)
@@ -8,32 +8,264 @@ Based on the detected mood, this tool provides:
 - Breathing exercises
 - Small actionable micro-steps
 - Student-friendly guidance
+
+Selection:
+- Each user gets a shuffle bag per mood, so no activity repeats until the
+  whole pool has been shown once.
+- Helpfulness feedback re-weights draws through a blocked alias table, so
+  activities that helped tend to come up first in each cycle.
+  Each bag samples from its own table over the activities not yet shown
+  (shown ones drop to weight zero), so the weights hold down to the last
+  activity of a cycle. An update only rebuilds one block plus the
+  block-level table, and every draw is O(1).
+- Given the student's message, activities that match it (TF-IDF cosine,
+  src/tools/semantic_index.py) come first; the bag fills the rest.
 """
 
 import json
 import random
+import threading
+from collections import OrderedDict
 from typing import List
 
+from src.tools.semantic_index import get_suggestion_index
+from src.utils.moods import to_code
+
+
+FALLBACK_SUGGESTIONS = [
+    "Try a short breathing exercise (inhale 4s, hold 2s, exhale 6s).",
+    "Drink some water and stretch your body for 30 seconds.",
+    "Write down what you're feeling in a small journal entry."
+]
+
+DEFAULT_USER = "anonymous"
+
+
+def _build_alias(weights):
+    """Vose's alias method. Returns (prob, alias) lists."""
+    n = len(weights)
+    total = float(sum(weights))
+    prob = [0.0] * n
+    alias = [0] * n
+
+    if n == 0 or total <= 0:
+        return [1.0] * n, list(range(n))
+
+    # leftovers below must never land on a zero-weight item
+    heaviest = max(range(n), key=weights.__getitem__)
+
+    scaled = [w * n / total for w in weights]
+    small = [i for i, p in enumerate(scaled) if p < 1.0]
+    large = [i for i, p in enumerate(scaled) if p >= 1.0]
+
+    while small and large:
+        s, l = small.pop(), large.pop()
+        prob[s] = scaled[s]
+        alias[s] = l
+        scaled[l] = scaled[l] + scaled[s] - 1.0
+        (small if scaled[l] < 1.0 else large).append(l)
+
+    for i in small + large:
+        # only reached through rounding error
+        if weights[i] > 0:
+            prob[i] = 1.0
+            alias[i] = i
+        else:
+            prob[i] = 0.0
+            alias[i] = heaviest
+
+    return prob, alias
+
+
+class AliasTable:
+    """
+    Weighted sampler with O(1) draws and cheap single-weight updates.
+
+    Items are split into fixed-size blocks. Each block has its own alias
+    table, and a top-level alias table picks a block by its total weight.
+    update() rebuilds one block (O(BLOCK)) and the top level (O(n / BLOCK)).
+    """
+
+    BLOCK = 64
+
+    def __init__(self, weights):
+        self.weights = [float(w) for w in weights]
+        self.blocks = []
+        self.block_totals = []
+
+        for start in range(0, len(self.weights), self.BLOCK):
+            chunk = self.weights[start:start + self.BLOCK]
+            self.blocks.append(_build_alias(chunk))
+            self.block_totals.append(sum(chunk))
+
+        self.top = _build_alias(self.block_totals)
+
+    def update(self, index: int, weight: float):
+        self.weights[index] = float(weight)
+
+        b = index // self.BLOCK
+        start = b * self.BLOCK
+        chunk = self.weights[start:start + self.BLOCK]
+        self.blocks[b] = _build_alias(chunk)
+        self.block_totals[b] = sum(chunk)
+        self.top = _build_alias(self.block_totals)
+
+    def sample(self, rng) -> int:
+        b = self._draw(self.top, rng)
+        return b * self.BLOCK + self._draw(self.blocks[b], rng)
+
+    @staticmethod
+    def _draw(table, rng) -> int:
+        prob, alias = table
+        i = rng.randrange(len(prob))
+        return i if rng.random() < prob[i] else alias[i]
+
+
+class _Bag:
+    """
+    Shuffle bag over pool indices with O(1) removal.
+    `remaining` holds unseen indices, `pos` maps index -> slot in remaining.
+    Once the user has given feedback, `table` holds their weights and
+    `cycle` the same weights with every index already shown set to zero.
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self.remaining = []
+        self.pos = {}
+        self.table = None     # AliasTable once the user has given feedback
+        self.cycle = None     # AliasTable over `remaining` only
+        self.refill()
+
+    def refill(self):
+        self.remaining = list(range(self.size))
+        self.pos = {i: i for i in self.remaining}
+        if self.table is not None:
+            self.cycle = AliasTable(self.table.weights)
+
+    def take(self, i: int):
+        slot = self.pos.pop(i)
+        last = self.remaining.pop()
+        if last != i:
+            self.remaining[slot] = last
+            self.pos[last] = slot
+        if self.cycle is not None:
+            self.cycle.update(i, 0.0)
+
+    def weight(self, i: int) -> float:
+        return self.table.weights[i] if self.table is not None else 1.0
+
+    def set_weight(self, i: int, weight: float):
+        if self.table is None:
+            self.table = AliasTable([1.0] * self.size)
+            self.cycle = AliasTable([1.0 if j in self.pos else 0.0 for j in range(self.size)])
+        self.table.update(i, weight)
+        if i in self.pos:
+            self.cycle.update(i, weight)
+
 
 class CopingSuggester:
-    def __init__(self, activities_file="data/activities.json"):
+    def __init__(self, activities_file="data/activities.json", max_users=10000, seed=None):
         with open(activities_file, "r") as f:
-            self.activities = json.load(f)
+            raw = json.load(f)
+
+        # mood code -> activity list
+        self.activities = {}
+        for label, items in raw.items():
+            code = to_code(label, default=None)
+            if code is not None:
+                self.activities.setdefault(code, []).extend(items)
+
+        # activity text -> index, per mood code (for feedback)
+        self.positions = {
+            code: {text: i for i, text in enumerate(items)}
+            for code, items in self.activities.items()
+        }
+
+        self.max_users = max_users
+        self._users = OrderedDict()     # user_id -> {mood code: _Bag}
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
 
-    def suggest(self, mood: str, count: int = 3) -> List[str]:
-        mood = mood.lower().strip()
+    def _bag(self, user_id: str, mood: int) -> _Bag:
+        bags = self._users.get(user_id)
+        if bags is None:
+            bags = self._users[user_id] = {}
+            if len(self._users) > self.max_users:
+                self._users.popitem(last=False)
+        else:
+            self._users.move_to_end(user_id)
+
+        bag = bags.get(mood)
+        if bag is None:
+            bag = bags[mood] = _Bag(len(self.activities[mood]))
+        return bag
+
+    def _draw(self, bag: _Bag, exclude) -> int:
+        if not bag.remaining:
+            bag.refill()
+            for i in exclude:
+                bag.take(i)
+
+        if bag.cycle is not None:
+            # shown items have weight zero, so this is always an unseen one
+            i = bag.cycle.sample(self._rng)
+        else:
+            i = bag.remaining[self._rng.randrange(len(bag.remaining))]
+
+        bag.take(i)
+        return i
+
+    def _relevant(self, message: str, mood: int, count: int) -> List[int]:
+        """Indices of this mood's activities that match the message, best first."""
+        hits = get_suggestion_index().search(message, k=count, kind="activity", mood=mood)
+        positions = self.positions[mood]
+        return [positions[doc["text"]] for _, doc in hits if doc["text"] in positions]
+
+    def suggest(self, mood, count: int = 3, user_id: str = DEFAULT_USER,
+                message: str = None) -> List[str]:
+        """
+        `mood` may be a mood code or any label/alias. With `message`,
+        activities relevant to what the student wrote are picked first.
+        """
+        mood = to_code(mood, default=None)
 
         if mood not in self.activities:
-            return [
-                "Try a short breathing exercise (inhale 4s, hold 2s, exhale 6s).",
-                "Drink some water and stretch your body for 30 seconds.",
-                "Write down what you're feeling in a small journal entry."
-            ]
+            return list(FALLBACK_SUGGESTIONS)
 
         suggestions = self.activities[mood]
 
         if len(suggestions) <= count:
-            return suggestions
+            return list(suggestions)
+
+        relevant = self._relevant(message, mood, count) if message else []
+
+        with self._lock:
+            bag = self._bag(user_id, mood)
+            # relevant activities already shown this cycle wait for the next one
+            picked = [i for i in relevant if i in bag.pos]
+            for i in picked:
+                bag.take(i)
+            while len(picked) < count:
+                picked.append(self._draw(bag, picked))
+
+        return [suggestions[i] for i in picked]
+
+    def record_feedback(self, mood, activity: str, helpful: bool = True,
+                        user_id: str = DEFAULT_USER):
+        """
+        Re-weight an activity for this user.
+        Helpful feedback raises its weight, unhelpful lowers it (never to zero).
+        """
+        mood = to_code(mood, default=None)
+        index = self.positions.get(mood, {}).get(activity)
+        if index is None:
+            return False
+
+        with self._lock:
+            bag = self._bag(user_id, mood)
+            current = bag.weight(index)
+            weight = current + 1.0 if helpful else max(current * 0.5, 0.1)
+            bag.set_weight(index, weight)
 
-        # Random multiple suggestions (always fresh)
-        return random.sample(suggestions, count)
+        return True
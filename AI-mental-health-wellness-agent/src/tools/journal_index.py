@@ -0,0 +1,276 @@
+# src/tools/journal_index.py
+
+"""
+Journal Similarity Index
+------------------------
+MinHash / LSH index over journal entries, so the agent can recall similar
+past entries ("last week you felt this before your presentation") without
+scanning the whole journal.
+
+- Shingles: content words (stopwords dropped); journal entries are short,
+  and word pairs would dilute the overlap between related entries
+- MinHash: NUM_PERM universal hashes, computed for all shingles at once
+  with NumPy; signatures are stored as 16-bit (b-bit MinHash) to halve
+  memory, which barely moves the similarity estimate
+- LSH: BANDS x ROWS banding; each band hash is kept in a sorted uint32
+  array, so a lookup is BANDS binary searches instead of a scan.
+  New entries land in a small unsorted tail that is merged in batches.
+- Candidates are re-ranked by signature agreement (estimated Jaccard)
+
+The index follows the journal log in the state backend: refresh() fetches
+only the bytes appended since the last call (by this or any other process
+or replica), and store_journal_entry() refreshes the process-wide index
+after each write (refresh_journal_index). There is one index per journal (i.e. per student, see
+journal_tool.journal_path); the least recently used are dropped past
+MAX_INDEXES and rebuilt from the log on next use.
+"""
+
+import re
+import threading
+import zlib
+from collections import OrderedDict
+
+import numpy as np
+
+from src.utils.state_backend import get_state_backend
+
+
+NUM_PERM = 48
+BANDS = 24
+ROWS = NUM_PERM // BANDS
+
+# Unsorted band hashes allowed before they are merged into the sorted arrays
+TAIL_LIMIT = 4096
+# Cap on ids taken from a single band bucket (most recent first)
+MAX_BUCKET = 512
+# Journals with an index kept in memory (least recently used are dropped)
+MAX_INDEXES = 512
+
+_PRIME = (1 << 31) - 1
+_SEPARATOR = b"\n" + b"-" * 50 + b"\n"
+_TOKEN = re.compile(r"[a-z0-9']+")
+
+STOPWORDS = frozenset("""
+a an the and or but if so to of in on at for with about from by as is are was were be been
+am i me my we our you your he she it they them this that these those just very really do
+did does have has had not no can can't cannot will would could should im i'm it's its
+""".split())
+
+
+def shingles(text: str):
+    words = [w.strip("'") for w in _TOKEN.findall(text.lower())]
+    words = [w for w in words if w and w not in STOPWORDS]
+    return set(words)
+
+
+class MinHasher:
+
+    def __init__(self, num_perm: int = NUM_PERM, seed: int = 1):
+        rng = np.random.default_rng(seed)
+        self.num_perm = num_perm
+        self.a = rng.integers(1, _PRIME, size=num_perm, dtype=np.uint64)
+        self.b = rng.integers(0, _PRIME, size=num_perm, dtype=np.uint64)
+
+    def signature(self, text: str) -> np.ndarray:
+        """uint32 MinHash signature; empty for texts without shingles (they match nothing)."""
+        grams = shingles(text)
+        if not grams:
+            return np.empty(0, dtype=np.uint32)
+
+        x = np.fromiter((zlib.crc32(g.encode("utf-8")) for g in grams),
+                        dtype=np.uint64, count=len(grams)) % _PRIME
+        # (a * x + b) mod p < 2^62, so uint64 never overflows
+        hashed = (self.a[:, None] * x[None, :] + self.b[:, None]) % _PRIME
+        return hashed.min(axis=1).astype(np.uint32)
+
+
+def _band_hashes(signatures: np.ndarray) -> np.ndarray:
+    """(n, NUM_PERM) uint32 -> (n, BANDS) uint32 band hashes."""
+    n = signatures.shape[0]
+    rows = signatures.reshape(n, BANDS, ROWS).astype(np.uint64)
+    h = np.zeros((n, BANDS), dtype=np.uint64)
+    for r in range(ROWS):
+        # FNV-style mix; wraps mod 2^64
+        h = (h ^ rows[:, :, r]) * np.uint64(1099511628211)
+    return (h ^ (h >> np.uint64(32))).astype(np.uint32)
+
+
+class JournalIndex:
+
+    def __init__(self, path: str = None):
+        self.path = path
+        self.hasher = MinHasher()
+
+        self.entries = []                                   # (timestamp, text)
+        self._sigs = np.empty((0, NUM_PERM), dtype=np.uint16)
+        self._count = 0
+
+        # per band: sorted hashes + matching entry ids (entries < _indexed)
+        self._sorted_hash = np.empty((BANDS, 0), dtype=np.uint32)
+        self._sorted_ids = np.empty((BANDS, 0), dtype=np.uint32)
+        self._indexed = 0
+        self._tail = []                                     # band hashes of entries >= _indexed
+
+        self._offset = 0                                    # bytes of the journal consumed
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return self._count
+
+    # ---------------------------------------------------------
+    # Building
+    # ---------------------------------------------------------
+    def _grow(self, extra: int):
+        need = self._count + extra
+        if need > self._sigs.shape[0]:
+            capacity = max(need, 2 * self._sigs.shape[0], 64)
+            sigs = np.empty((capacity, NUM_PERM), dtype=np.uint16)
+            sigs[:self._count] = self._sigs[:self._count]
+            self._sigs = sigs
+
+    def add_many(self, items):
+        """Index (timestamp, text) pairs; entries without content words are skipped."""
+        signed = [(item, self.hasher.signature(item[1])) for item in items]
+        signed = [(item, sig) for item, sig in signed if sig.size]
+        if not signed:
+            return
+
+        items = [item for item, _ in signed]
+        signatures = np.stack([sig for _, sig in signed])
+        bands = _band_hashes(signatures)
+
+        with self._lock:
+            self._grow(len(items))
+            self._sigs[self._count:self._count + len(items)] = signatures
+            self.entries.extend(items)
+            self._count += len(items)
+            self._tail.extend(bands)
+
+            if len(self._tail) > TAIL_LIMIT:
+                self._merge_tail()
+
+    def add(self, text: str, timestamp: str = None):
+        self.add_many([(timestamp, text)])
+
+    def _merge_tail(self):
+        tail = np.asarray(self._tail, dtype=np.uint32).T          # (BANDS, t)
+        ids = np.arange(self._indexed, self._count, dtype=np.uint32)
+
+        hashes = np.concatenate([self._sorted_hash, tail], axis=1)
+        all_ids = np.concatenate([self._sorted_ids, np.broadcast_to(ids, tail.shape)], axis=1)
+
+        # stable sort keeps ids ascending inside each bucket (oldest first)
+        order = np.argsort(hashes, axis=1, kind="stable")
+        self._sorted_hash = np.take_along_axis(hashes, order, axis=1)
+        self._sorted_ids = np.take_along_axis(all_ids, order, axis=1)
+        self._indexed = self._count
+        self._tail = []
+
+    # ---------------------------------------------------------
+    # Following the journal file
+    # ---------------------------------------------------------
+    @staticmethod
+    def _parse(block: bytes):
+        lines = block.decode("utf-8", errors="replace").strip().splitlines()
+        if not lines:
+            return None
+        timestamp = None
+        if lines[0].startswith("[") and lines[0].endswith("]"):
+            timestamp, lines = lines[0][1:-1], lines[1:]
+        text = "\n".join(lines).strip()
+        return (timestamp, text) if text else None
+
+    def refresh(self):
+        """Index entries appended to the journal since the last refresh."""
+        if self.path is None:
+            return 0
+
+        with self._lock:
+            data = get_state_backend().read(self.path, self._offset)
+
+            end = data.rfind(_SEPARATOR)
+            if end < 0:
+                return 0
+
+            blocks = data[:end].split(_SEPARATOR)
+            items = [e for e in map(self._parse, blocks) if e is not None]
+            self._offset += end + len(_SEPARATOR)
+            self.add_many(items)
+            return len(items)
+
+    # ---------------------------------------------------------
+    # Querying
+    # ---------------------------------------------------------
+    def _candidates(self, bands: np.ndarray) -> np.ndarray:
+        found = []
+        for band in range(BANDS):
+            h = bands[band]
+            column = self._sorted_hash[band]
+            lo = np.searchsorted(column, h, "left")
+            hi = np.searchsorted(column, h, "right")
+            if hi > lo:
+                found.append(self._sorted_ids[band, max(lo, hi - MAX_BUCKET):hi])
+
+        if self._tail:
+            tail = np.asarray(self._tail, dtype=np.uint32)
+            hits = np.flatnonzero((tail == bands).any(axis=1))
+            found.append((hits + self._indexed).astype(np.uint32))
+
+        if not found:
+            return np.empty(0, dtype=np.int64)
+        return np.unique(np.concatenate(found)).astype(np.int64)
+
+    def similar(self, text: str, k: int = 3, min_similarity: float = 0.2):
+        """
+        Up to k past entries most similar to `text`, best first:
+        [{"timestamp", "text", "similarity"}, ...]
+        """
+        signature = self.hasher.signature(text)
+        if signature.size == 0:
+            return []
+        bands = _band_hashes(signature[None, :])[0]
+
+        with self._lock:
+            candidates = self._candidates(bands)
+            if candidates.size == 0:
+                return []
+            agree = (self._sigs[candidates] == signature.astype(np.uint16)).mean(axis=1)
+
+        keep = agree >= min_similarity
+        candidates, agree = candidates[keep], agree[keep]
+        top = np.argsort(-agree, kind="stable")[:k]
+
+        return [
+            {
+                "timestamp": self.entries[candidates[i]][0],
+                "text": self.entries[candidates[i]][1],
+                "similarity": round(float(agree[i]), 3),
+            }
+            for i in top
+        ]
+
+
+_indexes = OrderedDict()
+_indexes_lock = threading.Lock()
+
+
+def get_journal_index(path: str) -> JournalIndex:
+    """Process-wide index for one journal file, caught up with the file."""
+    with _indexes_lock:
+        index = _indexes.get(path)
+        if index is None:
+            index = _indexes[path] = JournalIndex(path)
+            if len(_indexes) > MAX_INDEXES:
+                _indexes.popitem(last=False)
+        else:
+            _indexes.move_to_end(path)
+    index.refresh()
+    return index
+
+
+def refresh_journal_index(path: str):
+    """Catch up the process-wide index for `path` if one is loaded; never builds one."""
+    with _indexes_lock:
+        index = _indexes.get(path)
+    if index is not None:
+        index.refresh()
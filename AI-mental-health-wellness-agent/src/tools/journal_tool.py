@@ -3,13 +3,32 @@
 import os
 from datetime import datetime
 
+from src.tools.journal_index import get_journal_index, refresh_journal_index
+from src.utils.state_backend import get_state_backend, hashed_name
+
+# Journal text lives in the shared state backend (src/utils/state_backend.py);
+# with the default local backend this is the plain text file below.
 JOURNAL_PATH = "data/journal_entries.txt"
 
+# A student's own journal: one log per user (hashed id), so reads and
+# similarity recall never see another student's entries
+JOURNAL_DIR = os.path.join("data", "journals")
+
+
+def journal_path(user_id=None) -> str:
+    """The student's own journal, or the shared JOURNAL_PATH without a user."""
+    if user_id is None:
+        return JOURNAL_PATH
+    return hashed_name(JOURNAL_DIR, user_id, ".txt")
 
-def store_journal_entry(text: str):
+
+def store_journal_entry(text: str, path: str = None, user_id=None):
     """
     Saves a student's journal entry with timestamp.
     Creates the file if not present.
+    The entry is appended in one write (under an exclusive file lock
+    with the local backend), so concurrent writers never interleave.
+    With a user_id it goes to that student's own journal.
 
     Returns:
         {
@@ -19,14 +38,16 @@ def store_journal_entry(text: str):
         }
     """
 
-    os.makedirs("data", exist_ok=True)
+    path = path or journal_path(user_id)
 
     timestamp = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S UTC")
 
     entry = f"\n[{timestamp}]\n{text}\n{'-'*50}\n"
 
-    with open(JOURNAL_PATH, "a", encoding="utf-8") as f:
-        f.write(entry)
+    get_state_backend().append(path, entry)
+
+    # keep an already-loaded similarity index in step with the file
+    refresh_journal_index(path)
 
     return {
         "status": "saved",
@@ -35,16 +56,13 @@ def store_journal_entry(text: str):
     }
 
 
-def read_journal_entries(limit: int = 5):
+def read_journal_entries(limit: int = 5, path: str = None, user_id=None):
     """
-    Returns the most recent N journal entries.
+    Returns the most recent N journal entries (of one student with a user_id).
     """
 
-    if not os.path.exists(JOURNAL_PATH):
-        return []
-
-    with open(JOURNAL_PATH, "r", encoding="utf-8") as f:
-        content = f.read().strip()
+    path = path or journal_path(user_id)
+    content = get_state_backend().read(path).decode("utf-8").strip()
 
     if not content:
         return []
@@ -54,3 +72,13 @@ def read_journal_entries(limit: int = 5):
     entries = [e.strip() for e in entries if e.strip()]
 
     return entries[-limit:]
+
+
+def find_similar_entries(text: str, k: int = 3, path: str = None, user_id=None):
+    """
+    Past journal entries most similar to `text` (MinHash/LSH, see
+    src/tools/journal_index.py), best first:
+        [{"timestamp": "...", "text": "...", "similarity": 0.42}, ...]
+    With a user_id only that student's own entries are searched.
+    """
+    return get_journal_index(path or journal_path(user_id)).similar(text, k=k)
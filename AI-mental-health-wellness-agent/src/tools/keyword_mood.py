@@ -0,0 +1,82 @@
+# src/tools/keyword_mood.py
+
+"""
+Keyword Mood Classifier
+-----------------------
+Local, LLM-free mood guess from the signal phrases in data/emotions.json
+plus the taxonomy aliases (src/utils/moods.py).
+
+Used where an LLM call is too slow or unavailable:
+- bulk backfills of historical logs
+- fallback answers when the LLM misses its deadline
+
+Returns the same shape as detect_mood().
+"""
+
+import json
+import re
+
+from src.utils.moods import ALIASES, Mood, to_label
+
+
+EMOTIONS_FILE = "data/emotions.json"
+
+
+class KeywordMoodClassifier:
+
+    def __init__(self, emotions_file=EMOTIONS_FILE):
+        with open(emotions_file, "r", encoding="utf-8") as f:
+            emotions = json.load(f)
+
+        phrases = {}
+        for label, info in emotions.items():
+            code = ALIASES.get(label)
+            if code is None:
+                continue
+            phrases[label] = code
+            for signal in info.get("signals", []):
+                phrases[signal.lower()] = code
+
+        for alias, code in ALIASES.items():
+            if code != Mood.CRITICAL:
+                phrases.setdefault(alias, code)
+
+        self.phrases = phrases
+
+        # One alternation, longest phrases first so "feeling down" beats "down"
+        ordered = sorted(phrases, key=len, reverse=True)
+        self._pattern = re.compile(r"\b(" + "|".join(re.escape(p) for p in ordered) + r")\b")
+
+    def classify(self, text: str) -> dict:
+        hits = {}
+        for match in self._pattern.finditer(text.lower()):
+            code = self.phrases[match.group(1)]
+            hits[code] = hits.get(code, 0) + 1
+
+        if not hits:
+            return {
+                "mood": to_label(Mood.NEUTRAL),
+                "code": int(Mood.NEUTRAL),
+                "confidence": 0.3,
+                "reason": "no mood keywords found"
+            }
+
+        code = max(hits, key=hits.get)
+        share = hits[code] / sum(hits.values())
+        return {
+            "mood": to_label(code),
+            "code": int(code),
+            "confidence": round(0.4 + 0.4 * share, 2),
+            "reason": "keyword match"
+        }
+
+
+_classifier = None
+
+
+def detect_mood_local(text: str) -> dict:
+    """Module-level shortcut with a lazily built classifier."""
+    global _classifier
+    if _classifier is None:
+        _classifier = KeywordMoodClassifier()
+    return _classifier.classify(text)
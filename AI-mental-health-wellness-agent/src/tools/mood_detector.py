@@ -3,27 +3,47 @@
 """
 Mood Detector Tool
 ------------------
-Uses an LLM (via ADK runtime) to classify the emotional tone of a student's text.
+Uses an LLM (via src.llm.client, configured from the `model` section of
+config/agent.yaml) to classify the emotional tone of a student's text.
 Produces a structured JSON containing:
 - mood label
+- mood code (src.utils.moods)
 - confidence score
 - short reasoning
 """
 
-from adk import tool
+import json
 
+from src.llm.client import get_client
+from src.utils.moods import MOOD_LABELS, to_code, to_label
 
-@tool()
-def detect_mood(user_input: str) -> dict:
+MOOD_CHOICES = ", ".join(MOOD_LABELS)
+
+
+def _parse_result(text: str):
+    """Parse the model's JSON answer, tolerating code fences around it."""
+    text = text.strip().strip("`")
+    if text.startswith("json"):
+        text = text[4:]
+    try:
+        return json.loads(text)
+    except ValueError:
+        return {"mood": text.strip(), "confidence": 0.0, "reason": "unparsed model output"}
+
+
+def detect_mood(user_input: str, llm=None) -> dict:
     """
     Detects the emotional tone of the user's message.
 
     Args:
         user_input (str): The message provided by the student.
+        llm: LLM callable to use (e.g. the pipeline's coalesced/hedged
+            LLM); defaults to the process-wide client.
 
     Returns:
         dict: {
             "mood": <emotion_label>,
+            "code": <mood code>,
             "confidence": <0-1>,
             "reason": <short explanation>
         }
@@ -38,13 +58,19 @@ def detect_mood(user_input: str) -> dict:
 
     Respond ONLY in JSON with the schema:
     {{
-        "mood": "<one of: happy, sad, stressed, anxious, angry, neutral>",
+        "mood": "<one of: {MOOD_CHOICES}>",
         "confidence": <0-1 float>,
         "reason": "<very short explanation>"
     }}
     """
 
-    # ADK internal LLM call
-    result = detect_mood.llm(prompt)
+    # Pooled, rate-limited LLM call
+    result = _parse_result((llm or get_client())(prompt))
+
+    # Normalise whatever label the model used onto the taxonomy
+    if isinstance(result, dict) and "mood" in result:
+        code = to_code(result["mood"])
+        result["mood"] = to_label(code)
+        result["code"] = int(code)
 
     return result
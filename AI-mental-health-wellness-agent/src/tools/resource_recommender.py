@@ -2,16 +2,20 @@
 
 import json
 import os
+import threading
+
+from src.tools.semantic_index import get_suggestion_index
+from src.utils.moods import to_code
 
 RESOURCES_PATH = "data/resources.json"
 
 # Default resources (auto-created on first run)
 DEFAULT_RESOURCES = {
-    "stress": [
+    "stressed": [
         {"title": "Deep Breathing Exercise", "link": "https://www.youtube.com/watch?v=UxedG8tEJ6Y"},
         {"title": "5-min Stress Relief Routine", "link": "https://www.youtube.com/watch?v=inpok4MKVLM"},
     ],
-    "anxiety": [
+    "anxious": [
         {"title": "Guided Meditation for Anxiety", "link": "https://www.youtube.com/watch?v=O-6f5wQXSu8"},
         {"title": "Anxiety Advice for Students", "link": "https://www.mind.org.uk/information-support/types-of-mental-health-problems/anxiety/about-anxiety/"},
     ],
@@ -30,6 +34,10 @@ DEFAULT_RESOURCES = {
 }
 
 
+DEFAULT_BUCKET = "default"
+DEFAULT_LANG = "en"
+
+
 def _ensure_resources_file():
     """Creates resources.json if missing."""
     os.makedirs("data", exist_ok=True)
@@ -39,12 +47,111 @@ def _ensure_resources_file():
             json.dump(DEFAULT_RESOURCES, f, indent=4)
 
 
-def recommend_resources(emotion: str):
+class ResourceIndex:
+    """
+    In-memory index over resources.json.
+
+    - File is parsed once and re-parsed only when its mtime changes
+    - Buckets are keyed by mood code, so any alias of a mood ("stress",
+      "stressed", "Stressed ") lands in the same bucket
+    - Every (bucket, tag, lang) combination is precomputed, with None
+      standing for "any", so each lookup is a single dict access
+
+    Resource items may optionally carry:
+        "tags": ["sleep", "exam", ...]
+        "lang": "en" | "hi" | ...     (defaults to "en")
+    """
+
+    def __init__(self, path=RESOURCES_PATH):
+        self.path = path
+        self._mtime = None
+        self._index = {}
+        self._lock = threading.Lock()
+
+    def _build(self, resources: dict):
+        index = {}
+
+        for name, items in resources.items():
+            bucket = self._bucket_key(name)
+            for item in items:
+                tags = [None] + [t.lower() for t in item.get("tags", [])]
+                langs = (None, item.get("lang", DEFAULT_LANG).lower())
+
+                for tag in tags:
+                    for lang in langs:
+                        index.setdefault((bucket, tag, lang), []).append(item)
+
+        self._index = index
+
+    @staticmethod
+    def _bucket_key(emotion):
+        """Mood code for known moods, the lowercased name for anything else."""
+        code = to_code(emotion, default=None)
+        if code is not None:
+            return code
+        return str(emotion).strip().lower()
+
+    def _refresh(self):
+        """(Re)load the catalogue if the file is new or has changed."""
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            mtime = None
+
+        if mtime is not None and mtime == self._mtime:
+            return
+
+        with self._lock:
+            if mtime is None:
+                _ensure_resources_file()
+                mtime = os.stat(self.path).st_mtime_ns
+
+            if mtime == self._mtime:
+                return
+
+            with open(self.path, "r", encoding="utf-8") as f:
+                resources = json.load(f)
+
+            self._build(resources)
+            self._mtime = mtime
+
+    def titles(self):
+        """Every resource title in the catalogue (for the translation catalog)."""
+        self._refresh()
+        return sorted({
+            item["title"]
+            for (bucket, tag, lang), items in self._index.items()
+            if tag is None and lang is None
+            for item in items
+        })
+
+    def lookup(self, emotion: str, tag: str = None, lang: str = None):
+        self._refresh()
+
+        bucket = self._bucket_key(emotion)
+        tag = tag.lower() if tag else None
+        lang = lang.lower() if lang else None
+
+        found = self._index.get((bucket, tag, lang))
+        if found is None and bucket != DEFAULT_BUCKET:
+            found = self._index.get((DEFAULT_BUCKET, tag, lang))
+
+        return list(found or [])
+
+
+resource_index = ResourceIndex()
+
+
+def recommend_resources(emotion: str, tag: str = None, lang: str = None, message: str = None):
     """
     Returns mental-health resources based on detected emotion.
     
     Inputs:
-        - emotion: string label (e.g., "stress", "sad", "anxiety")
+        - emotion: mood code or any label/alias (e.g., "stress", "anxious")
+        - tag: optional tag filter (e.g., "sleep")
+        - lang: optional language filter (e.g., "hi")
+        - message: optional student message; resources matching it
+          (TF-IDF cosine) are listed first
     
     Output:
         List of resource dicts:
@@ -54,14 +161,10 @@ def recommend_resources(emotion: str):
         ]
     """
 
-    _ensure_resources_file()
-
-    with open(RESOURCES_PATH, "r", encoding="utf-8") as f:
-        resources = json.load(f)
-
-    emotion = emotion.lower().strip()
-
-    if emotion in resources:
-        return resources[emotion]
+    found = resource_index.lookup(emotion, tag=tag, lang=lang)
+    if not message or len(found) < 2:
+        return found
 
-    return resources["default"]
+    hits = get_suggestion_index().search(message, k=len(found) * 4, kind="resource")
+    score = {doc["item"]["title"]: s for s, doc in hits}
+    return sorted(found, key=lambda item: -score.get(item["title"], 0.0))
@@ -0,0 +1,312 @@
+# src/tools/semantic_index.py
+
+"""
+Suggestion Retrieval Index
+--------------------------
+Offline TF-IDF index over data/activities.json and the resources catalogue,
+so suggestions can match what the student actually wrote ("exam tomorrow,
+can't sleep") and not just the mood label.
+
+- HashingVectorizer: word unigrams + bigrams + 5-char prefixes (a cheap
+  stand-in for stemming), hashed with crc32 into a fixed feature space;
+  no vocabulary, no network
+- The index stores L2-normalised TF-IDF rows as one float32 .npy matrix
+  (+ idf vector and a JSON sidecar with document metadata)
+- Each build goes to its own version directory; a one-line pointer file
+  (suggestions.current) is swapped in with a single rename, so readers
+  always see a matching matrix / idf / sidecar set. Rebuilds are
+  serialised by a lock file, and a process that waited for the lock
+  reuses the index the other one just built.
+- The matrix is opened with mmap_mode="r", so every worker process on a
+  host shares the same page-cache copy
+- A query is one matrix-vector product + argpartition for top-k
+
+The index is rebuilt when a source file changes (mtimes are recorded in the
+sidecar). Build it ahead of time with:
+    python -m src.tools.semantic_index --build
+"""
+
+import argparse
+import json
+import os
+import re
+import shutil
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+
+import numpy as np
+
+from src.utils.file_lock import _locked
+from src.utils.moods import to_code, to_label
+
+
+ACTIVITIES_PATH = "data/activities.json"
+INDEX_DIR = os.path.join("data", "index")
+INDEX_NAME = "suggestions"
+CURRENT = INDEX_NAME + ".current"        # pointer file: name of the live version
+KEEP_VERSIONS = 2                       # older version directories are removed
+
+N_FEATURES = 2 ** 14
+PREFIX_LEN = 5
+
+_TOKEN = re.compile(r"[a-z0-9']+")
+
+
+class HashingVectorizer:
+    """Stateless text -> sparse term counts in a fixed hashed space."""
+
+    def __init__(self, n_features: int = N_FEATURES):
+        self.n_features = n_features
+
+    @staticmethod
+    def features(text: str):
+        words = [w.strip("'") for w in _TOKEN.findall(text.lower())]
+        words = [w for w in words if w]
+
+        feats = list(words)
+        feats += [f"{a} {b}" for a, b in zip(words, words[1:])]
+        feats += [f"<{w[:PREFIX_LEN]}" for w in words if len(w) > PREFIX_LEN]
+        return feats
+
+    def counts(self, text: str) -> dict:
+        """{column: count}; crc32 is stable across processes (unlike hash())."""
+        out = {}
+        for feat in self.features(text):
+            col = zlib.crc32(feat.encode("utf-8")) % self.n_features
+            out[col] = out.get(col, 0) + 1
+        return out
+
+    def transform(self, text: str, idf) -> np.ndarray:
+        """Dense L2-normalised TF-IDF vector."""
+        vec = np.zeros(self.n_features, dtype=np.float32)
+        for col, n in self.counts(text).items():
+            vec[col] = (1.0 + np.log(n)) * idf[col]
+
+        norm = np.linalg.norm(vec)
+        return vec / norm if norm else vec
+
+
+def _documents(activities_path: str, resources_path: str):
+    """(text to embed, metadata) for every activity and resource."""
+    docs = []
+
+    with open(activities_path, "r", encoding="utf-8") as f:
+        activities = json.load(f)
+    for label, items in activities.items():
+        code = to_code(label, default=None)
+        for text in items:
+            docs.append((text, {"kind": "activity", "mood": code, "text": text}))
+
+    with open(resources_path, "r", encoding="utf-8") as f:
+        resources = json.load(f)
+    for name, items in resources.items():
+        code = to_code(name, default=None)
+        for item in items:
+            text = " ".join([item["title"], *item.get("tags", [])])
+            docs.append((text, {"kind": "resource", "mood": code, "item": item}))
+
+    return docs
+
+
+@contextmanager
+def _build_lock(index_dir: str):
+    """One index build at a time across processes."""
+    os.makedirs(index_dir, exist_ok=True)
+    with open(os.path.join(index_dir, INDEX_NAME + ".lock"), "a+b") as f:
+        with _locked(f, exclusive=True):
+            yield
+
+
+def current_version(index_dir: str = INDEX_DIR):
+    """Directory of the live index version, or None before the first build."""
+    try:
+        with open(os.path.join(index_dir, CURRENT), "r", encoding="utf-8") as f:
+            name = f.read().strip()
+    except FileNotFoundError:
+        return None
+    return os.path.join(index_dir, name) if name else None
+
+
+def _prune_versions(index_dir: str):
+    versions = sorted(
+        name for name in os.listdir(index_dir)
+        if name.startswith(INDEX_NAME + ".v") and os.path.isdir(os.path.join(index_dir, name))
+    )
+    for name in versions[:-KEEP_VERSIONS]:
+        shutil.rmtree(os.path.join(index_dir, name), ignore_errors=True)
+
+
+def build_index(activities_path: str = ACTIVITIES_PATH, resources_path: str = None,
+                index_dir: str = INDEX_DIR, n_features: int = N_FEATURES):
+    """Embed every document and swap in a new index version (atomically)."""
+    with _build_lock(index_dir):
+        return _write_index(activities_path, resources_path, index_dir, n_features)
+
+
+def _write_index(activities_path: str, resources_path: str, index_dir: str, n_features: int):
+    from src.tools.resource_recommender import RESOURCES_PATH, _ensure_resources_file
+
+    if resources_path is None:
+        _ensure_resources_file()
+        resources_path = RESOURCES_PATH
+
+    vectorizer = HashingVectorizer(n_features)
+    docs = _documents(activities_path, resources_path)
+
+    counts = [vectorizer.counts(text) for text, _ in docs]
+    df = np.zeros(n_features, dtype=np.float32)
+    for c in counts:
+        df[list(c)] += 1
+    idf = (np.log((1 + len(docs)) / (1 + df)) + 1.0).astype(np.float32)
+
+    matrix = np.stack([vectorizer.transform(text, idf) for text, _ in docs]) if docs \
+        else np.zeros((0, n_features), dtype=np.float32)
+
+    sidecar = {
+        "n_features": n_features,
+        "sources": {p: os.stat(p).st_mtime_ns for p in (activities_path, resources_path)},
+        "docs": [meta for _, meta in docs],
+    }
+
+    # the whole set goes into a fresh directory, renamed into place when complete
+    version = f"{INDEX_NAME}.v{time.time_ns():020d}"
+    tmp = os.path.join(index_dir, f".{version}.{os.getpid()}.tmp")
+    os.makedirs(tmp)
+    np.save(os.path.join(tmp, "matrix.npy"), matrix)
+    np.save(os.path.join(tmp, "idf.npy"), idf)
+    with open(os.path.join(tmp, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump(sidecar, f)
+    os.rename(tmp, os.path.join(index_dir, version))
+
+    # one rename makes the new version live for every reader
+    pointer = os.path.join(index_dir, f"{CURRENT}.{os.getpid()}.tmp")
+    with open(pointer, "w", encoding="utf-8") as f:
+        f.write(version)
+    os.replace(pointer, os.path.join(index_dir, CURRENT))
+
+    _prune_versions(index_dir)
+    return os.path.join(index_dir, version)
+
+
+class SuggestionIndex:
+
+    def __init__(self, activities_path: str = ACTIVITIES_PATH, resources_path: str = None,
+                 index_dir: str = INDEX_DIR):
+        self.activities_path = activities_path
+        self.resources_path = resources_path
+        self.index_dir = index_dir
+
+        self._loaded = None       # (matrix, idf, docs, kinds, moods, vectorizer)
+        self._sources = {}
+        self._lock = threading.Lock()
+
+    def _stale(self) -> bool:
+        for path, mtime in self._sources.items():
+            try:
+                if os.stat(path).st_mtime_ns != mtime:
+                    return True
+            except FileNotFoundError:
+                return True
+        return False
+
+    def _load(self):
+        if self._loaded is not None and not self._stale():
+            return self._loaded
+
+        with self._lock:
+            if self._loaded is not None and not self._stale():
+                return self._loaded
+
+            found = self._read_current()
+            if found is None:
+                with _build_lock(self.index_dir):
+                    # another process may have rebuilt it while we waited
+                    found = self._read_current()
+                    if found is None:
+                        _write_index(self.activities_path, self.resources_path,
+                                     self.index_dir, N_FEATURES)
+                        found = self._read_current()
+
+            path, sidecar, matrix, idf = found
+            docs = sidecar["docs"]
+            kinds = np.array([d["kind"] for d in docs])
+            moods = np.array([-1 if d["mood"] is None else d["mood"] for d in docs], dtype=np.int64)
+
+            self._loaded = (matrix, idf, docs, kinds, moods, HashingVectorizer(sidecar["n_features"]))
+            return self._loaded
+
+    def _read_current(self):
+        """(dir, sidecar, matrix, idf) of the live version; None if missing or stale."""
+        path = current_version(self.index_dir)
+        if path is None:
+            return None
+        try:
+            with open(os.path.join(path, "meta.json"), "r", encoding="utf-8") as f:
+                sidecar = json.load(f)
+            self._sources = sidecar["sources"]
+            if self._stale():
+                return None
+            matrix = np.load(os.path.join(path, "matrix.npy"), mmap_mode="r")
+            idf = np.load(os.path.join(path, "idf.npy"))
+        except (FileNotFoundError, ValueError, KeyError):
+            # missing, damaged, or pruned by two newer builds since we read the pointer
+            return None
+        return path, sidecar, matrix, idf
+
+    def search(self, text: str, k: int = 5, kind: str = None, mood=None, min_score: float = 0.0):
+        """
+        Top-k documents by cosine similarity to `text`, best first.
+        Filters: kind ("activity" / "resource") and mood (code or label).
+        Returns [(score, metadata), ...].
+        """
+        matrix, idf, docs, kinds, moods, vectorizer = self._load()
+        if not docs:
+            return []
+
+        scores = matrix @ vectorizer.transform(text, idf)
+
+        if kind is not None:
+            scores = np.where(kinds == kind, scores, -1.0)
+        if mood is not None:
+            scores = np.where(moods == to_code(mood, default=-2), scores, -1.0)
+
+        k = min(k, scores.size)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+
+        return [(float(scores[i]), docs[i]) for i in top if scores[i] > min_score]
+
+
+_index = None
+
+
+def get_suggestion_index() -> SuggestionIndex:
+    """Process-wide index (lazily built / mapped)."""
+    global _index
+    if _index is None:
+        _index = SuggestionIndex()
+    return _index
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build or query the suggestion retrieval index.")
+    parser.add_argument("--build", action="store_true", help="(re)build the index files")
+    parser.add_argument("--query", help="print the top matches for this message")
+    parser.add_argument("--mood", help="restrict matches to this mood")
+    parser.add_argument("-k", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    if args.build:
+        print(f"Index written to {build_index()}")
+
+    if args.query:
+        for score, doc in get_suggestion_index().search(args.query, k=args.k, mood=args.mood):
+            label = doc["text"] if doc["kind"] == "activity" else doc["item"]["title"]
+            mood = to_label(doc["mood"]) if doc["mood"] is not None else "-"
+            print(f"{score:.3f}  {doc['kind']:<8}  {mood:<8}  {label}")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,9 +3,15 @@
 """
 Lightweight offline Hindi ↔ English translator.
 Uses rule-based dictionary mapping to avoid API calls (Kaggle safe).
+
+Replies are assembled from a finite set of static strings (activities,
+resource titles, reply templates, crisis message). TranslationCatalog
+translates all of them once at startup; anything dynamic goes through an
+LRU cache, so per-request translation cost is a dict lookup.
 """
 
 import re
+from functools import lru_cache
 
 # Basic dictionary for emotional & conversational words
 HI_TO_EN = {
@@ -49,18 +55,29 @@ EN_TO_HI = {
 }
 
 
-def _replace_words(text, dictionary):
-    """Simple dictionary-based replace."""
-    for hi, en in dictionary.items():
-        text = re.sub(rf"\b{hi}\b", en, text, flags=re.IGNORECASE)
-    return text
+def _compile(dictionary):
+    """One alternation per dictionary, longest phrases first."""
+    keys = sorted(dictionary, key=len, reverse=True)
+    pattern = re.compile(r"\b(" + "|".join(re.escape(k) for k in keys) + r")\b", re.IGNORECASE)
+    lookup = {k.lower(): v for k, v in dictionary.items()}
+    return pattern, lookup
+
+
+_HI_TO_EN = _compile(HI_TO_EN)
+_EN_TO_HI = _compile(EN_TO_HI)
+
+
+def _replace_words(text, compiled):
+    """Simple dictionary-based replace (single regex pass)."""
+    pattern, lookup = compiled
+    return pattern.sub(lambda m: lookup[m.group(0).lower()], text)
 
 
 def translate_to_english(text: str) -> str:
     """
     Hindi → English translation (rule-based).
     """
-    translated = _replace_words(text, HI_TO_EN)
+    translated = _replace_words(text, _HI_TO_EN)
     return translated
 
 
@@ -68,5 +85,78 @@ def translate_to_hindi(text: str) -> str:
     """
     English → Hindi translation (rule-based).
     """
-    translated = _replace_words(text, EN_TO_HI)
+    translated = _replace_words(text, _EN_TO_HI)
     return translated
+
+
+# -----------------------------------------------------------
+# Pre-translated catalog
+# -----------------------------------------------------------
+class TranslationCatalog:
+    """
+    Static string -> translation, filled once up front.
+    translate() falls back to an LRU-cached call for anything not in the
+    catalog (e.g. free text), and counts hits/misses for monitoring.
+    """
+
+    def __init__(self, translate=translate_to_hindi, cache_size=2048):
+        self.entries = {}
+        self._translate = translate
+        self._dynamic = lru_cache(maxsize=cache_size)(translate)
+        self.hits = 0
+        self.misses = 0
+
+    def add(self, texts):
+        for text in texts:
+            if text and text not in self.entries:
+                self.entries[text] = self._translate(text)
+
+    def translate(self, text: str) -> str:
+        hit = self.entries.get(text)
+        if hit is not None:
+            self.hits += 1
+            return hit
+        self.misses += 1
+        return self._dynamic(text)
+
+    __call__ = translate
+
+
+def build_hindi_catalog(activities_file="data/activities.json", config_path="config/agent.yaml"):
+    """
+    Translate every static reply fragment once:
+    mood labels, activities, resource titles, reply templates, crisis message.
+    """
+    import json
+    import yaml
+    from src.agent import prompts
+    from src.tools.coping_suggester import FALLBACK_SUGGESTIONS
+    from src.tools.resource_recommender import resource_index
+    from src.utils.moods import LABELS
+
+    catalog = TranslationCatalog()
+    catalog.add(LABELS)
+    catalog.add(FALLBACK_SUGGESTIONS)
+    catalog.add(prompts.REPLY_TEMPLATES)
+    catalog.add(resource_index.titles())
+
+    with open(activities_file, "r", encoding="utf-8") as f:
+        for items in json.load(f).values():
+            catalog.add(items)
+
+    with open(config_path, "r", encoding="utf-8") as f:
+        config = yaml.safe_load(f) or {}
+    catalog.add([config.get("safety", {}).get("crisis_response_message")])
+
+    return catalog
+
+
+_hindi_catalog = None
+
+
+def get_hindi_catalog() -> TranslationCatalog:
+    """Process-wide catalog, built on first use."""
+    global _hindi_catalog
+    if _hindi_catalog is None:
+        _hindi_catalog = build_hindi_catalog()
+    return _hindi_catalog
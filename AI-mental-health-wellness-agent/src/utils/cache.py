@@ -4,13 +4,25 @@
 Simple local caching system for agent operations.
 Used to avoid repeated LLM calls for similar inputs.
 Works with in-memory + optional on-disk JSON caching.
+
+cache.json is loaded on a background thread, so start-up never waits for
+it: get() answers from whatever is loaded so far (hot entries restored
+from a warm-restart snapshot arrive first, see src/utils/snapshots.py),
+while set()/clear() wait for the load so nothing on disk is dropped.
+
+Storage goes through the shared state backend (src/utils/state_backend.py).
+With the default local backend cache.json stays the on-disk copy; with a
+shared one (SQLite / Redis) get() reads the backend, so every replica sees
+the same entries, and self.cache only holds what this process wrote.
 """
 
 import os
-import json
 import hashlib
+import threading
 from datetime import datetime
 
+from src.utils.state_backend import get_state_backend
+
 
 CACHE_DIR = "cache_store"
 CACHE_FILE = os.path.join(CACHE_DIR, "cache.json")
@@ -18,15 +30,38 @@ CACHE_FILE = os.path.join(CACHE_DIR, "cache.json")
 
 class CacheManager:
 
-    def __init__(self):
-        os.makedirs(CACHE_DIR, exist_ok=True)
+    def __init__(self, backend=None):
+        self.backend = backend or get_state_backend()
+
+        self.cache = {}
+        self._lock = threading.Lock()
+        self.loaded = threading.Event()
+
+        if self.backend.shared:
+            self.loaded.set()
+        else:
+            threading.Thread(target=self._load, name="cache-load", daemon=True).start()
 
-        if not os.path.exists(CACHE_FILE):
-            with open(CACHE_FILE, "w") as f:
-                json.dump({}, f)
+    def _load(self):
+        try:
+            stored = self.backend.hgetall(CACHE_FILE)
+            # entries added meanwhile (restored or new) win
+            self.merge(stored)
+        finally:
+            self.loaded.set()
 
-        with open(CACHE_FILE, "r") as f:
-            self.cache = json.load(f)
+    def merge(self, entries: dict):
+        """Add entries without replacing existing ones (warm-restart restore)."""
+        with self._lock:
+            for key, value in entries.items():
+                self.cache.setdefault(key, value)
+
+    def hot_entries(self, limit: int) -> dict:
+        """The `limit` most recently written entries."""
+        with self._lock:
+            items = list(self.cache.items())
+        items.sort(key=lambda kv: kv[1].get("timestamp", ""), reverse=True)
+        return dict(items[:limit])
 
     def _hash(self, text: str) -> str:
         """Create a stable hash for keys."""
@@ -35,23 +70,28 @@ class CacheManager:
     def get(self, key: str):
         """Retrieve value from cache if exists."""
         hashed = self._hash(key)
+        if self.backend.shared:
+            return self.backend.hget(CACHE_FILE, hashed)
         return self.cache.get(hashed)
 
     def set(self, key: str, value):
         """Store value in cache."""
         hashed = self._hash(key)
-        self.cache[hashed] = {
+        entry = {
             "value": value,
             "timestamp": datetime.utcnow().isoformat()
         }
-        with open(CACHE_FILE, "w") as f:
-            json.dump(self.cache, f, indent=4)
+        self.loaded.wait()
+        with self._lock:
+            self.cache[hashed] = entry
+            self.backend.hset(CACHE_FILE, hashed, entry)
 
     def clear(self):
         """Clear entire cache."""
-        self.cache = {}
-        with open(CACHE_FILE, "w") as f:
-            json.dump({}, f)
+        self.loaded.wait()
+        with self._lock:
+            self.cache = {}
+            self.backend.delete(CACHE_FILE)
 
 
 # global cache instance
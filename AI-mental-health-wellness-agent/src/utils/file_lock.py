@@ -0,0 +1,75 @@
+# src/utils/file_lock.py
+
+"""
+Advisory file locking for files shared between processes
+(Streamlit workers, the CLI, bulk backfills).
+
+- append_locked(): one record = one write() under an exclusive lock,
+  so concurrent appends never interleave
+- read_locked():   reads under a shared lock, so readers never see a
+  half-written record
+
+Uses fcntl.flock on POSIX and msvcrt.locking on Windows (where the lock
+is always exclusive).
+"""
+
+import os
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:     # Windows
+    fcntl = None
+    import msvcrt
+
+
+@contextmanager
+def _locked(f, exclusive: bool):
+    if fcntl is not None:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        try:
+            yield f
+        finally:
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+        return
+
+    # msvcrt locks byte ranges; everyone agrees to lock the first byte.
+    pos = f.tell()
+    f.seek(0)
+    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+    f.seek(pos)
+    try:
+        yield f
+    finally:
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def append_locked(path: str, text: str, header: str = None, fsync: bool = False):
+    """
+    Append `text` atomically with respect to other append_locked()/read_locked()
+    callers. If the file is empty, `header` is written first (same lock).
+    """
+    data = text.encode("utf-8")
+
+    with open(path, "ab") as f:
+        with _locked(f, exclusive=True):
+            if header and f.seek(0, os.SEEK_END) == 0:
+                data = header.encode("utf-8") + data
+            f.write(data)
+            f.flush()
+            if fsync:
+                os.fsync(f.fileno())
+
+
+@contextmanager
+def read_locked(path: str, encoding: str = "utf-8", newline: str = None, binary: bool = False):
+    """Open `path` for reading while holding a shared lock."""
+    if binary:
+        opened = open(path, "rb")
+    else:
+        opened = open(path, "r", encoding=encoding, newline=newline)
+
+    with opened as f:
+        with _locked(f, exclusive=False):
+            yield f
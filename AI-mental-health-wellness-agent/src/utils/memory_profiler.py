@@ -0,0 +1,306 @@
+# src/utils/memory_profiler.py
+
+"""
+Memory-growth diagnostics for long-running processes (opt-in).
+
+- Periodic tracemalloc snapshots: top allocation sites and the sites that
+  grew most since the previous snapshot
+- Per-structure sizes for registered objects (EmotionMemory.logs, the
+  pipeline's per-user suggester bags and single-flight table, cached trend
+  frames, journal indexes, ...): item count + estimated bytes
+- Budget alerts: total traced memory and per-structure item counts, from
+  the `diagnostics` section of agent.yaml; crossings are logged once per
+  crossing and kept in the report
+
+Exposure:
+- main.py --profile-memory [--metrics-port 9108]
+- serve_metrics(): GET /metrics/memory returns the latest report as JSON
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import yaml
+
+from src.utils.logger import logger
+
+
+CONFIG_PATH = "config/agent.yaml"
+
+# Containers larger than this are sized from a sample and extrapolated
+SIZE_SAMPLE = 200
+
+
+def estimate_size(obj, _depth: int = 0) -> int:
+    """
+    Approximate deep size in bytes. Large containers are sampled, so this
+    stays cheap enough to call on every snapshot.
+    """
+    size = sys.getsizeof(obj)
+    if _depth > 4 or isinstance(obj, (str, bytes, int, float, bool)) or obj is None:
+        return size
+
+    if isinstance(obj, dict):
+        items = obj.items()
+        n = len(obj)
+        per = lambda kv: estimate_size(kv[0], _depth + 1) + estimate_size(kv[1], _depth + 1)
+    elif isinstance(obj, (list, tuple, set, frozenset, deque)):
+        items, n = obj, len(obj)
+        per = lambda v: estimate_size(v, _depth + 1)
+    else:
+        return size
+
+    if n == 0:
+        return size
+
+    sampled, total = 0, 0
+    for item in items:
+        total += per(item)
+        sampled += 1
+        if sampled >= SIZE_SAMPLE:
+            break
+
+    return size + int(total * n / sampled)
+
+
+def _session_logs(store) -> list:
+    """Paths of the session logs under a local backend (one per session)."""
+    root = os.path.join(store.backend.root, store.root)
+    return [
+        os.path.join(shard.path, entry.name)
+        for shard in (os.scandir(root) if os.path.isdir(root) else ())
+        if shard.is_dir()
+        for entry in os.scandir(shard.path)
+    ]
+
+
+def _item_count(obj):
+    try:
+        return len(obj)
+    except TypeError:
+        return None
+
+
+class MemoryProfiler:
+
+    def __init__(self, interval_s: float = None, top_n: int = None, budget_mb: float = None,
+                 structure_budgets: dict = None, frames: int = None, config_path: str = CONFIG_PATH):
+        settings = {}
+        try:
+            with open(config_path, "r", encoding="utf-8") as f:
+                settings = (yaml.safe_load(f) or {}).get("diagnostics", {}) or {}
+        except FileNotFoundError:
+            pass
+
+        self.interval_s = interval_s or settings.get("snapshot_interval_s", 60)
+        self.top_n = top_n or settings.get("top_n", 10)
+        self.budget_mb = budget_mb if budget_mb is not None else settings.get("memory_budget_mb")
+        self.structure_budgets = dict(settings.get("structure_budgets") or {})
+        self.structure_budgets.update(structure_budgets or {})
+        self.frames = frames or settings.get("traceback_frames", 1)
+
+        self._structures = {}           # name -> zero-arg callable returning the object
+        self._previous = None           # last tracemalloc snapshot
+        self._latest = None             # last report
+        self._over = set()              # budgets currently exceeded
+        self.alerts = []
+
+        self._lock = threading.Lock()
+        self._sample_lock = threading.Lock()     # loop and endpoint may sample together
+        self._stop = threading.Event()
+        self._thread = None
+
+    # ---------------------------------------------------------
+    # Registration
+    # ---------------------------------------------------------
+    def watch(self, name: str, target):
+        """
+        Track a structure. `target` is the object itself, or a zero-arg
+        callable returning it (use that when the owner may rebind it,
+        e.g. CacheManager.clear()).
+        """
+        self._structures[name] = target if callable(target) else (lambda: target)
+
+    def watch_defaults(self, pipeline=None):
+        """
+        Register the structures that are known to grow: the process-wide
+        singletons, and `pipeline`'s per-user state when one is given.
+        Modules that are not imported yet are skipped, so watching never
+        builds anything.
+        """
+        from src.agent.memory import emotion_memory, session_store
+        self.watch("emotion_memory.logs", lambda: emotion_memory.logs)
+
+        # session logs live in the state backend; count them when it is local
+        if session_store.backend.name == "local":
+            self.watch("session_store.logs", lambda: _session_logs(session_store))
+
+        if pipeline is not None:
+            self.watch("coping.users", lambda: pipeline.coping._users)
+            self.watch("single_flight.calls", lambda: pipeline.flights._calls)
+
+        trend_module = sys.modules.get("analytics.trend_tracker")
+        if trend_module is not None:
+            self.watch("trend_tracker.frames", lambda: trend_module.trend_tracker._frames)
+
+        # the CPU executor's inline / worker-side tracker, once it is built
+        cpu_module = sys.modules.get("src.pipelines.cpu_executor")
+        if cpu_module is not None:
+            self.watch("cpu_executor.trend_frames",
+                       lambda: cpu_module._state["trend"]._frames if "trend" in cpu_module._state else {})
+
+        journal_module = sys.modules.get("src.tools.journal_index")
+        if journal_module is not None:
+            self.watch("journal_index.indexes", lambda: journal_module._indexes)
+
+        # importing src.utils.cache creates its store; only watch it if in use
+        cache_module = sys.modules.get("src.utils.cache")
+        if cache_module is not None:
+            self.watch("cache.entries", lambda: cache_module.cache.cache)
+
+    # ---------------------------------------------------------
+    # Sampling
+    # ---------------------------------------------------------
+    def start(self):
+        """Start tracing and the background snapshot thread."""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, name="memory-profiler", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        tracemalloc.stop()
+
+    def _loop(self):
+        while not self._stop.wait(self.interval_s):
+            try:
+                self.sample()
+            except Exception as e:
+                logger.error(f"Memory profiler snapshot failed: {e}")
+
+    def _structure_sizes(self) -> dict:
+        sizes = {}
+        for name, get in list(self._structures.items()):
+            try:
+                obj = get()
+            except Exception as e:
+                sizes[name] = {"error": str(e)}
+                continue
+            sizes[name] = {"items": _item_count(obj), "bytes": estimate_size(obj)}
+        return sizes
+
+    @staticmethod
+    def _site(stat) -> str:
+        frame = stat.traceback[0]
+        return f"{frame.filename}:{frame.lineno}"
+
+    def sample(self) -> dict:
+        """Take one snapshot now and return the report."""
+        with self._sample_lock:
+            return self._sample()
+
+    def _sample(self) -> dict:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        ))
+        current, peak = tracemalloc.get_traced_memory()
+
+        top = [
+            {"site": self._site(s), "size_kb": round(s.size / 1024, 1), "count": s.count}
+            for s in snapshot.statistics("lineno")[:self.top_n]
+        ]
+
+        growth = []
+        if self._previous is not None:
+            diffs = snapshot.compare_to(self._previous, "lineno")
+            growth = [
+                {"site": self._site(d), "size_diff_kb": round(d.size_diff / 1024, 1),
+                 "count_diff": d.count_diff}
+                for d in diffs[:self.top_n] if d.size_diff > 0
+            ]
+        self._previous = snapshot
+
+        report = {
+            "timestamp": time.time(),
+            "traced_mb": round(current / 2 ** 20, 2),
+            "peak_mb": round(peak / 2 ** 20, 2),
+            "top": top,
+            "growth": growth,
+            "structures": self._structure_sizes(),
+        }
+        report["alerts"] = self._check_budgets(report)
+
+        with self._lock:
+            self._latest = report
+        return report
+
+    def _check_budgets(self, report: dict) -> list:
+        exceeded = {}
+        if self.budget_mb and report["traced_mb"] > self.budget_mb:
+            exceeded["traced_mb"] = f"traced memory {report['traced_mb']} MB > budget {self.budget_mb} MB"
+
+        for name, limit in self.structure_budgets.items():
+            items = report["structures"].get(name, {}).get("items")
+            if items is not None and items > limit:
+                exceeded[name] = f"{name} holds {items} items > budget {limit}"
+
+        # log on crossing only, not on every snapshot while over budget
+        for key in exceeded.keys() - self._over:
+            logger.warning(f"Memory budget exceeded: {exceeded[key]}")
+            self.alerts.append({"timestamp": report["timestamp"], "budget": key, "message": exceeded[key]})
+        self._over = set(exceeded)
+
+        return sorted(exceeded.values())
+
+    def latest(self) -> dict:
+        """Most recent report (takes one if none exists yet)."""
+        with self._lock:
+            report = self._latest
+        return report if report is not None else self.sample()
+
+
+# -----------------------------------------------------------
+# Metrics endpoint
+# -----------------------------------------------------------
+class _MetricsHandler(BaseHTTPRequestHandler):
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        if self.path.rstrip("/") != "/metrics/memory":
+            self.send_error(404)
+            return
+
+        body = json.dumps(self.server.profiler.latest()).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def serve_metrics(profiler: MemoryProfiler, host: str = "127.0.0.1", port: int = 9108):
+    """Serve GET /metrics/memory from a daemon thread; returns the server."""
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    server.daemon_threads = True
+    server.profiler = profiler
+    threading.Thread(target=server.serve_forever, name="memory-metrics", daemon=True).start()
+    return server
@@ -0,0 +1,98 @@
+# src/utils/moods.py
+
+"""
+Mood Taxonomy
+-------------
+Single source of truth for mood labels across the agent.
+
+- Every mood has a small integer code (Mood)
+- ALIASES maps every spelling used by the LLM prompts, config, data files
+  and older logs ("stress", "anxiety", "depression", ...) to its code
+- Tools, memory and analytics store codes; labels are produced only for
+  display (Streamlit, CLI, LLM prompts)
+
+Usage:
+    code = to_code("Stress ")     # Mood.STRESSED
+    to_label(code)                # "stressed"
+"""
+
+import sys
+from enum import IntEnum
+from numbers import Integral
+
+
+class Mood(IntEnum):
+    NEUTRAL = 0
+    HAPPY = 1
+    SAD = 2
+    STRESSED = 3
+    ANXIOUS = 4
+    ANGRY = 5
+    CRITICAL = 6    # set by the safety layer, never by the detector
+
+
+# code -> label (interned so label comparisons are identity checks)
+LABELS = tuple(sys.intern(m.name.lower()) for m in Mood)
+
+# labels the mood detector is allowed to return
+MOOD_LABELS = LABELS[:Mood.CRITICAL]
+
+ALIASES = {label: Mood(code) for code, label in enumerate(LABELS)}
+ALIASES.update({
+    # config/agent.yaml categories and resource buckets
+    "stress": Mood.STRESSED,
+    "anxiety": Mood.ANXIOUS,
+    "depression": Mood.SAD,
+    "motivation": Mood.HAPPY,
+    "focus": Mood.NEUTRAL,
+    # extra labels used in prompts
+    "overwhelmed": Mood.STRESSED,
+    "tired": Mood.SAD,
+    "confused": Mood.ANXIOUS,
+    # common synonyms from free-form LLM output
+    "depressed": Mood.SAD,
+    "lonely": Mood.SAD,
+    "worried": Mood.ANXIOUS,
+    "nervous": Mood.ANXIOUS,
+    "anger": Mood.ANGRY,
+    "frustrated": Mood.ANGRY,
+    "joy": Mood.HAPPY,
+    "calm": Mood.NEUTRAL,
+})
+
+
+def to_code(mood, default=Mood.NEUTRAL):
+    """
+    Resolve a label, alias or code to a Mood.
+    Returns `default` for anything unknown.
+    """
+    if isinstance(mood, Integral):
+        # also covers numpy integers coming out of pandas
+        return Mood(int(mood)) if 0 <= mood < len(LABELS) else default
+
+    if not isinstance(mood, str):
+        return default
+
+    code = ALIASES.get(mood)
+    if code is not None:
+        return code
+
+    key = mood.strip().lower()
+    code = ALIASES.get(key)
+    if code is not None:
+        return code
+
+    # codes read back from CSV arrive as strings
+    if key.isdigit():
+        return to_code(int(key), default)
+
+    return default
+
+
+def to_label(mood) -> str:
+    """Resolve a code, label or alias to its canonical display label."""
+    return LABELS[to_code(mood)]
+
+
+def is_known(mood) -> bool:
+    return to_code(mood, default=None) is not None
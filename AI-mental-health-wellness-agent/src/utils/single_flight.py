@@ -0,0 +1,170 @@
+# src/utils/single_flight.py
+
+"""
+Single-flight request coalescing.
+Concurrent callers asking for the same key share one in-flight call
+instead of each sending their own LLM request.
+
+- Works for threads (do) and asyncio (do_async), and both can join the
+  same flight
+- Errors from the shared call are raised in every caller
+- A cancelled asyncio caller only stops waiting; the shared call is
+  cancelled once no caller is left waiting on it
+- Nothing is remembered after a call finishes (that is the cache's job)
+"""
+
+import asyncio
+import hashlib
+import threading
+from collections import Counter
+from concurrent.futures import Future
+
+
+def flight_key(*parts) -> str:
+    """
+    Stable key from the exact parts. Prompts differing only in case or
+    whitespace are different requests (the model may answer differently).
+    """
+    raw = "\x1f".join(str(p) for p in parts)
+    return hashlib.md5(raw.encode("utf-8")).hexdigest()
+
+
+class _Call:
+    __slots__ = ("future", "waiters", "task")
+
+    def __init__(self):
+        self.future = Future()
+        self.waiters = 0
+        self.task = None     # asyncio task when the leader is a coroutine
+
+
+class SingleFlight:
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.stats = Counter()
+
+    def _join(self, key):
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                self.stats["deduplicated"] += 1
+                return call, False
+
+            call = self._calls[key] = _Call()
+            call.waiters = 1
+            self.stats["executed"] += 1
+            return call, True
+
+    def _leave(self, call, cancelled=False):
+        with self._lock:
+            call.waiters -= 1
+            abandon = cancelled and call.waiters == 0
+        if abandon and call.task is not None and not call.task.done():
+            call.task.cancel()
+
+    def _finish(self, key, call, result=None, error=None, cancelled=False):
+        # Forget the key first so later callers start a fresh flight.
+        with self._lock:
+            if self._calls.get(key) is call:
+                del self._calls[key]
+            if error is not None:
+                self.stats["errors"] += 1
+
+        if cancelled:
+            call.future.cancel()
+        elif error is not None:
+            call.future.set_exception(error)
+        else:
+            call.future.set_result(result)
+
+    def _run(self, key, call, fn, args, kwargs):
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as e:
+            self._finish(key, call, error=e)
+        else:
+            self._finish(key, call, result=result)
+
+    # -----------------------------------------------------------
+    # Threaded callers
+    # -----------------------------------------------------------
+    def do(self, key, fn, *args, **kwargs):
+        """Run fn(*args) once per in-flight key and return its result."""
+        call, leader = self._join(key)
+        try:
+            if leader:
+                self._run(key, call, fn, args, kwargs)
+            return call.future.result()
+        finally:
+            self._leave(call)
+
+    # -----------------------------------------------------------
+    # asyncio callers
+    # -----------------------------------------------------------
+    async def do_async(self, key, fn, *args, **kwargs):
+        """
+        Async variant. `fn` may be a coroutine function (run as a shared
+        task on this loop) or a plain callable (run in the default executor).
+        """
+        call, leader = self._join(key)
+
+        if leader:
+            if asyncio.iscoroutinefunction(fn):
+                task = asyncio.ensure_future(fn(*args, **kwargs))
+                call.task = task
+
+                def settle(t):
+                    if t.cancelled():
+                        self._finish(key, call, cancelled=True)
+                    elif t.exception() is not None:
+                        self._finish(key, call, error=t.exception())
+                    else:
+                        self._finish(key, call, result=t.result())
+
+                task.add_done_callback(settle)
+            else:
+                loop = asyncio.get_running_loop()
+                loop.run_in_executor(None, self._run, key, call, fn, args, kwargs)
+
+        try:
+            # shield: one caller giving up must not cancel the shared future
+            result = await asyncio.shield(asyncio.wrap_future(call.future))
+        except asyncio.CancelledError:
+            self._leave(call, cancelled=not call.future.done())
+            raise
+
+        self._leave(call)
+        return result
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            out = dict(self.stats)
+            out["in_flight"] = len(self._calls)
+        return out
+
+
+class CoalescedLLM:
+    """
+    Wraps an LLM callable so identical prompts in flight at the same time
+    share one request. Drop-in for the `llm` passed to WellnessPipeline.
+    """
+
+    def __init__(self, llm, flights: SingleFlight = None):
+        self.llm = llm
+        self.flights = flights or SingleFlight()
+
+    def __call__(self, prompt: str, *args, **kwargs):
+        key = flight_key("llm", prompt, *args, *sorted(kwargs.items()))
+        return self.flights.do(key, self.llm, prompt, *args, **kwargs)
+
+    async def acall(self, prompt: str, *args, **kwargs):
+        key = flight_key("llm", prompt, *args, *sorted(kwargs.items()))
+        fn = getattr(self.llm, "acomplete", self.llm)
+        return await self.flights.do_async(key, fn, prompt, *args, **kwargs)
@@ -0,0 +1,243 @@
+# src/utils/snapshots.py
+
+"""
+Warm-restart snapshots of in-memory state.
+
+What is saved:
+- EMOT: the newest `max_emotions` EmotionMemory entries, packed as
+        (int8 code, float32 intensity, float64 timestamp) records
+        (mood codes only: no message text, user or session ids)
+- CACH: the `max_cache_entries` most recently written CacheManager entries
+
+Conversation text is not snapshotted: each session's history lives in
+its own log in the session store (src/agent/memory.py), and the
+process-wide conversation_memory, which mixes students, is never written
+to disk. CONV sections in older snapshots are ignored.
+
+File format (little-endian), each section zlib-compressed:
+    b"WSNP" | u16 version | f64 created
+    then per section: 4-byte tag | u32 length | payload
+
+Saving: periodically from a daemon thread and at interpreter exit; the
+file is written to a temp path and renamed, so a crash mid-save keeps
+the previous snapshot. No save happens before the restore has completed
+(the state would be missing everything still in the old snapshot).
+
+Restoring: restore_async() reads and applies the snapshot on a background
+thread. Nothing waits for it; restored items are merged *behind* anything
+recorded since start-up, so a request served before the restore finishes
+is never overwritten.
+"""
+
+import atexit
+import json
+import os
+import struct
+import sys
+import threading
+import time
+import zlib
+
+import numpy as np
+import yaml
+
+from src.utils.logger import logger
+
+
+CONFIG_PATH = "config/agent.yaml"
+SNAPSHOT_PATH = os.path.join("data", "snapshots", "state.bin")
+
+MAGIC = b"WSNP"
+VERSION = 1
+_HEADER = struct.Struct("<4sHd")
+_SECTION = struct.Struct("<4sI")
+
+EMOTION_DTYPE = np.dtype([("code", "<i1"), ("intensity", "<f4"), ("timestamp", "<f8")])
+
+
+# -----------------------------------------------------------
+# Encoding
+# -----------------------------------------------------------
+def _pack_emotions(logs) -> bytes:
+    records = np.array([(int(c), float(i or 0), float(t)) for c, i, t in logs], dtype=EMOTION_DTYPE)
+    return records.tobytes()
+
+
+def _unpack_emotions(payload: bytes):
+    records = np.frombuffer(payload, dtype=EMOTION_DTYPE)
+    return [(int(c), float(i), float(t)) for c, i, t in records.tolist()]
+
+
+def encode(sections: dict) -> bytes:
+    """{tag: raw bytes} -> snapshot file contents."""
+    parts = [_HEADER.pack(MAGIC, VERSION, time.time())]
+    for tag, raw in sections.items():
+        payload = zlib.compress(raw, 6)
+        parts.append(_SECTION.pack(tag, len(payload)))
+        parts.append(payload)
+    return b"".join(parts)
+
+
+def decode(data: bytes) -> dict:
+    """Snapshot file contents -> {tag: raw bytes}. Unknown tags are kept."""
+    magic, version, _created = _HEADER.unpack_from(data, 0)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"Not a version-{VERSION} snapshot")
+
+    sections, pos = {}, _HEADER.size
+    while pos < len(data):
+        tag, length = _SECTION.unpack_from(data, pos)
+        pos += _SECTION.size
+        sections[tag] = zlib.decompress(data[pos:pos + length])
+        pos += length
+    return sections
+
+
+# -----------------------------------------------------------
+# Manager
+# -----------------------------------------------------------
+class SnapshotManager:
+
+    def __init__(self, path: str = SNAPSHOT_PATH, interval_s: float = 300,
+                 max_emotions: int = 10000, max_cache_entries: int = 2000):
+        self.path = path
+        self.interval_s = interval_s
+        self.max_emotions = max_emotions
+        self.max_cache_entries = max_cache_entries
+
+        self.restored = threading.Event()
+        self.stats = {"saves": 0, "skipped": 0, "last_save_s": None, "last_bytes": 0, "restored": {}}
+
+        self._stop = threading.Event()
+        self._thread = None
+        self._save_lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config_path: str = CONFIG_PATH):
+        settings = {}
+        try:
+            with open(config_path, "r", encoding="utf-8") as f:
+                settings = (yaml.safe_load(f) or {}).get("snapshots", {}) or {}
+        except FileNotFoundError:
+            pass
+
+        return cls(
+            path=settings.get("path", SNAPSHOT_PATH),
+            interval_s=settings.get("interval_s", 300),
+            max_emotions=settings.get("max_emotions", 10000),
+            max_cache_entries=settings.get("max_cache_entries", 2000),
+        )
+
+    @staticmethod
+    def _cache():
+        # only snapshot/restore the cache in processes that use it
+        module = sys.modules.get("src.utils.cache")
+        return module.cache if module is not None else None
+
+    # ---------------------------------------------------------
+    # Save
+    # ---------------------------------------------------------
+    def collect(self) -> dict:
+        from src.agent.memory import emotion_memory
+
+        emotions = emotion_memory.logs[-self.max_emotions:]
+
+        sections = {
+            b"EMOT": _pack_emotions(emotions),
+        }
+
+        cache = self._cache()
+        if cache is not None:
+            sections[b"CACH"] = json.dumps(cache.hot_entries(self.max_cache_entries)).encode("utf-8")
+
+        return sections
+
+    def save(self) -> bool:
+        """Write a snapshot now (atomic replace); skipped until the restore has completed."""
+        if not self.restored.is_set():
+            self.stats["skipped"] += 1
+            logger.warning("Snapshot save skipped: restore has not completed")
+            return False
+
+        with self._save_lock:
+            start = time.perf_counter()
+            data = encode(self.collect())
+
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            tmp = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(data)
+            os.replace(tmp, self.path)
+
+            self.stats["saves"] += 1
+            self.stats["last_save_s"] = round(time.perf_counter() - start, 4)
+            self.stats["last_bytes"] = len(data)
+            return True
+
+    def start(self):
+        """Periodic saves + one final save at interpreter exit."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._loop, name="snapshots", daemon=True)
+            self._thread.start()
+            atexit.register(self.stop)
+        return self
+
+    def _loop(self):
+        while not self._stop.wait(self.interval_s):
+            try:
+                self.save()
+            except Exception as e:
+                logger.error(f"Snapshot save failed: {e}")
+
+    def stop(self, final_save: bool = True):
+        self._stop.set()
+        if final_save:
+            try:
+                self.save()
+            except Exception as e:
+                logger.error(f"Final snapshot save failed: {e}")
+
+    # ---------------------------------------------------------
+    # Restore
+    # ---------------------------------------------------------
+    def restore(self) -> dict:
+        """Load the snapshot and merge it behind the current state."""
+        from src.agent.memory import emotion_memory
+
+        try:
+            try:
+                with open(self.path, "rb") as f:
+                    sections = decode(f.read())
+            except FileNotFoundError:
+                return {}
+
+            counts = {}
+
+            if b"EMOT" in sections:
+                restored = _unpack_emotions(sections[b"EMOT"])
+                emotion_memory.logs[:0] = restored
+                counts["emotions"] = len(restored)
+
+            cache = self._cache()
+            if b"CACH" in sections and cache is not None:
+                entries = json.loads(sections[b"CACH"])
+                cache.merge(entries)
+                counts["cache_entries"] = len(entries)
+
+            self.stats["restored"] = counts
+            return counts
+        finally:
+            self.restored.set()
+
+    def restore_async(self):
+        """Restore on a daemon thread; callers never wait for it."""
+        def run():
+            try:
+                counts = self.restore()
+                if counts:
+                    logger.info(f"Warm restart restored {counts}")
+            except Exception as e:
+                logger.error(f"Snapshot restore failed: {e}")
+
+        threading.Thread(target=run, name="snapshot-restore", daemon=True).start()
+        return self
@@ -0,0 +1,551 @@
+# src/utils/state_backend.py
+
+"""
+Shared State Backends
+---------------------
+One storage interface for state that several replicas behind a load
+balancer must agree on: the LLM cache, mood logs, the journal and
+per-session conversation history.
+
+Two kinds of data:
+- hashes: name -> {field: JSON value}        (cache)
+- logs:   name -> append-only text            (emotion CSVs, journal, sessions)
+          read back from a byte offset, so followers fetch only the new tail,
+          or streamed in fixed-size chunks (iter_log) for exports
+
+Backends:
+- local  : files on this machine (the original layout: a hash is a JSON
+           file, a log is a plain text file; names are paths)
+- sqlite : one SQLite database (WAL), shared by processes on one host
+- redis  : any Redis-protocol server (RESP2 over a pooled socket); hashes
+           are Redis hashes, logs are strings grown with APPEND
+
+Batching: every call is one round trip, but execute([...]) sends many
+operations in one go (one transaction on SQLite, one pipelined write on
+Redis), and inside `with backend.batched():` writes made on this thread
+are queued and flushed together when the block exits. A read inside the
+block goes out immediately; if writes to the same name are queued, the
+queue is sent ahead of it in the same round trip, so the read sees them.
+
+Configured from the `state` section of config/agent.yaml; add your own
+with register_backend("name", BackendClass).
+"""
+
+import hashlib
+import json
+import os
+import socket
+import sqlite3
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+import yaml
+
+from src.utils.file_lock import _locked, append_locked, read_locked
+
+
+CONFIG_PATH = "config/agent.yaml"
+
+WRITE_OPS = frozenset({"hset", "hdel", "delete", "append"})
+
+
+class StateBackendError(Exception):
+    """Raised when the backend cannot be reached or rejects an operation."""
+
+
+def hashed_name(root: str, key, suffix: str) -> str:
+    """Per-key name spread over 256 subdirectories; the key never appears in it."""
+    digest = hashlib.md5(str(key).encode("utf-8")).hexdigest()
+    return os.path.join(root, digest[:2], digest + suffix)
+
+
+class StateBackend:
+    name = "base"
+    shared = False          # True when other replicas see the same data
+
+    def __init__(self):
+        self._local = threading.local()
+        self.stats = Counter()
+        self._stats_lock = threading.Lock()
+
+    def _execute(self, ops) -> list:
+        """Run [(op, args), ...] in one round trip; one result per op."""
+        raise NotImplementedError
+
+    def execute(self, ops) -> list:
+        ops = list(ops)
+        if not ops:
+            return []
+        with self._stats_lock:
+            self.stats["round_trips"] += 1
+            self.stats["ops"] += len(ops)
+        return self._execute(ops)
+
+    def _call(self, op: str, *args):
+        batch = getattr(self._local, "batch", None)
+        if batch is not None:
+            if op in WRITE_OPS:
+                batch.append((op, args))
+                return None
+            if any(queued[0] == args[0] for _, queued in batch):
+                # read-your-writes: flush the whole queue (keeps write order)
+                ops, batch[:] = batch + [(op, args)], []
+                return self.execute(ops)[-1]
+        return self.execute([(op, args)])[0]
+
+    @contextmanager
+    def batched(self):
+        """Queue this thread's writes and send them in one round trip at exit."""
+        if getattr(self._local, "batch", None) is not None:
+            yield self                          # nested: the outer block flushes
+            return
+
+        self._local.batch = []
+        try:
+            yield self
+        finally:
+            ops, self._local.batch = self._local.batch, None
+            self.execute(ops)
+
+    # ---------------------------------------------------------
+    # Hashes
+    # ---------------------------------------------------------
+    def hget(self, name: str, field: str):
+        return self._call("hget", name, field)
+
+    def hset(self, name: str, field: str, value):
+        return self._call("hset", name, field, value)
+
+    def hgetall(self, name: str) -> dict:
+        return self._call("hgetall", name)
+
+    def hdel(self, name: str, *fields):
+        return self._call("hdel", name, *fields)
+
+    def delete(self, name: str):
+        """Remove a hash or a log."""
+        return self._call("delete", name)
+
+    # ---------------------------------------------------------
+    # Logs
+    # ---------------------------------------------------------
+    def append(self, name: str, text: str, header: str = None):
+        """Append `text`; `header` is written first if the log is empty."""
+        return self._call("append", name, text, header)
+
+    def read(self, name: str, start: int = 0, length: int = None) -> bytes:
+        """Up to `length` bytes of the log from `start` on (b"" if it does not exist)."""
+        return self._call("read", name, start, length)
+
+    def iter_log(self, name: str, chunk_size: int = 1 << 20):
+        """Stream a log in chunks, up to its size when iteration started."""
+        end, pos = self.size(name), 0
+        while pos < end:
+            chunk = self.read(name, pos, min(chunk_size, end - pos))
+            if not chunk:
+                return
+            pos += len(chunk)
+            yield chunk
+
+    def size(self, name: str) -> int:
+        """Log length in bytes (0 if it does not exist)."""
+        return self._call("size", name)
+
+
+# -----------------------------------------------------------
+# Local files
+# -----------------------------------------------------------
+class LocalFileBackend(StateBackend):
+    name = "local"
+
+    def __init__(self, root: str = "."):
+        super().__init__()
+        self.root = root
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.root, name)
+
+    def _read_hash(self, path: str) -> dict:
+        try:
+            with read_locked(path) as f:
+                text = f.read()
+        except FileNotFoundError:
+            return {}
+        return json.loads(text) if text.strip() else {}
+
+    def _update_hash(self, path: str, update):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        # "a+" creates the file if needed; after truncate() appends land at 0
+        with open(path, "a+", encoding="utf-8") as f:
+            with _locked(f, exclusive=True):
+                f.seek(0)
+                text = f.read()
+                data = json.loads(text) if text.strip() else {}
+                update(data)
+                f.seek(0)
+                f.truncate()
+                json.dump(data, f, indent=4)
+                f.flush()
+
+    def _apply(self, op: str, args):
+        path = self._path(args[0])
+
+        if op == "hget":
+            return self._read_hash(path).get(args[1])
+        if op == "hgetall":
+            return self._read_hash(path)
+        if op == "hset":
+            _, field, value = args
+            return self._update_hash(path, lambda data: data.__setitem__(field, value))
+        if op == "hdel":
+            fields = args[1:]
+            return self._update_hash(path, lambda data: [data.pop(f, None) for f in fields])
+        if op == "delete":
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            return None
+        if op == "append":
+            _, text, header = args
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            return append_locked(path, text, header=header)
+        if op == "read":
+            try:
+                with read_locked(path, binary=True) as f:
+                    f.seek(args[1])
+                    return f.read(-1 if args[2] is None else args[2])
+            except FileNotFoundError:
+                return b""
+        if op == "size":
+            try:
+                return os.path.getsize(path)
+            except FileNotFoundError:
+                return 0
+        raise StateBackendError(f"Unknown operation: {op}")
+
+    def _execute(self, ops) -> list:
+        return [self._apply(op, args) for op, args in ops]
+
+
+# -----------------------------------------------------------
+# SQLite
+# -----------------------------------------------------------
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS hashes (
+    name TEXT NOT NULL, field TEXT NOT NULL, value TEXT NOT NULL,
+    PRIMARY KEY (name, field)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS logs (
+    name TEXT NOT NULL, pos INTEGER NOT NULL, data BLOB NOT NULL,
+    PRIMARY KEY (name, pos)
+) WITHOUT ROWID;
+"""
+
+
+class SQLiteBackend(StateBackend):
+    """Logs are stored as chunks keyed by byte position, so appends never rewrite."""
+    name = "sqlite"
+    shared = True
+
+    def __init__(self, path: str = os.path.join("data", "state.db"), timeout_s: float = 30.0):
+        super().__init__()
+        self.path = path
+        self.timeout_s = timeout_s
+        self._conns = threading.local()
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn().executescript(SQLITE_SCHEMA)
+
+    def _conn(self):
+        conn = getattr(self._conns, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.timeout_s, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._conns.conn = conn
+        return conn
+
+    @staticmethod
+    def _end(conn, name: str) -> int:
+        row = conn.execute(
+            "SELECT pos + length(data) FROM logs WHERE name = ? ORDER BY pos DESC LIMIT 1", (name,)
+        ).fetchone()
+        return row[0] if row else 0
+
+    def _apply(self, conn, op: str, args):
+        name = args[0]
+
+        if op == "hget":
+            row = conn.execute("SELECT value FROM hashes WHERE name = ? AND field = ?",
+                               (name, args[1])).fetchone()
+            return json.loads(row[0]) if row else None
+        if op == "hgetall":
+            rows = conn.execute("SELECT field, value FROM hashes WHERE name = ?", (name,))
+            return {field: json.loads(value) for field, value in rows}
+        if op == "hset":
+            conn.execute("INSERT OR REPLACE INTO hashes VALUES (?, ?, ?)",
+                         (name, args[1], json.dumps(args[2])))
+            return None
+        if op == "hdel":
+            conn.executemany("DELETE FROM hashes WHERE name = ? AND field = ?",
+                             [(name, f) for f in args[1:]])
+            return None
+        if op == "delete":
+            conn.execute("DELETE FROM hashes WHERE name = ?", (name,))
+            conn.execute("DELETE FROM logs WHERE name = ?", (name,))
+            return None
+        if op == "append":
+            _, text, header = args
+            end = self._end(conn, name)
+            if end == 0 and header:
+                data = header.encode("utf-8")
+                conn.execute("INSERT INTO logs VALUES (?, ?, ?)", (name, 0, data))
+                end = len(data)
+            if text:
+                conn.execute("INSERT INTO logs VALUES (?, ?, ?)", (name, end, text.encode("utf-8")))
+            return None
+        if op == "read":
+            _, start, length = args
+            stop = start + length if length is not None else -1
+            rows = conn.execute(
+                "SELECT pos, data FROM logs WHERE name = ? AND pos >= coalesce("
+                "(SELECT max(pos) FROM logs WHERE name = ? AND pos <= ?), 0) "
+                "AND (? < 0 OR pos < ?) ORDER BY pos",
+                (name, name, start, stop, stop),
+            ).fetchall()
+            if not rows:
+                return b""
+            data = b"".join(bytes(chunk) for _, chunk in rows)[max(start - rows[0][0], 0):]
+            return data if length is None else data[:length]
+        if op == "size":
+            return self._end(conn, name)
+        raise StateBackendError(f"Unknown operation: {op}")
+
+    def _execute(self, ops) -> list:
+        conn = self._conn()
+        writes = any(op in WRITE_OPS for op, _ in ops)
+        try:
+            conn.execute("BEGIN IMMEDIATE" if writes else "BEGIN")
+            try:
+                results = [self._apply(conn, op, args) for op, args in ops]
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+        except sqlite3.Error as e:
+            raise StateBackendError(f"sqlite: {e}") from e
+        return results
+
+
+# -----------------------------------------------------------
+# Redis protocol (RESP2)
+# -----------------------------------------------------------
+class RedisReplyError(StateBackendError):
+    """An error reply ("-ERR ...") from the server."""
+
+
+def encode_command(*args) -> bytes:
+    out = [b"*%d\r\n" % len(args)]
+    for arg in args:
+        data = arg if isinstance(arg, bytes) else str(arg).encode("utf-8")
+        out.append(b"$%d\r\n%s\r\n" % (len(data), data))
+    return b"".join(out)
+
+
+def read_reply(f):
+    """One RESP2 reply from a buffered binary stream. Error replies are returned, not raised."""
+    line = f.readline()
+    if not line.endswith(b"\r\n"):
+        raise ConnectionError("connection closed by server")
+
+    kind, rest = line[:1], line[1:-2]
+    if kind == b"+":
+        return rest.decode("utf-8")
+    if kind == b"-":
+        return RedisReplyError(rest.decode("utf-8"))
+    if kind == b":":
+        return int(rest)
+    if kind == b"$":
+        n = int(rest)
+        return None if n < 0 else f.read(n + 2)[:-2]
+    if kind == b"*":
+        n = int(rest)
+        return None if n < 0 else [read_reply(f) for _ in range(n)]
+    raise StateBackendError(f"Malformed reply: {line[:50]!r}")
+
+
+class RedisBackend(StateBackend):
+    name = "redis"
+    shared = True
+
+    def __init__(self, url: str = "redis://127.0.0.1:6379/0", timeout_s: float = 5.0,
+                 pool_size: int = 8):
+        super().__init__()
+        parts = urlsplit(url)
+        self.host = parts.hostname or "127.0.0.1"
+        self.port = parts.port or 6379
+        self.password = parts.password
+        self.db = int(parts.path.strip("/") or 0)
+        self.timeout_s = timeout_s
+        self.pool_size = pool_size
+
+        self._idle = []
+        self._pool_lock = threading.Lock()
+
+    # ---------------------------------------------------------
+    # Connections
+    # ---------------------------------------------------------
+    def _connect(self):
+        sock = socket.create_connection((self.host, self.port), timeout=self.timeout_s)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        conn = (sock, sock.makefile("rb"))
+
+        setup = []
+        if self.password:
+            setup.append(("AUTH", self.password))
+        if self.db:
+            setup.append(("SELECT", self.db))
+        if setup:
+            sock.sendall(b"".join(encode_command(*c) for c in setup))
+            for _ in setup:
+                reply = read_reply(conn[1])
+                if isinstance(reply, RedisReplyError):
+                    self._close(conn)
+                    raise reply
+        return conn
+
+    def _acquire(self):
+        with self._pool_lock:
+            if self._idle:
+                return self._idle.pop()
+        return self._connect()
+
+    def _release(self, conn):
+        with self._pool_lock:
+            if len(self._idle) < self.pool_size:
+                self._idle.append(conn)
+                return
+        self._close(conn)
+
+    @staticmethod
+    def _close(conn):
+        conn[1].close()
+        conn[0].close()
+
+    def close(self):
+        with self._pool_lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            self._close(conn)
+
+    # ---------------------------------------------------------
+    # Operations -> commands -> results
+    # ---------------------------------------------------------
+    @staticmethod
+    def _commands(op: str, args):
+        name = args[0]
+        if op == "hget":
+            return [("HGET", name, args[1])]
+        if op == "hgetall":
+            return [("HGETALL", name)]
+        if op == "hset":
+            return [("HSET", name, args[1], json.dumps(args[2]))]
+        if op == "hdel":
+            return [("HDEL", name, *args[1:])]
+        if op == "delete":
+            return [("DEL", name)]
+        if op == "append":
+            _, text, header = args
+            head = [("SETNX", name, header)] if header else []
+            return head + [("APPEND", name, text)]
+        if op == "read":
+            _, start, length = args
+            if length is not None and length <= 0:
+                return [("GETRANGE", name, 1, 0)]         # always empty
+            return [("GETRANGE", name, start, -1 if length is None else start + length - 1)]
+        if op == "size":
+            return [("STRLEN", name)]
+        raise StateBackendError(f"Unknown operation: {op}")
+
+    @staticmethod
+    def _result(op: str, reply):
+        if op == "hget":
+            return json.loads(reply) if reply is not None else None
+        if op == "hgetall":
+            pairs = reply or []
+            return {pairs[i].decode("utf-8"): json.loads(pairs[i + 1]) for i in range(0, len(pairs), 2)}
+        if op == "read":
+            return reply or b""
+        if op == "size":
+            return reply
+        return None
+
+    def _execute(self, ops) -> list:
+        plan = [(op, self._commands(op, args)) for op, args in ops]
+        payload = b"".join(encode_command(*c) for _, cmds in plan for c in cmds)
+
+        conn, ok = self._acquire(), False
+        try:
+            conn[0].sendall(payload)
+            replies = [[read_reply(conn[1]) for _ in cmds] for _, cmds in plan]
+            ok = True
+        except (OSError, ConnectionError) as e:
+            raise StateBackendError(f"redis {self.host}:{self.port}: {e}") from e
+        finally:
+            # a connection that failed mid-reply is out of sync: never reuse it
+            if ok:
+                self._release(conn)
+            else:
+                self._close(conn)
+
+        results = []
+        for (op, _), op_replies in zip(plan, replies):
+            for reply in op_replies:
+                if isinstance(reply, RedisReplyError):
+                    raise reply
+            results.append(self._result(op, op_replies[-1]))
+        return results
+
+
+# -----------------------------------------------------------
+# Factory
+# -----------------------------------------------------------
+BACKENDS = {
+    "local": LocalFileBackend,
+    "sqlite": SQLiteBackend,
+    "redis": RedisBackend,
+}
+
+
+def register_backend(name: str, backend_cls):
+    """Make a custom StateBackend subclass available to get_state_backend()."""
+    BACKENDS[name] = backend_cls
+
+
+def create_backend(name: str, **kwargs) -> StateBackend:
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown state backend: {name}")
+    return BACKENDS[name](**kwargs)
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_state_backend(config_path: str = CONFIG_PATH) -> StateBackend:
+    """Process-wide backend built from the `state` section of agent.yaml."""
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                settings = {}
+                try:
+                    with open(config_path, "r", encoding="utf-8") as f:
+                        settings = (yaml.safe_load(f) or {}).get("state", {}) or {}
+                except FileNotFoundError:
+                    pass
+                name = settings.get("backend", "local")
+                _backend = create_backend(name, **(settings.get(name) or {}))
+    return _backend
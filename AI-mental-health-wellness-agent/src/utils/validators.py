@@ -5,9 +5,9 @@ Validation utilities for user input, mood labels,
 and structured data objects passed through the Wellness Agent pipeline.
 """
 
-VALID_MOODS = [
-    "happy", "sad", "stressed", "anxious", "angry", "neutral"
-]
+from src.utils.moods import MOOD_LABELS, Mood, to_code
+
+VALID_MOODS = list(MOOD_LABELS)
 
 
 def validate_user_input(text: str) -> bool:
@@ -28,11 +28,11 @@ def validate_user_input(text: str) -> bool:
 
 def validate_mood_label(mood: str) -> bool:
     """
-    Ensures mood label is one of the supported categories.
+    Ensures mood label (or one of its aliases) is a supported category.
     """
     if not isinstance(mood, str):
         return False
-    return mood.lower() in VALID_MOODS
+    return to_code(mood, default=None) not in (None, Mood.CRITICAL)
 
 
 def validate_journal_entry(text: str) -> bool:
@@ -6,20 +6,44 @@ Features:
 - Chat UI (English / Hindi)
 - Shows agent response, suggestions, and translation
 - Save journal entries (calls pipeline.add_journal)
-- Shows weekly emotional trend chart (reads data/emotion_logs.csv)
-- Shows recent journal entries (reads data/journal_entries.txt)
+- Shows weekly emotional trend chart (TrendTracker, via the state backend)
+- Shows the student's recent journal entries (their own journal log)
 
 This app attempts to import your project pipeline:
     from src.pipelines.wellness_pipeline import WellnessPipeline
 If unavailable, a lightweight fallback pipeline is used so you can iterate locally.
 
+Send / Save are idempotent: each submission gets a key from session id +
+action + message + a nonce that advances only when the text is edited.
+Results are memoized per session, so reruns and double-clicks re-render
+the stored result instead of calling the LLM or appending to the journal
+again (streamlit_app/idempotency.py).
+
 Author: Generated to fit ai-mental-health-agent project structure
 """
 
 import streamlit as st
-import pandas as pd
 import os
-from datetime import datetime
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+# streamlit puts this script's directory on sys.path
+from idempotency import once as memoize_once, submission_key
+
+# ---------- Mood taxonomy (codes are stored, labels are shown) ----------
+try:
+    from src.utils.moods import to_label
+except Exception:
+    def to_label(mood):
+        return str(mood)
+
+# ---------- Trend tracker (server-side downsampled charts) ----------
+try:
+    from analytics.trend_tracker import trend_tracker
+    TREND_TRACKER_AVAILABLE = True
+except Exception:
+    TREND_TRACKER_AVAILABLE = False
 
 # ---------- Try to import your real pipeline (preferred) ----------
 try:
@@ -31,8 +55,8 @@ except Exception as e:
     # provide a minimal fallback pipeline for UI testing.
     REAL_PIPELINE_AVAILABLE = False
 
-    # fallback journal reader
-    def read_journal_entries(limit=5):
+    # fallback journal reader (single local file)
+    def read_journal_entries(limit=5, user_id=None):
         path = "data/journal_entries.txt"
         if not os.path.exists(path):
             return []
@@ -67,11 +91,11 @@ except Exception as e:
                 }
             # quick mood detector
             if any(k in text for k in ["exam", "exam tomorrow", "deadline", "pressure"]):
-                emotion = "stress"
+                emotion = "stressed"
                 intensity = 4
                 suggestions = ["Short walk", "Pomodoro 25/5"]
             elif any(k in text for k in ["panic", "panic attack", "panic mode", "can't sleep", "cant sleep"]):
-                emotion = "anxiety"
+                emotion = "anxious"
                 intensity = 5
                 suggestions = ["5-min breathing", "Grounding exercise"]
             elif any(k in text for k in ["sad", "alone", "depressed", "low"]):
@@ -93,7 +117,7 @@ except Exception as e:
                 "safe": True
             }
 
-        def add_journal(self, text: str):
+        def add_journal(self, text: str, user_id: str = None):
             # write to file
             os.makedirs("data", exist_ok=True)
             path = "data/journal_entries.txt"
@@ -106,22 +130,62 @@ except Exception as e:
         def get_resources(self, emotion: str):
             # tiny static mapping
             mapping = {
-                "stress": [{"title": "Pomodoro Guide", "link": "https://todoist.com/productivity-methods/pomodoro-technique"}],
-                "anxiety": [{"title": "Grounding Technique", "link": "https://www.youtube.com/watch?v=GiUDZtzRB-Q"}],
+                "stressed": [{"title": "Pomodoro Guide", "link": "https://todoist.com/productivity-methods/pomodoro-technique"}],
+                "anxious": [{"title": "Grounding Technique", "link": "https://www.youtube.com/watch?v=GiUDZtzRB-Q"}],
                 "sad": [{"title": "Coping with Feeling Low", "link": "https://www.healthline.com"}],
                 "neutral": [{"title": "Mental Wellbeing Tips", "link": "https://www.nhs.uk/every-mind-matters/"}]
             }
-            return mapping.get(emotion, mapping["neutral"])
+            return mapping.get(to_label(emotion), mapping["neutral"])
 
 
 
 # ---------- Initialize pipeline ----------
 if REAL_PIPELINE_AVAILABLE:
-    # You may want to pass a real LLM callable here (ADK LLM or a wrapper)
-    # For local dev this will use the fallback llm unless you wire one up.
-    pipeline = WellnessPipeline(llm=None)
+    # Shared pooled client configured from the `model` section of agent.yaml
+    # (set provider: "mock" to run against benchmarks/mock_llm_server.py).
+    # One admission-controlled pipeline is shared by every session, so
+    # per-user rate limits and the concurrency cap hold across reruns.
+    @st.cache_resource
+    def _shared_pipeline():
+        from src.llm.client import get_client
+        from src.pipelines.admission import AdmissionController
+        from src.utils.snapshots import SnapshotManager
+
+        # warm restart: restored in the background, never blocks a request
+        SnapshotManager.from_config().restore_async().start()
+        return AdmissionController(WellnessPipeline(llm=get_client()))
+
+    pipeline = _shared_pipeline()
+    run_kwargs = {"user_id": st.session_state.setdefault("user_id", uuid.uuid4().hex)}
 else:
     pipeline = WellnessPipeline()
+    run_kwargs = {}
+
+# Dashboard queries run on the pipeline's CPU executor when it is available
+if REAL_PIPELINE_AVAILABLE:
+    trend = pipeline.trend
+elif TREND_TRACKER_AVAILABLE:
+    def trend(method, **kwargs):
+        return getattr(trend_tracker, method)(**kwargs)
+
+# ---------- Idempotent submissions ----------
+session_id = st.session_state.setdefault("user_id", uuid.uuid4().hex)
+results = st.session_state.setdefault("results", OrderedDict())
+st.session_state.setdefault("submit_nonce", 0)
+
+
+def _new_submission():
+    """Editing the message starts a new submission."""
+    st.session_state["submit_nonce"] += 1
+
+
+def idempotency_key(action: str, *parts) -> str:
+    return submission_key(session_id, action, st.session_state["submit_nonce"], *parts)
+
+
+def once(key: str, call):
+    """Run `call` the first time `key` is seen this session; replay it after."""
+    return memoize_once(results, key, call)
 
 # ---------- Streamlit UI Layout ----------
 st.set_page_config(page_title="AI Student Wellness Agent", layout="wide")
@@ -134,7 +198,8 @@ with col1:
     st.header("Chat with the Agent")
     language = st.selectbox("Language", ("English", "Hindi"))
 
-    user_input = st.text_area("How are you feeling? Share as much as you'd like.", height=120)
+    user_input = st.text_area("How are you feeling? Share as much as you'd like.", height=120,
+                              key="user_input", on_change=_new_submission)
 
     submit_col, journal_col = st.columns([1,1])
     with submit_col:
@@ -142,16 +207,24 @@ with col1:
     with journal_col:
         save_journal = st.button("Save as Journal Entry")
 
-    # Handle submit
+    # Handle submit (memoized: a repeat click re-shows the stored reply)
     if submit and user_input and user_input.strip():
         lang_code = "hi" if language.lower().startswith("h") else "en"
+        key = idempotency_key("run", lang_code, user_input)
         with st.spinner("Analyzing..."):
-            output = pipeline.run(user_input, lang=lang_code)
+            once(key, lambda: pipeline.run(user_input, lang=lang_code, **run_kwargs))
+        st.session_state["shown_reply"] = key
 
-        # Display response
+    # Display the current reply on every rerun, without calling the pipeline
+    output = results.get(st.session_state.get("shown_reply"))
+    if output:
         if not output.get("safe", True):
             st.error(output["response"])
         else:
+            if output.get("shed") == "slo_exceeded":
+                st.info("The assistant is slow right now, so this is a quick local reply.")
+            elif output.get("shed"):
+                st.info("The assistant is busy, so this is a quick local reply.")
             st.success(output["response"])
 
             # suggestions panel
@@ -162,7 +235,7 @@ with col1:
             # resources
             st.markdown("**Recommended resources**")
             try:
-                resources = pipeline.get_resources(output.get("emotion", "neutral"))
+                resources = pipeline.get_resources(to_label(output.get("emotion", "neutral")))
                 for r in resources:
                     st.write(f"- [{r.get('title')}]({r.get('link')})")
             except Exception:
@@ -174,9 +247,10 @@ with col1:
                 st.markdown("**Translated**")
                 st.write(output["translated"])
 
-    # Handle saving journal entry
+    # Handle saving journal entry (memoized: never appended twice)
     if save_journal and user_input and user_input.strip():
-        res = pipeline.add_journal(user_input)
+        key = idempotency_key("journal", user_input)
+        res = once(key, lambda: pipeline.add_journal(user_input, **run_kwargs))
         if res.get("status") == "saved":
             st.success(f"Journal saved at {res.get('timestamp')}")
         else:
@@ -192,39 +266,33 @@ with col1:
 with col2:
     st.header("Dashboard & Trends")
 
-    # Emotion trend chart (reads data/emotion_logs.csv or fallback to pipeline logs)
+    # Emotion trend chart (TrendTracker reads the mood log from the state backend)
     st.subheader("Weekly Emotion Trend")
 
-    # Attempt to load CSV logs (preferred)
-    logs_path = "data/emotion_logs.csv"
-    df_trend = None
-    if os.path.exists(logs_path):
+    if TREND_TRACKER_AVAILABLE:
         try:
-            df_trend = pd.read_csv(logs_path, parse_dates=[0], header=None)
-            # expected format: timestamp, message, mood
-            if df_trend.shape[1] >= 3:
-                df_trend = df_trend.iloc[:, :3]
-                df_trend.columns = ["timestamp", "message", "mood"]
-                df_trend["timestamp"] = pd.to_datetime(df_trend["timestamp"], errors="coerce")
-                # aggregate per day
-                df_trend["date"] = df_trend["timestamp"].dt.date
-                counts = df_trend.groupby(["date", "mood"]).size().unstack(fill_value=0)
-                st.line_chart(counts)
+            span = trend("time_range")
+            if span:
+                first, last = span[0].date(), span[1].date()
+                default_start = max(first, last - timedelta(days=trend_tracker.window_days))
+                selected = st.date_input("Range", (default_start, last), min_value=first, max_value=last)
+                start, end = selected if len(selected) == 2 else (selected[0], selected[0])
+
+                # Narrower ranges come back at finer resolution, same point budget
+                series = trend("mood_series", start=start, end=end + timedelta(days=1))
+                if not series.empty:
+                    st.line_chart(series)
+                    st.caption(f"Resolution: {series.attrs.get('bucket')} buckets")
             else:
-                st.info("emotion_logs.csv exists but is using an unexpected format.")
+                st.info("No emotion logs yet. Interact with the agent to build them.")
         except Exception as e:
             st.error("Unable to read emotion logs: " + str(e))
     else:
-        # Try to build plot from pipeline/emotion memory if accessible
-        try:
-            # If analytics/trend_tracker created a CSV at data/emotion_logs.csv this will show it.
-            st.info("No emotion log CSV found. Interact with the agent to build logs.")
-        except Exception:
-            st.info("No emotion logs available yet.")
+        st.info("Trend charts need analytics/trend_tracker.py.")
 
     st.markdown("---")
     st.subheader("Recent Journal Entries")
-    entries = read_journal_entries(limit=5)
+    entries = read_journal_entries(limit=5, **run_kwargs)
     if entries:
         for i, e in enumerate(reversed(entries), 1):
             st.markdown(f"**Entry {i}**")
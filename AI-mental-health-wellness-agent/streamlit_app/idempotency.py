@@ -0,0 +1,34 @@
+# streamlit_app/idempotency.py
+"""
+Idempotent submissions for the Streamlit UI (no Streamlit import, so it
+can be tested on its own).
+
+- submission_key(): session id + action + submit nonce + the submitted
+  values, hashed. The nonce advances only when the message is edited, so a
+  rerun or a double-click produces the same key.
+- once(): runs a call the first time its key is seen and replays the stored
+  result after; the per-session store is a bounded LRU.
+"""
+
+import hashlib
+from collections import OrderedDict
+
+
+MAX_MEMOIZED_RESULTS = 50
+
+
+def submission_key(session_id: str, action: str, nonce: int, *parts) -> str:
+    raw = "\x1f".join([session_id, action, str(nonce), *map(str, parts)])
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def once(results: OrderedDict, key: str, call, max_results: int = MAX_MEMOIZED_RESULTS):
+    """Run `call` the first time `key` is in `results`; replay it after."""
+    if key in results:
+        results.move_to_end(key)
+        return results[key]
+
+    results[key] = call()
+    if len(results) > max_results:
+        results.popitem(last=False)
+    return results[key]
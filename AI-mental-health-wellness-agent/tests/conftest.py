@@ -0,0 +1,28 @@
+# tests/conftest.py
+
+"""
+Tests run from a scratch working directory holding a copy of config/, so
+the data/ and logs/ files some modules create on import (the global
+analytics logger, the app logger) never land in the project tree.
+"""
+
+import os
+import shutil
+import tempfile
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_scratch = {}
+
+
+def pytest_configure(config):
+    scratch = tempfile.mkdtemp(prefix="wellness-tests-")
+    shutil.copytree(os.path.join(PROJECT_ROOT, "config"), os.path.join(scratch, "config"))
+    _scratch["previous"], _scratch["path"] = os.getcwd(), scratch
+    os.chdir(scratch)
+
+
+def pytest_unconfigure(config):
+    if _scratch:
+        os.chdir(_scratch["previous"])
+        shutil.rmtree(_scratch["path"], ignore_errors=True)
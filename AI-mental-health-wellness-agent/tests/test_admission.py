@@ -0,0 +1,145 @@
+# tests/test_admission.py
+
+"""
+Admission control in src/pipelines/admission.py:
+- each user gets a burst, then is shed as rate_limited
+- past max_concurrency requests wait in a bounded queue; a full queue or a
+  wait past queue_timeout_s is shed with the local reply
+- crisis messages bypass rate limits and the queue
+"""
+
+import threading
+import time
+
+import pytest
+
+from src.pipelines.admission import AdmissionController
+
+
+class FakeScheduler:
+    def admit_crisis(self, user_text, lang="en", user_id=None):
+        return {"response": "crisis", "safe": False} if "crisis" in user_text else None
+
+    def crisis_stats(self):
+        return {}
+
+
+class FakePipeline:
+    """run_admitted() blocks until `release` is set when `hold` is."""
+
+    def __init__(self):
+        self.hold = False
+        self.release = threading.Event()
+        self.started = threading.Semaphore(0)
+        self.llm_calls = 0
+
+    def run_admitted(self, user_text, lang="en", user_id=None, cohort=None):
+        self.llm_calls += 1
+        self.started.release()
+        if self.hold:
+            self.release.wait(5)
+        return {"response": "llm reply", "safe": True}
+
+    def local_response(self, user_text, lang="en", reason=None, header=None, user_id=None):
+        return {"response": "local reply", "safe": True, "shed": reason}
+
+
+@pytest.fixture
+def make_controller():
+    pipeline = FakePipeline()
+
+    def make(**overrides):
+        settings = {"user_rate_per_min": 60, "user_burst": 3, "max_concurrency": 1,
+                    "max_queue": 1, "queue_timeout_s": 5.0}
+        settings.update(overrides)
+        return AdmissionController(pipeline, config_path="missing.yaml",
+                                   scheduler=FakeScheduler(), **settings)
+
+    yield make
+    pipeline.release.set()
+
+
+def occupy(controller, n=1):
+    """Hold n concurrency slots with blocked requests from other users."""
+    controller.pipeline.hold = True
+    threads = [
+        threading.Thread(target=controller.run, args=("hello",), kwargs={"user_id": f"busy-{i}"})
+        for i in range(n)
+    ]
+    for thread in threads:
+        thread.start()
+        assert controller.pipeline.started.acquire(timeout=5)
+    return threads
+
+
+def test_user_is_rate_limited_after_the_burst(make_controller):
+    controller = make_controller(user_burst=3, max_concurrency=4)
+    replies = [controller.run("hi", user_id="u1") for _ in range(4)]
+
+    assert [r.get("shed") for r in replies] == [None, None, None, "rate_limited"]
+    assert controller.run("hi", user_id="u2").get("shed") is None      # other users unaffected
+    assert controller.metrics()["rate_limited"] == 1
+
+
+def test_full_queue_is_shed_at_once(make_controller):
+    controller = make_controller(max_concurrency=1, max_queue=0)
+    threads = occupy(controller)
+
+    reply = controller.run("hi", user_id="u1")
+    assert reply["shed"] == "queue_full"
+    assert controller.metrics()["in_flight"] == 1
+
+    controller.pipeline.release.set()
+    for thread in threads:
+        thread.join()
+    assert controller.metrics()["in_flight"] == 0
+
+
+def test_queued_request_is_shed_after_the_timeout(make_controller):
+    controller = make_controller(max_concurrency=1, max_queue=1, queue_timeout_s=0.05)
+    threads = occupy(controller)
+
+    assert controller.run("hi", user_id="u1")["shed"] == "queue_timeout"
+    controller.pipeline.release.set()
+    for thread in threads:
+        thread.join()
+
+
+def test_queued_request_runs_when_a_slot_frees(make_controller):
+    controller = make_controller(max_concurrency=1, max_queue=1)
+    threads = occupy(controller)
+
+    replies = []
+    waiter = threading.Thread(target=lambda: replies.append(controller.run("hi", user_id="u1")))
+    waiter.start()
+    deadline = time.monotonic() + 5
+    while controller.metrics()["queue_depth"] == 0 and time.monotonic() < deadline:
+        time.sleep(0.005)
+    controller.pipeline.release.set()
+    waiter.join(5)
+    for thread in threads:
+        thread.join()
+
+    assert replies == [{"response": "llm reply", "safe": True}]
+    assert controller.metrics()["queued"] == 1
+
+
+def test_crisis_bypasses_limits(make_controller):
+    controller = make_controller(user_burst=1, max_concurrency=1, max_queue=0)
+    controller.run("hi", user_id="u1")
+    threads = occupy(controller)
+
+    reply = controller.run("crisis message", user_id="u1")
+    assert reply == {"response": "crisis", "safe": False}
+    assert controller.metrics()["crisis"] == 1
+
+    controller.pipeline.release.set()
+    for thread in threads:
+        thread.join()
+
+
+def test_tracked_users_are_bounded(make_controller):
+    controller = make_controller(max_users=5, max_concurrency=4)
+    for i in range(20):
+        controller.run("hi", user_id=f"u{i}")
+    assert controller.metrics()["tracked_users"] == 5
@@ -0,0 +1,114 @@
+# tests/test_coping_suggester.py
+
+"""
+Rotation guarantees of src/tools/coping_suggester.py:
+- no activity repeats until the user's whole pool has been shown
+- feedback weights hold for every draw, including the last ones of a cycle
+"""
+
+import json
+import random
+
+import pytest
+
+from src.tools.coping_suggester import AliasTable, CopingSuggester
+from src.utils.moods import Mood
+
+
+POOL = [f"sad activity {i}" for i in range(7)]
+
+
+@pytest.fixture
+def suggester(tmp_path):
+    path = tmp_path / "activities.json"
+    path.write_text(json.dumps({"sad": POOL, "happy": ["a", "b", "c", "d"]}))
+    return CopingSuggester(activities_file=str(path), seed=7)
+
+
+def one_cycle(suggester, user_id="student-1"):
+    return [suggester.suggest("sad", count=1, user_id=user_id)[0] for _ in POOL]
+
+
+def test_no_repeat_within_a_cycle(suggester):
+    for _ in range(20):
+        assert sorted(one_cycle(suggester)) == sorted(POOL)
+
+
+def test_no_repeat_across_multi_item_draws(suggester):
+    shown = []
+    for _ in range(30):
+        picked = suggester.suggest("sad", count=3, user_id="student-1")
+        assert len(set(picked)) == 3
+        shown.extend(picked)
+
+    # a cycle that ends mid-call refills without the activities already
+    # picked for that call, so only the first cycle lines up with the calls
+    assert sorted(shown[:len(POOL)]) == sorted(POOL)
+
+
+def test_no_repeat_with_feedback_mid_cycle(suggester):
+    for _ in range(20):
+        cycle = []
+        for _ in POOL:
+            activity = suggester.suggest("sad", count=1, user_id="student-1")[0]
+            # re-weighting something already shown must not bring it back
+            suggester.record_feedback("sad", activity, helpful=True, user_id="student-1")
+            cycle.append(activity)
+        assert sorted(cycle) == sorted(POOL)
+
+
+def test_users_rotate_independently(suggester):
+    first = [suggester.suggest("sad", count=1, user_id="student-1")[0] for _ in range(3)]
+    assert sorted(one_cycle(suggester, "student-2")) == sorted(POOL)
+    assert sorted(first + one_cycle(suggester, "student-1")[:4]) == sorted(POOL)
+
+
+def test_relevant_picks_do_not_repeat_within_a_cycle(suggester, monkeypatch):
+    # the same message always matches the same two activities
+    monkeypatch.setattr(suggester, "_relevant", lambda message, mood, count: [3, 5])
+
+    shown = []
+    for _ in range(4):
+        picked = suggester.suggest("sad", count=2, user_id="student-1", message="breathing")
+        assert len(set(picked)) == 2
+        shown.extend(picked)
+
+    assert shown[:2] == [POOL[3], POOL[5]]
+    # 8 picks over a pool of 7: the first 7 are one full cycle
+    assert sorted(shown[:len(POOL)]) == sorted(POOL)
+
+
+def test_weights_hold_when_bag_is_low(suggester):
+    user = "student-1"
+    for _ in range(49):
+        suggester.record_feedback("sad", POOL[0], helpful=True, user_id=user)   # weight 50
+    for _ in range(3):
+        suggester.record_feedback("sad", POOL[1], helpful=True, user_id=user)   # weight 4
+
+    bag = suggester._bag(user, Mood.SAD)
+    hits = 0
+    trials = 4000
+    for _ in range(trials):
+        bag.refill()
+        for i in range(len(POOL)):
+            if i not in (1, 2):
+                bag.take(i)
+        hits += suggester._draw(bag, []) == 1
+
+    # only items 1 (weight 4) and 2 (weight 1) are left: 4 / 5
+    assert hits / trials == pytest.approx(0.8, abs=0.03)
+
+
+def test_alias_table_never_samples_zero_weight():
+    rng = random.Random(3)
+    weights = [0.0 if i % 3 else 1.0 + i for i in range(200)]
+    table = AliasTable(weights)
+    assert all(weights[table.sample(rng)] > 0 for _ in range(5000))
+
+    table.update(0, 0.0)
+    table.update(1, 5000.0)
+    counts = [0] * len(weights)
+    for _ in range(5000):
+        counts[table.sample(rng)] += 1
+    assert counts[0] == 0 and counts[1] > 0
+    assert all(counts[i] == 0 for i in range(2, 200) if i % 3)
@@ -0,0 +1,148 @@
+# tests/test_crisis_outbox.py
+
+"""
+Delivery guarantees of src/agent/crisis_outbox.py:
+- failed deliveries are retried until they succeed, or acked as dead after
+  max_attempts
+- one alert per student/session per window, in-process and across
+  processes sharing an outbox_dir
+- a failed enqueue write does not suppress the student's next alert
+- alerts queued while no dispatcher ran are delivered on the next start
+"""
+
+import json
+import os
+
+import pytest
+
+from benchmarks.alert_sink import AlertSink
+from src.agent.crisis_outbox import AlertTarget, CrisisOutbox, WebhookTarget
+
+
+class ListTarget(AlertTarget):
+    """Records alerts; the first `failures` sends raise."""
+
+    name = "list"
+
+    def __init__(self, failures=0):
+        self.failures = failures
+        self.sent = []
+
+    def send(self, alert):
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("target unavailable")
+        self.sent.append(alert)
+
+
+@pytest.fixture
+def make_outbox(tmp_path):
+    outboxes = []
+
+    def make(*targets, **settings):
+        options = {"max_attempts": 5, "backoff_base_s": 0.01, "backoff_max_s": 0.05, "poll_s": 0.05}
+        options.update(settings)
+        outbox = CrisisOutbox(list(targets), outbox_dir=str(tmp_path / "outbox"), **options)
+        outboxes.append(outbox)
+        return outbox
+
+    yield make
+    for outbox in outboxes:
+        outbox.stop()
+        os.close(outbox._fd)
+
+
+def acks(outbox):
+    with open(outbox.ack_path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def test_failed_delivery_is_retried(make_outbox):
+    target = ListTarget(failures=2)
+    outbox = make_outbox(target).start()
+    alert_id = outbox.enqueue("student-1", session_id="s1")
+
+    assert outbox.drain(timeout=10)
+    assert [a["id"] for a in target.sent] == [alert_id]
+    assert target.sent[0]["attempt"] == 3
+    assert outbox.snapshot()["retries"] == 2
+    assert acks(outbox)[-1]["status"] == "delivered"
+
+
+def test_alert_is_dead_after_max_attempts(make_outbox):
+    target = ListTarget(failures=100)
+    outbox = make_outbox(target, max_attempts=3).start()
+    outbox.enqueue("student-1", session_id="s1")
+
+    assert outbox.drain(timeout=10)
+    assert target.sent == []
+    assert outbox.snapshot()["dead"] == 1
+    ack = acks(outbox)[-1]
+    assert (ack["status"], ack["attempts"]) == ("dead", 3)
+
+
+def test_webhook_delivery_survives_503s(make_outbox):
+    sink = AlertSink(port=0, fail_rate=0.5, seed=1)
+    sink.start()
+    try:
+        outbox = make_outbox(WebhookTarget(sink.url, timeout_s=2.0), max_attempts=20).start()
+        ids = {outbox.enqueue(f"student-{i}", session_id="s1") for i in range(10)}
+        assert outbox.drain(timeout=30)
+    finally:
+        sink.shutdown()
+        sink.server_close()
+
+    assert sink.rejected > 0
+    assert {a["id"] for a in sink.received} == ids
+    assert "message" not in sink.received[0]
+
+
+def test_repeat_alerts_are_deduped_in_process(make_outbox):
+    outbox = make_outbox(ListTarget())
+    assert outbox.enqueue("student-1", session_id="s1") is not None
+    assert outbox.enqueue("student-1", session_id="s1") is None
+    assert outbox.enqueue("student-1", session_id="s2") is not None
+    assert outbox.snapshot()["deduped"] == 1
+
+
+def test_repeat_alerts_are_deduped_across_processes(make_outbox):
+    # two request-path processes share the outbox; each only knows its own alerts
+    make_outbox().enqueue("student-1", session_id="s1")
+    make_outbox().enqueue("student-1", session_id="s1")
+
+    target = ListTarget()
+    dispatcher = make_outbox(target).start()
+    assert dispatcher.drain(timeout=10)
+    assert len(target.sent) == 1
+    assert dispatcher.snapshot()["deduped"] == 1
+
+
+def test_failed_write_does_not_suppress_the_next_alert(make_outbox):
+    outbox = make_outbox(ListTarget())
+    fd = outbox._fd
+    outbox._fd = os.open(os.devnull, os.O_RDONLY)        # every write() fails
+    try:
+        with pytest.raises(OSError):
+            outbox.enqueue("student-1", session_id="s1")
+    finally:
+        os.close(outbox._fd)
+        outbox._fd = fd
+
+    assert outbox.enqueue("student-1", session_id="s1") is not None
+
+
+def test_alerts_queued_offline_are_delivered_on_restart(make_outbox):
+    offline = make_outbox()
+    queued = {offline.enqueue(f"student-{i}", session_id="s1") for i in range(3)}
+
+    target = ListTarget()
+    restarted = make_outbox(target).start()
+    assert restarted.drain(timeout=10)
+    assert {a["id"] for a in target.sent} == queued
+    assert restarted.snapshot()["recovered"] == 3
+
+    # delivered alerts are acked, so a further restart sends nothing again
+    restarted.stop()
+    again = ListTarget()
+    assert make_outbox(again).start().drain(timeout=10)
+    assert again.sent == []
@@ -0,0 +1,44 @@
+# tests/test_downsample.py
+
+"""
+Point budget of analytics/downsample.py:
+- lttb_frame() never returns more than max_points rows
+- the first and last rows always survive, however the budget is split
+"""
+
+import numpy as np
+import pytest
+
+from analytics.downsample import lttb, lttb_frame
+
+
+def _series(n, k, seed=0):
+    rng = np.random.default_rng(seed)
+    x = np.arange(n, dtype=np.float64)
+    return x, [rng.normal(size=n).cumsum() for _ in range(k)]
+
+
+@pytest.mark.parametrize("k", [1, 3, 4, 7])
+@pytest.mark.parametrize("max_points", [3, 10, 50, 301])
+def test_frame_keeps_budget_and_both_ends(k, max_points):
+    x, columns = _series(5000, k)
+    keep = lttb_frame(x, columns, max_points)
+
+    assert keep.size <= max_points
+    assert keep[0] == 0
+    assert keep[-1] == len(x) - 1
+    assert np.all(np.diff(keep) > 0)
+
+
+def test_frame_over_budget_is_thinned_to_exactly_max_points():
+    # every series keeps at least 3 points, so 7 of them overrun a budget of 5
+    x, columns = _series(1000, 7)
+    keep = lttb_frame(x, columns, 5)
+    assert keep.size == 5
+    assert keep[-1] == len(x) - 1
+
+
+def test_small_inputs_are_returned_whole():
+    x, columns = _series(20, 2)
+    assert np.array_equal(lttb_frame(x, columns, 50), np.arange(20))
+    assert np.array_equal(lttb(x, columns[0], 50), np.arange(20))
@@ -0,0 +1,128 @@
+# tests/test_export.py
+
+"""
+analytics/export.py: filters, redaction, partition reads and the
+token-protected HTTP endpoint, over a local state backend in a temp dir.
+"""
+
+import http.client
+import json
+
+import pytest
+
+import analytics.export as export_mod
+from analytics.export import Filters, export, iter_mood_rows, redact_text, serve_exports
+from analytics.logger import AnalyticsLogger
+from src.utils.state_backend import LocalFileBackend
+
+
+MESSAGE = "mail me at sam@example.com or call +1 555 123 4567, see https://x.io @sam_k"
+
+
+@pytest.fixture
+def backend(tmp_path, monkeypatch):
+    backend = LocalFileBackend(str(tmp_path))
+    monkeypatch.setattr(export_mod, "get_state_backend", lambda: backend)
+
+    log = AnalyticsLogger(backend=backend)
+    log.log_many([
+        ("2026-03-01T09:00:00", "sad", 0.8, MESSAGE),
+        ("2026-03-02T09:00:00", "happy", 0.6, "good day"),
+        ("2026-03-03T23:59:00", "anxious", 0.7, "exam tomorrow"),
+    ], user_id="student-1", cohort="class-a")
+    log.log_many([("2026-03-02T10:00:00", "angry", 0.9, "someone else")], user_id="student-2")
+    return backend
+
+
+def rows(**filters):
+    return list(iter_mood_rows(**filters))
+
+
+def test_redaction_modes():
+    masked = redact_text(MESSAGE)
+    assert "sam@example.com" not in masked and "555" not in masked
+    assert "https://x.io" not in masked and "@sam_k" not in masked
+    assert {"[email]", "[phone]", "[url]", "[handle]"} <= set(masked.replace(",", " ").split())
+
+    assert redact_text(MESSAGE, "full") == "[redacted]"
+    assert redact_text(MESSAGE, "none") == MESSAGE
+    with pytest.raises(ValueError):
+        redact_text(MESSAGE, "some")
+
+
+def test_rows_are_pii_redacted_by_default(backend):
+    first = rows()[0]
+    assert first["mood"] == "sad" and first["mood_code"] == 2
+    assert first["user_message"] == redact_text(MESSAGE, "pii")
+
+
+def test_mood_filters_accept_aliases_and_reject_unknown_labels(backend):
+    assert [r["mood"] for r in rows(moods=["depression", "nervous"])] == ["sad", "anxious"]
+
+    with pytest.raises(ValueError):
+        Filters(moods=["sadd"])
+    with pytest.raises(ValueError):
+        export("moods", "csv", moods=["typo"])      # before any byte is produced
+
+
+def test_date_bounds(backend):
+    assert len(rows(since="2026-03-02")) == 3
+    # a bare `until` date includes that whole day
+    assert [r["timestamp"][:10] for r in rows(until="2026-03-02")] == ["2026-03-01", "2026-03-02", "2026-03-02"]
+    with pytest.raises(ValueError):
+        export("moods", "csv", since="not a date")
+
+
+def test_user_and_cohort_exports_read_only_their_partition(backend):
+    mine = rows(user_id="student-1")
+    assert [r["mood"] for r in mine] == ["sad", "happy", "anxious"]
+    assert all(r["user_message"] == "" for r in mine)     # partitions hold no text
+    assert len(rows(cohort="class-a")) == 3
+    assert [r["mood"] for r in rows(user_id="student-2")] == ["angry"]
+    assert rows(user_id="nobody") == []
+
+
+def test_csv_and_jsonl_writers(backend):
+    csv_text = b"".join(export("moods", "csv", redact="full")).decode("utf-8")
+    lines = csv_text.splitlines()
+    assert lines[0] == "timestamp,mood,mood_code,confidence,user_message"
+    assert len(lines) == 5 and all(line.endswith("[redacted]") for line in lines[1:])
+
+    records = [json.loads(line) for line in b"".join(export("moods", "jsonl", moods=["happy"])).splitlines()]
+    assert records == [{"timestamp": "2026-03-02T09:00:00", "mood": "happy", "mood_code": 1,
+                        "confidence": 0.6, "user_message": "good day"}]
+
+
+def test_server_refuses_to_start_without_a_token(monkeypatch):
+    monkeypatch.delenv(export_mod.TOKEN_ENV, raising=False)
+    with pytest.raises(ValueError):
+        serve_exports(port=0)
+
+
+def test_http_endpoint(backend):
+    server = serve_exports(port=0, token="s3cret")
+    host, port = server.server_address[:2]
+
+    def get(path, token="s3cret"):
+        conn = http.client.HTTPConnection(host, port, timeout=5)
+        conn.request("GET", path, headers={"Authorization": f"Bearer {token}"} if token else {})
+        response = conn.getresponse()
+        body = response.read()
+        conn.close()
+        return response.status, body
+
+    try:
+        assert get("/export/moods", token=None)[0] == 401
+        assert get("/export/moods", token="wrong")[0] == 401
+        assert get("/export/nothing")[0] == 404
+
+        status, body = get("/export/moods?mood=sadd")
+        assert status == 400 and b"sadd" in body
+
+        status, body = get("/export/moods?format=jsonl&mood=sad")
+        assert status == 200
+        record = json.loads(body)
+        assert record["user_message"] == redact_text(MESSAGE, "pii")
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,72 @@
+# tests/test_idempotency.py
+
+"""
+Idempotent Streamlit submissions (streamlit_app/idempotency.py):
+- reruns and double-clicks of the same submission share one key, and the
+  pipeline call behind it runs once
+- a new nonce (edited message), another action or another session is a
+  new submission
+- the per-session memo is a bounded LRU
+"""
+
+from collections import OrderedDict
+
+import pytest
+
+from streamlit_app.idempotency import once, submission_key
+
+
+def test_key_is_stable_for_a_repeat_submission():
+    assert submission_key("s1", "run", 0, "en", "exam tomorrow") == \
+        submission_key("s1", "run", 0, "en", "exam tomorrow")
+
+
+@pytest.mark.parametrize("other", [
+    ("s2", "run", 0, "en", "exam tomorrow"),
+    ("s1", "journal", 0, "en", "exam tomorrow"),
+    ("s1", "run", 1, "en", "exam tomorrow"),
+    ("s1", "run", 0, "hi", "exam tomorrow"),
+    ("s1", "run", 0, "en", "exam today"),
+])
+def test_key_changes_with_session_action_nonce_and_values(other):
+    assert submission_key(*other) != submission_key("s1", "run", 0, "en", "exam tomorrow")
+
+
+def test_parts_cannot_run_together():
+    assert submission_key("s1", "run", 0, "ab", "c") != submission_key("s1", "run", 0, "a", "bc")
+
+
+def test_repeat_renders_replay_the_stored_result():
+    results, calls = OrderedDict(), []
+
+    def run():
+        calls.append(1)
+        return {"response": f"reply {len(calls)}"}
+
+    key = submission_key("s1", "run", 0, "en", "exam tomorrow")
+    for _ in range(3):                          # first click, double-click, rerun
+        assert once(results, key, run) == {"response": "reply 1"}
+    assert len(calls) == 1
+
+
+def test_failed_call_is_not_memoized():
+    results = OrderedDict()
+
+    def fails():
+        raise RuntimeError("provider down")
+
+    with pytest.raises(RuntimeError):
+        once(results, "k", fails)
+    assert once(results, "k", lambda: "ok") == "ok"
+
+
+def test_memo_evicts_least_recently_used():
+    results = OrderedDict()
+    for i in range(3):
+        once(results, f"k{i}", lambda i=i: i, max_results=3)
+
+    once(results, "k0", lambda: "never")        # touch: k1 is now the oldest
+    once(results, "k3", lambda: 3, max_results=3)
+
+    assert list(results) == ["k2", "k0", "k3"]
+    assert once(results, "k1", lambda: "again", max_results=3) == "again"
@@ -0,0 +1,144 @@
+# tests/test_latency_budget.py
+
+"""
+SLO handling of src/pipelines/latency_budget.py:
+- a late call is answered by the fallback and told so through its Deadline,
+  so it skips its writes; one that already committed is served late
+- a call still queued when the SLO passes is cancelled, never run
+- past workers + max_queue pending calls the fallback answers at once
+"""
+
+import threading
+import time
+
+import pytest
+
+from src.pipelines.latency_budget import Deadline, LatencyBudget
+
+
+SLO_MS = 50
+
+
+@pytest.fixture
+def make_budget():
+    budgets = []
+
+    def make(**overrides):
+        settings = {"slo_ms": SLO_MS, "workers": 1, "max_queue": 1, "hedge_after_ms": 0}
+        settings.update(overrides)
+        budget = LatencyBudget(config_path="missing.yaml", **settings)
+        budgets.append(budget)
+        return budget
+
+    yield make
+    for budget in budgets:
+        budget.shutdown(wait=True)
+
+
+def fallback():
+    return "fallback"
+
+
+def test_deadline_commit_and_abandon_are_exclusive():
+    first = Deadline()
+    assert first.commit() and not first.abandon()
+    assert not first.abandoned
+
+    second = Deadline()
+    assert second.abandon() and not second.commit()
+    assert second.abandoned
+
+
+def test_call_within_slo_returns_its_result(make_budget):
+    budget = make_budget()
+    assert budget.call(lambda x, deadline: x * 2, 21, fallback=fallback) == 42
+    assert budget.stats["within_slo"] == 1
+
+
+def test_late_call_is_abandoned_and_skips_its_writes(make_budget):
+    budget = make_budget()
+    release, done = threading.Event(), threading.Event()
+    writes = []
+
+    def slow(deadline):
+        release.wait(5)
+        if deadline.commit():
+            writes.append("session turn")
+        done.set()
+        return "late reply"
+
+    assert budget.call(slow, fallback=fallback) == "fallback"
+    release.set()
+    assert done.wait(5)
+
+    assert writes == []
+    assert budget.stats["slo_missed"] == 1
+    deadline_s = time.monotonic() + 5
+    while budget.stats["late_completed"] != 1 and time.monotonic() < deadline_s:
+        time.sleep(0.01)
+    assert budget.snapshot()["late_completed"] == 1
+
+
+def test_committed_call_is_served_late(make_budget):
+    budget = make_budget()
+
+    def commits_then_stalls(deadline):
+        assert deadline.commit()
+        time.sleep(SLO_MS / 1000.0 * 3)
+        return "reply"
+
+    assert budget.call(commits_then_stalls, fallback=fallback) == "reply"
+    assert budget.stats["late_served"] == 1
+
+
+def test_queued_call_is_cancelled_when_late(make_budget):
+    budget = make_budget(workers=1, max_queue=1)
+    started, release = threading.Event(), threading.Event()
+    ran = []
+
+    def blocks(deadline):
+        started.set()
+        release.wait(5)
+
+    blocker = threading.Thread(target=budget.call, args=(blocks,), kwargs={"fallback": fallback})
+    blocker.start()
+    assert started.wait(5)
+
+    try:
+        assert budget.call(lambda deadline: ran.append(1), fallback=fallback) == "fallback"
+    finally:
+        release.set()
+        blocker.join()
+
+    assert budget.stats["cancelled"] == 1
+    assert ran == []
+
+
+def test_full_queue_answers_with_fallback_at_once(make_budget):
+    budget = make_budget(workers=1, max_queue=0, slo_ms=5000)
+    started, release = threading.Event(), threading.Event()
+
+    def blocks(deadline):
+        started.set()
+        release.wait(5)
+        return "slow"
+
+    blocker = threading.Thread(target=budget.call, args=(blocks,), kwargs={"fallback": fallback})
+    blocker.start()
+    assert started.wait(5)
+
+    try:
+        t0 = time.perf_counter()
+        assert budget.call(lambda deadline: "never", fallback=fallback) == "fallback"
+        assert time.perf_counter() - t0 < 1.0
+    finally:
+        release.set()
+        blocker.join()
+
+    assert budget.stats["queue_full"] == 1
+
+
+def test_without_slo_runs_inline(make_budget):
+    budget = make_budget(slo_ms=0)
+    caller = threading.current_thread()
+    assert budget.call(lambda deadline: threading.current_thread() is caller, fallback=fallback)
@@ -0,0 +1,139 @@
+# tests/test_llm_client.py
+
+"""
+src/llm/client.py against a local scripted endpoint: retries, the circuit
+breaker (only provider failures count) and its half-open trial.
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from src.llm.client import CircuitOpenError, LLMClient, LLMError
+from src.llm.providers import MockProvider
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        with self.server.lock:
+            self.server.requests += 1
+            status = self.server.script.pop(0) if self.server.script else 200
+
+        body = b""
+        if status == 200:
+            body = json.dumps({"choices": [{"message": {"content": "hello"}}]}).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def server():
+    srv = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    srv.daemon_threads = True
+    srv.script, srv.requests, srv.lock = [], 0, threading.Lock()
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    yield srv
+    srv.shutdown()
+    srv.server_close()
+
+
+def make_client(server, **kwargs):
+    host, port = server.server_address[:2]
+    provider = MockProvider("stub", base_url=f"http://{host}:{port}")
+    settings = {"max_retries": 2, "backoff_base_s": 0.0, "backoff_max_s": 0.0,
+                "breaker_threshold": 3, "breaker_reset_s": 0.2, "timeout_s": 5.0}
+    settings.update(kwargs)
+    return LLMClient(provider, **settings)
+
+
+def test_retries_retryable_status_then_succeeds(server):
+    server.script = [503, 429]
+    client = make_client(server)
+
+    assert client("hi") == "hello"
+    assert server.requests == 3
+    assert client.stats["retries"] == 2
+    assert client.breaker.state == "closed"
+
+
+def test_client_errors_are_not_retried_and_never_open_the_breaker(server):
+    client = make_client(server)
+    for status in (400, 401, 422, 400, 401):
+        server.script = [status]
+        with pytest.raises(LLMError) as err:
+            client("bad prompt")
+        assert err.value.status == status and not err.value.retryable
+
+    assert server.requests == 5
+    assert client.breaker.state == "closed"
+    assert client("hi") == "hello"
+
+
+def test_provider_failures_open_the_breaker_and_fail_fast(server):
+    server.script = [503] * 3
+    client = make_client(server, max_retries=5)
+
+    with pytest.raises(CircuitOpenError):
+        client("hi")
+    assert server.requests == 3
+    assert client.breaker.state == "open"
+
+    with pytest.raises(CircuitOpenError):
+        client("hi")
+    assert server.requests == 3          # no request while open
+
+
+def test_half_open_trial_closes_the_breaker_on_success(server):
+    server.script = [500] * 3
+    client = make_client(server, max_retries=5)
+    with pytest.raises(CircuitOpenError):
+        client("hi")
+
+    time.sleep(0.25)
+    assert client.breaker.state == "half-open"
+    assert client("hi") == "hello"
+    assert client.breaker.state == "closed"
+
+
+def test_half_open_trial_is_released_by_a_client_error(server):
+    server.script = [500] * 3
+    client = make_client(server, max_retries=5)
+    with pytest.raises(CircuitOpenError):
+        client("hi")
+
+    time.sleep(0.25)
+    server.script = [400]
+    with pytest.raises(LLMError):
+        client("bad prompt")
+    # the trial is free again, so the next call reaches the provider
+    assert client("hi") == "hello"
+    assert client.breaker.state == "closed"
+
+
+def test_unexpected_error_releases_the_half_open_trial(server, monkeypatch):
+    server.script = [500] * 3
+    client = make_client(server, max_retries=5)
+    with pytest.raises(CircuitOpenError):
+        client("hi")
+    time.sleep(0.25)
+
+    def boom(*args):
+        raise RuntimeError("cassette miss")
+
+    with monkeypatch.context() as m:
+        m.setattr(client, "_send", boom)
+        with pytest.raises(RuntimeError):
+            client("hi")
+
+    assert client("hi") == "hello"
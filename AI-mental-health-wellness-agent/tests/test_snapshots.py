@@ -0,0 +1,106 @@
+# tests/test_snapshots.py
+
+"""
+Warm-restart snapshots (src/utils/snapshots.py):
+- the file format round-trips and rejects foreign files
+- no save happens before the restore has completed
+- restored emotions and cache entries land behind anything recorded since
+  start-up, and only the newest / hottest ones are kept
+- no conversation text is written; CONV sections of old snapshots are ignored
+"""
+
+import os
+
+import pytest
+
+from src.agent.memory import emotion_memory
+from src.utils.cache import CacheManager
+from src.utils.snapshots import SnapshotManager, decode, encode
+from src.utils.state_backend import LocalFileBackend
+
+
+@pytest.fixture
+def emotions(monkeypatch):
+    logs = []
+    monkeypatch.setattr(emotion_memory, "logs", logs)
+    return logs
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    cache = CacheManager(backend=LocalFileBackend(root=str(tmp_path / "state")))
+    assert cache.loaded.wait(5)
+    monkeypatch.setattr(SnapshotManager, "_cache", staticmethod(lambda: cache))
+    return cache
+
+
+def manager(tmp_path, **settings):
+    return SnapshotManager(path=str(tmp_path / "snapshots" / "state.bin"), **settings)
+
+
+def test_format_round_trips_and_keeps_unknown_sections():
+    sections = {b"EMOT": b"\x01\x02", b"XTRA": b"future section"}
+    assert decode(encode(sections)) == sections
+
+
+def test_foreign_file_is_rejected():
+    with pytest.raises(ValueError):
+        decode(b"NOPE" + encode({})[4:])
+
+
+def test_save_waits_for_the_restore(tmp_path, emotions):
+    snapshots = manager(tmp_path)
+    assert snapshots.save() is False
+    assert snapshots.stats["skipped"] == 1
+    assert not os.path.exists(snapshots.path)
+
+    assert snapshots.restore() == {}            # no snapshot yet, but restore is done
+    assert snapshots.save() is True
+
+
+def test_emotions_restore_behind_new_entries(tmp_path, emotions):
+    emotions.extend([(1, 0.5, 100.0 + i) for i in range(10)])
+    old = manager(tmp_path, max_emotions=4)
+    old.restored.set()
+    old.save()
+
+    emotions[:] = [(3, 0.9, 500.0)]             # recorded after the restart
+    assert manager(tmp_path).restore()["emotions"] == 4
+    assert emotions == [(1, 0.5, 106.0 + i) for i in range(4)] + [(3, 0.9, 500.0)]
+
+
+def test_cache_keeps_hot_entries_and_never_overwrites(tmp_path, emotions, cache):
+    for i in range(5):
+        cache.set(f"prompt {i}", f"reply {i}")
+    old = manager(tmp_path, max_cache_entries=2)
+    old.restored.set()
+    old.save()
+
+    hot = set(cache.hot_entries(2))
+    cache.cache.clear()
+    cache.set("prompt 4", "newer reply")
+
+    assert manager(tmp_path).restore()["cache_entries"] == 2
+    assert set(cache.cache) == hot
+    assert cache.get("prompt 4")["value"] == "newer reply"
+
+
+def test_no_conversation_text_is_saved(tmp_path, emotions):
+    emotions.append((2, 0.7, 1.0))
+    snapshots = manager(tmp_path)
+    snapshots.restored.set()
+    snapshots.save()
+
+    with open(snapshots.path, "rb") as f:
+        assert set(decode(f.read())) <= {b"EMOT", b"CACH"}
+    assert not [name for name in os.listdir(os.path.dirname(snapshots.path)) if name.endswith(".tmp")]
+
+
+def test_old_conversation_sections_are_ignored(tmp_path, emotions):
+    snapshots = manager(tmp_path)
+    os.makedirs(os.path.dirname(snapshots.path))
+    with open(snapshots.path, "wb") as f:
+        f.write(encode({b"CONV": b'[{"role": "user", "content": "private"}]'}))
+
+    assert snapshots.restore() == {}
+    assert snapshots.restored.is_set()
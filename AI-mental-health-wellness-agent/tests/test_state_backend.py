@@ -0,0 +1,165 @@
+# tests/test_state_backend.py
+
+"""
+Contract of src/utils/state_backend.py and the SessionStore built on it,
+run against every backend (redis via benchmarks/fake_redis.py):
+- hashes and logs round-trip; a log header is written only once
+- batched() sends its writes in one round trip, and a read of a name with
+  queued writes sees them
+- a Redis connection that failed mid-request is closed, never pooled
+- SessionStore.history() reads only the tail of a long log, and logs past
+  max_log_bytes are compacted to their last messages
+"""
+
+import socket
+import threading
+
+import pytest
+
+from benchmarks.fake_redis import FakeRedisServer
+from src.agent.memory import SessionStore
+from src.utils.state_backend import (
+    LocalFileBackend,
+    RedisBackend,
+    SQLiteBackend,
+    StateBackendError,
+)
+
+
+@pytest.fixture(scope="module")
+def redis_server():
+    server = FakeRedisServer(port=0)
+    server.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture(params=["local", "sqlite", "redis"])
+def backend(request, tmp_path):
+    if request.param == "local":
+        yield LocalFileBackend(root=str(tmp_path))
+    elif request.param == "sqlite":
+        yield SQLiteBackend(path=str(tmp_path / "state.db"))
+    else:
+        server = request.getfixturevalue("redis_server")
+        server.data.clear()
+        backend = RedisBackend(url=server.url)
+        yield backend
+        backend.close()
+
+
+def test_hash_round_trip(backend):
+    backend.hset("cache/h", "a", {"reply": "hi", "n": 1})
+    backend.hset("cache/h", "b", [1, 2])
+    assert backend.hget("cache/h", "a") == {"reply": "hi", "n": 1}
+    assert backend.hgetall("cache/h") == {"a": {"reply": "hi", "n": 1}, "b": [1, 2]}
+
+    backend.hdel("cache/h", "a")
+    assert backend.hget("cache/h", "a") is None
+    backend.delete("cache/h")
+    assert backend.hgetall("cache/h") == {}
+
+
+def test_log_append_read_and_header_once(backend):
+    backend.append("logs/mood.csv", "1,2\n", header="a,b\n")
+    backend.append("logs/mood.csv", "3,4\n", header="a,b\n")
+
+    assert backend.read("logs/mood.csv") == b"a,b\n1,2\n3,4\n"
+    assert backend.size("logs/mood.csv") == 12
+    assert backend.read("logs/mood.csv", 4) == b"1,2\n3,4\n"
+    assert backend.read("logs/mood.csv", 4, 4) == b"1,2\n"
+    assert b"".join(backend.iter_log("logs/mood.csv", chunk_size=5)) == b"a,b\n1,2\n3,4\n"
+
+    assert backend.read("logs/missing.csv") == b""
+    assert backend.size("logs/missing.csv") == 0
+
+
+def test_batched_writes_share_one_round_trip(backend):
+    before = backend.stats["round_trips"]
+    with backend.batched():
+        for i in range(5):
+            backend.append("logs/batch.log", f"{i}\n")
+        backend.hset("cache/batch", "k", "v")
+    assert backend.stats["round_trips"] - before == 1
+    assert backend.read("logs/batch.log") == b"0\n1\n2\n3\n4\n"
+
+
+def test_read_inside_batch_sees_queued_writes(backend):
+    with backend.batched():
+        backend.append("logs/ryw.log", "first\n")
+        backend.hset("cache/other", "k", "v")
+        assert backend.read("logs/ryw.log") == b"first\n"
+        assert backend.size("logs/ryw.log") == 6
+        backend.append("logs/ryw.log", "second\n")
+    assert backend.read("logs/ryw.log") == b"first\nsecond\n"
+    assert backend.hget("cache/other", "k") == "v"
+
+
+def test_redis_connection_is_dropped_after_a_transport_error():
+    # accepts, reads the request, then hangs up without a reply
+    listener = socket.socket()
+    listener.bind(("127.0.0.1", 0))
+    listener.listen()
+
+    def hang_up():
+        conn, _ = listener.accept()
+        conn.recv(1024)
+        conn.close()
+
+    thread = threading.Thread(target=hang_up, daemon=True)
+    thread.start()
+
+    backend = RedisBackend(url="redis://127.0.0.1:%d/0" % listener.getsockname()[1], timeout_s=2)
+    with pytest.raises(StateBackendError):
+        backend.hget("cache/h", "a")
+    assert backend._idle == []
+
+    thread.join(2)
+    listener.close()
+
+
+def test_session_history_reads_only_the_tail(backend):
+    store = SessionStore(backend=backend, max_messages=6, tail_bytes=256, max_log_bytes=1 << 20)
+    for i in range(50):
+        store.add_turn("student", f"message {i}", f"reply {i}")
+
+    reads = []
+    read = backend.read
+    backend.read = lambda name, start=0, length=None: reads.append((start, length)) or read(name, start, length)
+    try:
+        history = store.history("student", limit=4)
+    finally:
+        del backend.read
+
+    assert [m["content"] for m in history] == ["message 48", "reply 48", "message 49", "reply 49"]
+    assert all(length is not None and length < 4 * 256 + 1 for _, length in reads)
+
+
+def test_session_log_is_compacted_past_max_bytes(backend):
+    store = SessionStore(backend=backend, max_messages=4, tail_bytes=512, max_log_bytes=2048)
+    for i in range(100):
+        store.add_turn("student", f"message {i}", f"reply {i}")
+
+    name = store._name("student")
+    assert backend.size(name) > 2048
+
+    assert [m["content"] for m in store.history("student")] == [
+        "message 98", "reply 98", "message 99", "reply 99",
+    ]
+    assert backend.size(name) < 2048
+
+    store.add_turn("student", "message 100", "reply 100")
+    assert [m["content"] for m in store.history("student", limit=3)] == [
+        "reply 99", "message 100", "reply 100",
+    ]
+
+
+def test_sessions_are_kept_apart(backend):
+    store = SessionStore(backend=backend)
+    store.add_turn("a", "hello from a", "hi a")
+    store.add_turn("b", "hello from b", "hi b")
+    store.clear("b")
+
+    assert [m["content"] for m in store.history("a")] == ["hello from a", "hi a"]
+    assert store.history("b") == []
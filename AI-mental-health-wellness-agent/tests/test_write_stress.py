@@ -0,0 +1,31 @@
+# tests/test_write_stress.py
+
+"""
+Multi-process append integrity (benchmarks/write_stress.py, scaled down):
+concurrent log_mood / store_journal_entry writers plus a reader, with no
+interleaved, torn, duplicated or lost rows.
+"""
+
+from benchmarks.write_stress import run
+
+
+WRITERS = 6
+ROWS = 300
+
+
+def test_concurrent_writers_keep_every_row_intact(tmp_path, monkeypatch):
+    # no config/ here: the default local state backend, rooted in tmp_path
+    monkeypatch.chdir(tmp_path)
+    report = run(WRITERS, ROWS, workdir=str(tmp_path))
+
+    assert report["writer_exit_codes"] == [0] * WRITERS
+
+    assert report["log"] == {"rows": WRITERS * ROWS, "missing": 0, "malformed_or_duplicate": 0}
+
+    journal = report["journal"]
+    assert journal["malformed"] == 0
+    assert journal["entries"] == journal["expected"] == WRITERS * len(range(0, ROWS, 10))
+
+    assert report["reader"]["loads"] > 0
+    assert report["reader"]["bad_rows_seen"] == 0
+    assert report["ok"]